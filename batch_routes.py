@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+
+# Attention: Do not import the ev3dev.ev3 module in this file
+"""
+Shortest paths for many start/target pairs at once
+
+The queries are grouped by start node, every start node needs one single-source search for all of its targets.
+With more than one process the start nodes are spread over a process pool. The workers do not get the planet
+pickled with every task: it is written once as a snapshot (see snapshot) and every worker maps this file into
+memory when it starts, so all of them read the same pages.
+"""
+import multiprocessing
+import os
+import shutil
+import tempfile
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from RobolabCode.planet import Direction, Planet
+from RobolabCode.snapshot import load_snapshot, save_snapshot
+
+Route = Optional[List[Tuple[Tuple[int, int], Direction]]]
+"""
+Result of Planet.shortest_path
+"""
+
+_worker_planet = None  # planet of a pool worker, loaded by _start_worker
+
+
+def solve_routes(planet: Planet, queries: Iterable[Tuple[Tuple[int, int], Tuple[int, int]]],
+                 processes: Optional[int] = 1, chunk_size: int = 4) -> List[Route]:
+    """
+    Returns the shortest path of every (start, target) pair, in the order of the queries
+
+    Example:
+        solve_routes(planet, [((0, 0), (2, 2)), ((0, 0), (1, 2))], processes=4) returns:
+            [[((0, 0), Direction.EAST), ((1, 0), Direction.NORTH)], None]
+    :param planet: Planet
+    :param queries: Iterable of (start, target)
+    :param processes: Integer, number of worker processes, None for one per CPU, 1 to search in this process
+    :param chunk_size: Integer, start nodes sent to a worker at once
+    :return: List of None, List[] or List[Tuple[Tuple[int, int], Direction]]
+    """
+    queries = list(queries)
+    targets = {}  # start -> targets, in the order of the first query of every start
+    for start, target in queries:
+        targets.setdefault(start, {})[target] = None
+    groups = [(start, list(goals)) for start, goals in targets.items()]
+
+    processes = os.cpu_count() if processes is None else processes
+    if processes <= 1 or len(groups) <= 1:
+        routes = dict(_solve_group(planet, start, goals) for start, goals in groups)
+    else:
+        routes = _solve_parallel(planet, groups, processes, chunk_size)
+    return [routes[start][target] for start, target in queries]
+
+
+def _solve_parallel(planet: Planet, groups: list, processes: int,
+                    chunk_size: int) -> Dict[Tuple[int, int], Dict[Tuple[int, int], Route]]:
+    """ Spreads the groups over a pool of workers which share the planet through a memory mapped snapshot """
+    directory = tempfile.mkdtemp(prefix="robolab-routes-")
+    try:
+        path = os.path.join(directory, "planet.snapshot")
+        save_snapshot(planet, path)
+        with multiprocessing.Pool(min(processes, len(groups)), _start_worker, (path,)) as pool:
+            return dict(pool.imap_unordered(_solve_worker_group, groups, chunk_size))
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+def _start_worker(path: str):
+    global _worker_planet
+    _worker_planet = load_snapshot(path)
+
+
+def _solve_worker_group(group: Tuple[Tuple[int, int], List[Tuple[int, int]]]):
+    return _solve_group(_worker_planet, *group)
+
+
+def _solve_group(planet: Planet, start: Tuple[int, int],
+                 targets: List[Tuple[int, int]]) -> Tuple[Tuple[int, int], Dict[Tuple[int, int], Route]]:
+    """ Answers all queries of one start node with one search, with the results of Planet.shortest_path """
+    nodes = planet.get_paths()
+    if start not in nodes:
+        return start, {target: None for target in targets}
+
+    nodes_to_target = planet._dijkstra(start)[1]
+    return start, {target: Planet._follow_predecessors(nodes_to_target, start, target) for target in targets}
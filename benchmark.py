@@ -0,0 +1,614 @@
+#!/usr/bin/env python3
+
+# Attention: Do not import the ev3dev.ev3 module in this file
+"""
+Benchmarks for the planning code
+
+Run all benchmarks with:
+    python -m RobolabCode.benchmark
+or a single one with:
+    python -m RobolabCode.benchmark shortest_path
+"""
+import argparse
+import random
+import time
+import tracemalloc
+
+from RobolabCode import reference
+from RobolabCode.compact_planet import CompactPlanet
+from RobolabCode.planet_generator import generate_planet
+from RobolabCode.planet import Direction, Planet, PathTreeCache, RouteMemo
+
+
+def grid_planet(node_count: int, seed: int = 0, planet_class=Planet, **options) -> Planet:
+    """
+    Builds a square grid planet with roughly node_count nodes, see planet_generator.generate_paths for the options.
+    By default every neighbour is connected and the weights are between 1 and 10.
+
+    :param node_count: Integer
+    :param seed: Integer
+    :param planet_class: Planet or a subclass with another storage backend
+    :return: Planet
+    """
+    side = max(2, int(round(node_count ** 0.5)))
+    return generate_planet(side, seed=seed, planet_class=planet_class, **options)
+
+
+def _time(function, *args, repeat: int = 1) -> float:
+    """ Returns the best wall time of function(*args) in seconds """
+    best = None
+    for _ in range(repeat):
+        begin = time.perf_counter()
+        function(*args)
+        elapsed = time.perf_counter() - begin
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def bench_shortest_path(sizes=(10 ** 2, 10 ** 3, 10 ** 4, 10 ** 5), legacy_limit: int = 1100):
+    """
+    Compares the original shortest_path with the heap based engine on grid planets of growing size.
+    The original engine is cubic, it is skipped for planets bigger than legacy_limit nodes.
+    The tree cache and the route memo are disabled, so every query runs a search.
+    """
+    print("shortest_path: corner to corner query")
+    print(f"{'nodes':>8} {'legacy [s]':>12} {'heap [s]':>12} {'speedup':>9}")
+    for size in sizes:
+        planet = grid_planet(size)
+        planet.tree_cache = PathTreeCache(0)
+        planet.route_memo = RouteMemo(0)
+        nodes = list(planet.get_paths().keys())
+        start, target = min(nodes), max(nodes)
+        new = _time(planet.shortest_path, start, target, repeat=3)
+        if len(nodes) <= legacy_limit:
+            old = _time(reference.shortest_path, planet, start, target)
+            print(f"{len(nodes):>8} {old:>12.6f} {new:>12.6f} {old / new:>8.1f}x")
+        else:
+            print(f"{len(nodes):>8} {'skipped':>12} {new:>12.6f} {'-':>9}")
+
+
+def bench_tree_cache(size: int = 10 ** 4, messages: int = 200, sources: int = 4):
+    """
+    Simulates the planning load of a mission: after every driven path (which makes a known path cheaper) the robot
+    plans from one of a few nodes it keeps coming back to. Compares the time per message with and without tree_cache.
+    """
+    print(f"tree_cache: {messages} messages on a {size} node planet, {sources} recurring sources")
+    print(f"{'cache':>8} {'per message [ms]':>18}  stats")
+    for max_sources in (0, Planet.tree_cache_size):
+        planet = grid_planet(size)
+        planet.tree_cache = PathTreeCache(max_sources)
+        rng = random.Random(1)
+        nodes = list(planet.get_paths().keys())
+        homes = rng.sample(nodes, sources)
+        begin = time.perf_counter()
+        for message in range(messages):
+            node = rng.choice(nodes)
+            direction, (goal, goal_direction, weight) = rng.choice(list(planet.paths[node].items()))
+            planet.add_path((node, direction), (goal, goal_direction), max(1, weight - 1))
+            planet.distances_from(homes[message % sources])
+        elapsed = (time.perf_counter() - begin) / messages
+        print(f"{max_sources:>8} {elapsed * 1000:>18.3f}  {planet.tree_cache.stats()}")
+
+
+def bench_route_memo(size: int = 10 ** 4, messages: int = 100, repeats: int = 3):
+    """
+    Simulates a server which sends the same target several times per driven path: after every added path
+    next_direction is called repeats times for the same node and target. Compares the time per message with and
+    without route_memo for the plain, A* and bidirectional searches.
+    """
+    print(f"route_memo: {messages} messages on a {size} node planet, target sent {repeats} times per message")
+    print(f"{'search':>14} {'memo':>5} {'per message [ms]':>17} {'hit rate':>9}")
+    for search in ("tree", "astar", "bidirectional"):
+        for memo_size in (0, Planet.route_memo_size):
+            planet = grid_planet(size)
+            planet.route_memo = RouteMemo(memo_size)
+            planet.target_heuristic = planet.manhattan_heuristic if search == "astar" else None
+            planet.target_bidirectional = search == "bidirectional"
+            rng = random.Random(5)
+            nodes = list(planet.get_paths().keys())
+            begin = time.perf_counter()
+            for _ in range(messages):
+                node = rng.choice(nodes)
+                direction, (goal, goal_direction, weight) = rng.choice(list(planet.paths[node].items()))
+                planet.add_path((node, direction), (goal, goal_direction), max(1, weight - 1))
+                start, target = rng.choice(nodes), rng.choice(nodes)
+                for _ in range(repeats):
+                    planet.next_direction(target, start)
+            elapsed = (time.perf_counter() - begin) / messages
+            print(f"{search:>14} {memo_size:>5} {elapsed * 1000:>17.3f} {planet.route_memo.stats()['hit_rate']:>9.0%}")
+
+
+def bench_active_route(sizes=(10 ** 3, 10 ** 4), change_counts=(0, 1)):
+    """
+    Drives from one corner of a grid planet to the other one with next_direction. After every drive the driven path
+    is confirmed and a number of random paths get cheaper or blocked. Compares searching at every node with
+    following active_route.
+    """
+    print("active_route: corner to corner drive, changes: random changed paths per drive")
+    print(f"{'nodes':>8} {'changes':>8} {'drives':>7} {'every node [ms]':>16} {'active route [ms]':>18} "
+          f"{'speedup':>8} {'replans':>8} {'avoided':>8}")
+    for size in sizes:
+        for changes in change_counts:
+            results = []
+            for follow in (False, True):
+                planet = grid_planet(size)
+                nodes = list(planet.get_paths())
+                start, target = min(nodes), max(nodes)
+                rng = random.Random(9)
+                drives = 0
+                begin = time.perf_counter()
+                while start != target:
+                    if not follow:
+                        planet.active_route.clear()
+                    direction = planet.next_direction(target, start)
+                    goal, goal_direction, weight = planet.paths[start][direction]
+                    planet.add_path((start, direction), (goal, goal_direction), weight)
+                    for _ in range(changes):
+                        node = rng.choice(nodes)
+                        slot, (other, other_slot, old) = rng.choice(list(planet.paths[node].items()))
+                        if node != goal and other != goal and old != -1:
+                            planet.add_path((node, slot), (other, other_slot),
+                                            -1 if rng.random() < 0.2 else max(1, old - 1))
+                    start = goal
+                    drives += 1
+                results.append((time.perf_counter() - begin, planet.active_route.stats()))
+            (every, _), (active, stats) = results
+            print(f"{len(nodes):>8} {changes:>8} {drives:>7} {every * 1000:>16.1f} {active * 1000:>18.1f} "
+                  f"{every / active:>8.1f} {stats['replans']:>8} {stats['avoided_replans']:>8}")
+
+
+def bench_astar(sizes=(10 ** 2, 10 ** 3, 10 ** 4, 10 ** 5), queries: int = 20):
+    """
+    Compares the nodes expanded and the time of A* with the Manhattan heuristic against a search stopping at the
+    target without heuristic, for random start/target pairs
+    """
+    print(f"astar: {queries} random queries per planet")
+    print(f"{'nodes':>8} {'dijkstra expanded':>18} {'astar expanded':>15} {'dijkstra [s]':>13} {'astar [s]':>10}")
+    for size in sizes:
+        planet = grid_planet(size)
+        rng = random.Random(2)
+        nodes = list(planet.get_paths().keys())
+        pairs = [(rng.choice(nodes), rng.choice(nodes)) for _ in range(queries)]
+        results = []
+        for heuristic in (lambda node, target: 0, planet.manhattan_heuristic):
+            expanded = 0
+            begin = time.perf_counter()
+            for start, target in pairs:
+                planet.shortest_path(start, target, heuristic)
+                expanded += planet.expanded_nodes
+            results.append((expanded / queries, (time.perf_counter() - begin) / queries))
+        (plain_expanded, plain_time), (astar_expanded, astar_time) = results
+        print(f"{len(nodes):>8} {plain_expanded:>18.0f} {astar_expanded:>15.0f} {plain_time:>13.6f} {astar_time:>10.6f}")
+
+
+def bench_bidirectional(sizes=(10 ** 2, 10 ** 3, 10 ** 4, 10 ** 5), queries: int = 20):
+    """
+    Compares the settled nodes and the time of the bidirectional search against a search stopping at the target,
+    for random start/target pairs
+    """
+    print(f"bidirectional: {queries} random queries per planet")
+    print(f"{'nodes':>8} {'dijkstra settled':>17} {'bidirectional':>14} {'ratio':>6} {'dijkstra [s]':>13} "
+          f"{'bidirectional [s]':>18}")
+    for size in sizes:
+        planet = grid_planet(size)
+        rng = random.Random(2)
+        nodes = list(planet.get_paths().keys())
+        pairs = [(rng.choice(nodes), rng.choice(nodes)) for _ in range(queries)]
+        results = []
+        for search in (planet._dijkstra, planet._bidirectional):
+            settled = 0
+            begin = time.perf_counter()
+            for start, target in pairs:
+                search(start, target)
+                settled += planet.expanded_nodes
+            results.append((settled / queries, (time.perf_counter() - begin) / queries))
+        (plain_settled, plain_time), (both_settled, both_time) = results
+        print(f"{len(nodes):>8} {plain_settled:>17.0f} {both_settled:>14.0f} {both_settled / plain_settled:>6.2f} "
+              f"{plain_time:>13.6f} {both_time:>18.6f}")
+
+
+def bench_hierarchy(sizes=(10 ** 3, 10 ** 4, 10 ** 5), queries: int = 200):
+    """
+    Builds a contraction hierarchy and compares its routes with a search stopping at the target,
+    for random start/target pairs
+    """
+    print(f"hierarchy: build time and {queries} random route queries per planet")
+    print(f"{'nodes':>8} {'shortcuts':>10} {'build [s]':>10} {'settled':>8} {'query [us]':>11} {'dijkstra [us]':>14}")
+    for size in sizes:
+        planet = grid_planet(size)
+        rng = random.Random(3)
+        nodes = list(planet.get_paths().keys())
+        pairs = [(rng.choice(nodes), rng.choice(nodes)) for _ in range(queries)]
+
+        begin = time.perf_counter()
+        for start, target in pairs[:20]:
+            planet._dijkstra(start, target)
+        dijkstra_time = (time.perf_counter() - begin) / 20
+
+        build_time = _time(planet.build_hierarchy)
+        settled = 0
+        begin = time.perf_counter()
+        for start, target in pairs:
+            planet.shortest_path(start, target)
+            settled += planet.expanded_nodes
+        query_time = (time.perf_counter() - begin) / queries
+        print(f"{len(nodes):>8} {planet.hierarchy.shortcuts:>10} {build_time:>10.2f} {settled / queries:>8.0f} "
+              f"{query_time * 10 ** 6:>11.0f} {dijkstra_time * 10 ** 6:>14.0f}")
+
+
+def corridor_planet(junctions: int, length: int, seed: int = 0) -> Planet:
+    """
+    Builds a square grid of junctions where every two neighbouring junctions are connected by a corridor of
+    length degree 2 nodes, weights between 1 and 10
+
+    :param junctions: Integer, roughly the number of junctions
+    :param length: Integer, nodes inside every corridor
+    :param seed: Integer
+    :return: Planet
+    """
+    rng = random.Random(seed)
+    side = max(2, int(round(junctions ** 0.5)))
+    step = length + 1
+    planet = Planet()
+    paths = []
+    for x in range(side):
+        for y in range(side):
+            for dx, dy, leaving, arriving in ((1, 0, Direction.EAST, Direction.WEST),
+                                              (0, 1, Direction.NORTH, Direction.SOUTH)):
+                if x + dx < side and y + dy < side:
+                    for i in range(step):
+                        node = (x * step + dx * i, y * step + dy * i)
+                        goal = (node[0] + dx, node[1] + dy)
+                        paths.append(((node, leaving), (goal, arriving), rng.randint(1, 10)))
+    planet.add_paths(paths)
+    return planet
+
+
+def bench_corridors(junction_counts=(10 ** 2, 10 ** 3), lengths=(0, 4, 16), queries: int = 200):
+    """
+    Compares routes over the corridor graph with a search stopping at the target, for random start/target pairs,
+    and the repair of the graph when a path splits a corridor
+    """
+    print(f"corridors: {queries} random route queries per planet")
+    print(f"{'nodes':>8} {'length':>7} {'super-edges':>12} {'build [s]':>10} {'settled':>8} {'query [us]':>11} "
+          f"{'dijkstra [us]':>14} {'settled':>8} {'repair [us]':>12}")
+    for junctions in junction_counts:
+        for length in lengths:
+            planet = corridor_planet(junctions, length)
+            rng = random.Random(3)
+            nodes = list(planet.get_paths().keys())
+            pairs = [(rng.choice(nodes), rng.choice(nodes)) for _ in range(queries)]
+
+            begin = time.perf_counter()
+            dijkstra_settled = 0
+            for start, target in pairs[:20]:
+                planet._dijkstra(start, target)
+                dijkstra_settled += planet.expanded_nodes
+            dijkstra_time = (time.perf_counter() - begin) / 20
+
+            build_time = _time(planet.use_corridors)
+            corridors = planet.corridors
+            settled = 0
+            begin = time.perf_counter()
+            for start, target in pairs:
+                corridors.route(start, target)
+                settled += corridors.settled
+            query_time = (time.perf_counter() - begin) / queries
+
+            # Loops at corridor nodes turn them into junctions, every loop splits a corridor
+            loops = [node for node in nodes if node not in corridors.junctions][:20]
+            begin = time.perf_counter()
+            for node in loops:
+                planet.add_path(((node[0], node[1]), Direction.NORTH if node[0] % (length + 1) else Direction.EAST),
+                                ((node[0], node[1]), Direction.SOUTH if node[0] % (length + 1) else Direction.WEST), 1)
+            repair_time = (time.perf_counter() - begin) / max(1, len(loops))
+            print(f"{len(nodes):>8} {length:>7} {corridors.stats()['super_edges']:>12} {build_time:>10.2f} "
+                  f"{settled / queries:>8.0f} {query_time * 10 ** 6:>11.0f} {dijkstra_time * 10 ** 6:>14.0f} "
+                  f"{dijkstra_settled / 20:>8.0f} {repair_time * 10 ** 6:>12.0f}")
+
+
+def bench_batch(size: int = 10 ** 4, queries: int = 2000, sources: int = 100, process_counts=None):
+    """
+    Compares the throughput of solve_routes for many start/target pairs with a loop over shortest_path
+    """
+    import os
+    from RobolabCode.batch_routes import solve_routes
+
+    planet = grid_planet(size)
+    rng = random.Random(4)
+    nodes = list(planet.get_paths().keys())
+    starts = [rng.choice(nodes) for _ in range(sources)]
+    pairs = [(rng.choice(starts), rng.choice(nodes)) for _ in range(queries)]
+    cpus = os.cpu_count() or 1
+    if process_counts is None:
+        process_counts = sorted({1, 2, 4, cpus})
+
+    print(f"batch: {queries} queries from {sources} start nodes on {len(nodes)} nodes, {cpus} CPUs")
+    print(f"{'mode':>16} {'time [s]':>9} {'queries/s':>10} {'speedup':>8}")
+    loop_time = _time(lambda: [planet.shortest_path(start, target) for start, target in pairs])
+    print(f"{'shortest_path':>16} {loop_time:>9.3f} {queries / loop_time:>10.0f} {1:>8.2f}")
+    for processes in process_counts:
+        batch_time = _time(solve_routes, planet, pairs, processes)
+        print(f"{f'{processes} processes':>16} {batch_time:>9.3f} {queries / batch_time:>10.0f} "
+              f"{loop_time / batch_time:>8.2f}")
+
+
+def bench_storage(sizes=(10 ** 4, 10 ** 5, 5 * 10 ** 5)):
+    """
+    Compares memory and full single-source search time of the dictionary planet and the array backend
+    """
+    print("storage: memory of the planet and time of a full single-source search")
+    print(f"{'nodes':>8} {'edges':>8} {'backend':>14} {'memory [MB]':>12} {'bytes/edge':>11} {'search [s]':>11}")
+    for size in sizes:
+        for planet_class in (Planet, CompactPlanet):
+            tracemalloc.start()
+            planet = grid_planet(size, planet_class=planet_class)
+            memory = tracemalloc.get_traced_memory()[0]
+            tracemalloc.stop()
+            nodes = list(planet.get_paths().keys())
+            edges = sum(len(planet.get_paths()[node]) for node in nodes) // 2
+            search = _time(planet._dijkstra, nodes[0])
+            print(f"{len(nodes):>8} {edges:>8} {planet_class.__name__:>14} {memory / 2 ** 20:>12.1f} "
+                  f"{memory / edges:>11.1f} {search:>11.3f}")
+
+
+def bench_distance_matrix(sizes=(10 ** 2, 10 ** 3, 5 * 10 ** 3), sources: int = 100, queries: int = 2000):
+    """
+    Compares a many-source distance matrix (with and without SciPy) against calling shortest_path in a loop
+    for random start/target pairs
+    """
+    from RobolabCode import distance_matrix
+    print(f"distance_matrix: {queries} random routes from {sources} sources")
+    print(f"{'nodes':>8} {'loop [s]':>10} {'python [s]':>11} {'scipy [s]':>10}")
+    for size in sizes:
+        planet = grid_planet(size)
+        rng = random.Random(3)
+        nodes = list(planet.get_paths().keys())
+        starts = rng.sample(nodes, min(sources, len(nodes)))
+        pairs = [(rng.choice(starts), rng.choice(nodes)) for _ in range(queries)]
+
+        begin = time.perf_counter()
+        for start, target in pairs:
+            planet.shortest_path(start, target)
+        results = [time.perf_counter() - begin]
+
+        for use_scipy in (False, True):
+            if use_scipy and distance_matrix.numpy is None:
+                results.append(None)
+                continue
+            begin = time.perf_counter()
+            matrix = planet.distance_matrix(starts, use_scipy=use_scipy)
+            for start, target in pairs:
+                matrix.route(start, target)
+            results.append(time.perf_counter() - begin)
+        print(f"{len(nodes):>8} " + " ".join("-".rjust(width) if result is None else f"{result:>{width}.3f}"
+                                            for result, width in zip(results, (10, 11, 10))))
+
+
+def bench_ingest(count: int = 10 ** 4, cached_sources: int = 4):
+    """
+    Ingests count unveiled paths (10 % of them repeated) of an unexplored area next to a known planet with cached
+    trees, once path by path as handle_unveiled_paths used to do and once as a single batch with ingest_unveiled.
+    The time includes planning from the cached sources afterwards.
+    """
+    print(f"ingest: {count} unveiled paths, {cached_sources} cached trees")
+    rng = random.Random(4)
+    side = int(count ** 0.5)
+    unveiled = []
+    for _ in range(count):
+        x, y = rng.randrange(side - 1, 2 * side), rng.randrange(side)
+        if x == side - 1 or rng.random() < 0.5:
+            unveiled.append((((x, y), Direction.EAST), ((x + 1, y), Direction.WEST), rng.randint(1, 10), "free"))
+        else:
+            unveiled.append((((x, y), Direction.NORTH), ((x, y + 1), Direction.SOUTH), rng.randint(1, 10), "free"))
+    unveiled.extend(rng.sample(unveiled, count // 10))
+    sources = [(rng.randrange(side), rng.randrange(side)) for _ in range(cached_sources)]
+
+    def prepare() -> Planet:
+        planet = grid_planet(side * side)
+        for node in sources:
+            planet.distances_from(node)
+            planet.frontier.visit(node, list(Direction))
+        return planet
+
+    def ingest_and_plan(planet: Planet, ingest):
+        ingest(planet)
+        for node in sources:
+            planet.distances_from(node)
+
+    def one_by_one(planet: Planet):
+        for first_vertex, last_vertex, path_weight, path_status in unveiled:
+            planet.frontier.discover(first_vertex[0])
+            planet.frontier.discover(last_vertex[0])
+            planet.add_path(first_vertex, last_vertex, path_weight)
+            planet.close_known_paths(first_vertex[0])
+            planet.close_known_paths(last_vertex[0])
+
+    for name, ingest in (("one by one", one_by_one), ("batch", lambda planet: planet.ingest_unveiled(unveiled))):
+        planet = prepare()
+        elapsed = _time(ingest_and_plan, planet, ingest)
+        print(f"{name:>12} {elapsed:>8.3f} s  {planet.tree_cache.stats()}")
+
+
+def bench_snapshot(sizes=(10 ** 4, 10 ** 5, 10 ** 6)):
+    """
+    Compares loading a memory mapped snapshot with building the same planet path by path
+    """
+    import os
+    import tempfile
+    from RobolabCode.snapshot import save_snapshot, load_snapshot
+    print("snapshot: restore a known planet")
+    print(f"{'nodes':>8} {'file [MB]':>10} {'add_paths [s]':>14} {'load [s]':>10}")
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'planet.snapshot')
+        for size in sizes:
+            planet = grid_planet(size, planet_class=CompactPlanet)
+            paths = [((node, direction), (goal, goal_direction), weight)
+                     for node, directions in planet.get_paths().items()
+                     for direction, (goal, goal_direction, weight) in directions.items()]
+            save_snapshot(planet, path)
+            build = _time(lambda: CompactPlanet().add_paths(paths))
+            load = _time(load_snapshot, path, repeat=3)
+            print(f"{len(planet.coordinates):>8} {os.path.getsize(path) / 2 ** 20:>10.1f} {build:>14.3f} {load:>10.3f}")
+
+
+def bench_exploration(sizes=(10 ** 2, 4 * 10 ** 2, 10 ** 3, 4 * 10 ** 3)):
+    """
+    Explores grid planets of growing size in the offline simulator and reports drive cost and planning time
+    """
+    from RobolabCode.simulator import simulate
+    print("exploration: offline simulation with 30 % of the messages unveiling paths, 5 % blocked paths and loops")
+    print(f"{'nodes':>8} {'drive cost':>11} {'decisions':>10} {'planning/decision [ms]':>23} {'max [ms]':>9}")
+    for size in sizes:
+        truth = grid_planet(size, density=0.9, blocked_ratio=0.05, loop_ratio=0.05, curve_ratio=0.05)
+        result = simulate(truth, (min(truth.get_paths()), Direction.NORTH), unveil_rate=0.3)
+        print(f"{len(truth.get_paths()):>8} {result['drive_cost']:>11} {result['decisions']:>10} "
+              f"{result['planning_time'] / result['decisions'] * 1000:>23.3f} {result['max_planning_time'] * 1000:>9.3f}")
+
+
+def bench_tour(sizes=(10 ** 2, 4 * 10 ** 2), seeds: int = 4):
+    """
+    Compares the greedy exploration with the TourPlanner in the offline simulator on total drive cost,
+    with and without unveiled paths
+    """
+    from RobolabCode.simulator import simulate
+    from RobolabCode.tour_planner import TourPlanner
+
+    def tour_explorer():
+        explorer = Planet()
+        explorer.tour_planner = TourPlanner(explorer)
+        return explorer
+
+    print(f"tour: total drive cost and planning time of {seeds} explorations, 10 % blocked paths,")
+    print("      unveiled: paths per pathUnveiled message @ share of messages with paths")
+    print(f"{'nodes':>8} {'unveiled':>9} {'greedy':>8} {'tour':>8} {'change':>8} {'greedy [s]':>11} {'tour [s]':>9}")
+    for size in sizes:
+        for unveil_rate, unveil_count in ((0.0, 0), (0.5, 3), (1.0, 6)):
+            costs, times = [0, 0], [0.0, 0.0]
+            for seed in range(seeds):
+                truth = grid_planet(size, seed=seed, density=0.8, blocked_ratio=0.1)
+                start = (min(truth.get_paths()), Direction.NORTH)
+                for index, explorer in enumerate((Planet(), tour_explorer())):
+                    result = simulate(truth, start, explorer=explorer, unveil_rate=unveil_rate,
+                                      unveil_count=unveil_count, seed=seed)
+                    costs[index] += result["drive_cost"]
+                    times[index] += result["planning_time"]
+            print(f"{len(truth.get_paths()):>8} {f'{unveil_count}@{unveil_rate:.0%}':>9} {costs[0]:>8} {costs[1]:>8} "
+                  f"{(costs[1] - costs[0]) / costs[0]:>+8.1%} {times[0]:>11.3f} {times[1]:>9.3f}")
+
+
+def import_times(module: str, pycache_prefix: str) -> dict:
+    """
+    Imports module in a new interpreter with -X importtime
+
+    :param module: String, e.g. "RobolabCode.planet"
+    :param pycache_prefix: String, directory of the bytecode files (PYTHONPYCACHEPREFIX)
+    :return: Dict, key: module name, value: (self, cumulative) import time in seconds
+    """
+    import os
+    import subprocess
+    import sys
+
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))  # directory containing RobolabCode
+    env = dict(os.environ, PYTHONPATH=root, PYTHONPYCACHEPREFIX=pycache_prefix)
+    env.pop("PYTHONDONTWRITEBYTECODE", None)  # the first import has to write the bytecode
+    output = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"], env=env,
+                            stderr=subprocess.PIPE, universal_newlines=True, check=True).stderr
+    times = {}
+    for line in output.splitlines():
+        if line.startswith("import time:") and "|" in line and "self [us]" not in line:
+            self_time, cumulative, name = line[len("import time:"):].split("|")
+            times[name.strip()] = (int(self_time) / 10 ** 6, int(cumulative) / 10 ** 6)
+    return times
+
+
+def bench_import(modules=("RobolabCode.main", "RobolabCode.planet", "RobolabCode.mission"), runs: int = 5,
+                 budget_ms: float = 25.0):
+    """
+    Measures the cold start import time of the modules the robot loads before it follows the line, compiled from
+    source (nothing cached) and from precompiled bytecode. Exits with status 1 if importing the planning code
+    (RobolabCode.mission with RobolabCode.planet) from bytecode takes longer than budget_ms.
+    """
+    import shutil
+    import tempfile
+
+    print(f"import: best of {runs} interpreter starts, -X importtime")
+    print(f"{'module':>20} {'source [ms]':>12} {'bytecode [ms]':>14} {'own modules [ms]':>17}")
+    compiled = tempfile.mkdtemp(prefix="robolab-pycache-")
+    try:
+        results = {}
+        for module in modules:
+            import_times(module, compiled)  # writes the bytecode
+            source = bytecode = own = None
+            for _ in range(runs):
+                fresh = tempfile.mkdtemp(prefix="robolab-pycache-")
+                try:
+                    cold = import_times(module, fresh)[module][1]
+                finally:
+                    shutil.rmtree(fresh, ignore_errors=True)
+                times = import_times(module, compiled)
+                warm = times[module][1]
+                mine = sum(self_time for name, (self_time, cumulative) in times.items() if name.startswith("RobolabCode"))
+                source = cold if source is None else min(source, cold)
+                bytecode = warm if bytecode is None else min(bytecode, warm)
+                own = mine if own is None else min(own, mine)
+            results[module] = bytecode
+            print(f"{module:>20} {source * 1000:>12.1f} {bytecode * 1000:>14.1f} {own * 1000:>17.1f}")
+    finally:
+        shutil.rmtree(compiled, ignore_errors=True)
+
+    planning = results.get("RobolabCode.mission")
+    if planning is not None and planning * 1000 > budget_ms:
+        print(f"importing the planning code takes {planning * 1000:.1f} ms, more than the budget of {budget_ms} ms")
+        raise SystemExit(1)
+
+
+def bench_differential(cases: int = 2000, seed: int = 0):
+    """
+    Checks every route engine against the original Dijkstra implementation on random planets and compares their
+    times. Exits with status 1 if an engine gives a different result.
+    """
+    from RobolabCode import differential
+
+    print(f"differential: {cases} random planets")
+    results = differential.run_differential(cases, seed)
+    differential.print_report(results)
+    if any(result["failures"] for result in results.values()):
+        raise SystemExit(1)
+
+
+BENCHMARKS = {
+    "shortest_path": bench_shortest_path,
+    "tree_cache": bench_tree_cache,
+    "route_memo": bench_route_memo,
+    "active_route": bench_active_route,
+    "astar": bench_astar,
+    "bidirectional": bench_bidirectional,
+    "hierarchy": bench_hierarchy,
+    "corridors": bench_corridors,
+    "batch": bench_batch,
+    "storage": bench_storage,
+    "distance_matrix": bench_distance_matrix,
+    "ingest": bench_ingest,
+    "snapshot": bench_snapshot,
+    "exploration": bench_exploration,
+    "tour": bench_tour,
+    "import": bench_import,
+    "differential": bench_differential,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("names", nargs="*", help="benchmarks to run, one of: " + ", ".join(BENCHMARKS))
+    args = parser.parse_args()
+    for name in args.names:
+        if name not in BENCHMARKS:
+            parser.error(f"unknown benchmark: {name}")
+    for name in args.names or BENCHMARKS:
+        BENCHMARKS[name]()
+        print()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+
+# Attention: Do not import the ev3dev.ev3 module in this file
+from array import array
+from collections.abc import Mapping
+from heapq import heappush, heappop
+from typing import Optional, Tuple, Dict, Iterator
+
+from RobolabCode.planet import DIRECTIONS, Direction, Planet, Weight
+
+NO_NEIGHBOUR = -1
+
+
+class CompactPlanet(Planet):
+    """
+    Planet which stores its paths in flat arrays instead of nested dictionaries.
+
+    Every coordinate is interned to a dense integer id. Node id has the four direction slots id * 4 + direction // 90
+    in three arrays: neighbour id (-1 for no path), arrival direction slot and weight.
+    get_paths() and the paths attribute are a read-only view which looks like the dictionary of Planet.
+    The arrays may also be memoryviews of a memory mapped snapshot, they are copied when the first node is added.
+    """
+
+    def __init__(self):
+        """ Initializes the data structure """
+        super().__init__()
+        self.ids = {}  # key: coordinates, value: node id
+        self.coordinates = []  # node id -> coordinates
+        self.neighbours = array('i')
+        self.arrivals = array('b')
+        self.weights = array('i')
+        self.paths = CompactPaths(self)
+
+    def intern(self, node: Tuple[int, int]) -> int:
+        """
+        Returns the id of node, new nodes get the next free id and four empty slots
+
+        :param node: 2-Tuple
+        :return: Integer
+        """
+        node_id = self.ids.get(node)
+        if node_id is None:
+            if not isinstance(self.neighbours, array):
+                self.neighbours, self.arrivals, self.weights = \
+                    array('i', self.neighbours), array('b', self.arrivals), array('i', self.weights)
+            node_id = len(self.coordinates)
+            self.ids[node] = node_id
+            self.coordinates.append(node)
+            self.neighbours.extend((NO_NEIGHBOUR, NO_NEIGHBOUR, NO_NEIGHBOUR, NO_NEIGHBOUR))
+            self.arrivals.extend((0, 0, 0, 0))
+            self.weights.extend((0, 0, 0, 0))
+        return node_id
+
+    def _store_path(self, start: Tuple[Tuple[int, int], Direction], target: Tuple[Tuple[int, int], Direction],
+                    weight: int):
+        """ Writes the path into the slots of both nodes """
+        start_id, target_id = self.intern(start[0]), self.intern(target[0])
+        start_slot, target_slot = start_id * 4 + start[1] // 90, target_id * 4 + target[1] // 90
+        self.neighbours[start_slot], self.arrivals[start_slot], self.weights[start_slot] = \
+            target_id, target[1] // 90, weight
+        self.neighbours[target_slot], self.arrivals[target_slot], self.weights[target_slot] = \
+            start_id, start[1] // 90, weight
+
+    def _get_slot(self, node: Tuple[int, int], direction: Direction) -> Optional[Tuple[Tuple[int, int], Direction, Weight]]:
+        """ Returns the path leaving node in direction or None """
+        node_id = self.ids.get(node)
+        if node_id is None:
+            return None
+        slot = node_id * 4 + direction // 90
+        if self.neighbours[slot] == NO_NEIGHBOUR:
+            return None
+        return self.coordinates[self.neighbours[slot]], DIRECTIONS[self.arrivals[slot]], self.weights[slot]
+
+    def _dijkstra(self, start: Tuple[int, int], target: Optional[Tuple[int, int]] = None):
+        """
+        Dijkstra search over the id arrays, returns the same structures as Planet._dijkstra
+        """
+        neighbours, weights = self.neighbours, self.weights
+        start_id = self.ids[start]
+        target_id = self.ids.get(target, NO_NEIGHBOUR)
+
+        distances = {start_id: 0}
+        previous = {}  # node id -> slot taken at the previous node
+        settled = bytearray(len(self.coordinates))
+        settled_order = []
+        heap = [(0, start_id)]
+
+        while heap:
+            current_distance, current_id = heappop(heap)
+            if settled[current_id]:
+                continue
+            settled[current_id] = 1
+            settled_order.append(current_id)
+            if current_id == target_id:
+                break
+
+            base = current_id * 4
+            for slot in range(base, base + 4):
+                goal_id = neighbours[slot]
+                weight = weights[slot]
+                if goal_id == NO_NEIGHBOUR or weight == -1 or settled[goal_id]:
+                    continue
+                new_distance = current_distance + weight
+                if new_distance < distances.get(goal_id, self.infinity):
+                    distances[goal_id] = new_distance
+                    previous[goal_id] = slot
+                    heappush(heap, (new_distance, goal_id))
+
+        self.expanded_nodes = len(settled_order)
+
+        # Translate the ids back to coordinates
+        coordinates = self.coordinates
+        nodes_to_target = {coordinates[goal_id]: (coordinates[slot // 4], DIRECTIONS[slot % 4])
+                           for goal_id, slot in previous.items()}
+        return ({coordinates[node_id]: distance for node_id, distance in distances.items()}, nodes_to_target,
+                [coordinates[node_id] for node_id in settled_order])
+
+    def memory_usage(self) -> int:
+        """ Returns the number of bytes used by the slot arrays """
+        return sum(len(slots) * slots.itemsize for slots in (self.neighbours, self.arrivals, self.weights))
+
+
+class CompactPaths(Mapping):
+    """
+    Read-only view of the paths of a CompactPlanet with the same structure as Planet.get_paths().
+    The direction dictionaries are built on every access.
+    """
+
+    def __init__(self, planet: CompactPlanet):
+        self.planet = planet
+
+    def __getitem__(self, node: Tuple[int, int]) -> Dict[Direction, Tuple[Tuple[int, int], Direction, Weight]]:
+        planet = self.planet
+        base = planet.ids[node] * 4
+        directions = {}
+        for slot in range(4):
+            neighbour = planet.neighbours[base + slot]
+            if neighbour != NO_NEIGHBOUR:
+                directions[DIRECTIONS[slot]] = (planet.coordinates[neighbour], DIRECTIONS[planet.arrivals[base + slot]],
+                                                planet.weights[base + slot])
+        return directions
+
+    def __contains__(self, node) -> bool:
+        return node in self.planet.ids
+
+    def __iter__(self) -> Iterator[Tuple[int, int]]:
+        return iter(self.planet.coordinates)
+
+    def __len__(self) -> int:
+        return len(self.planet.coordinates)
@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+
+# Attention: Do not import the ev3dev.ev3 module in this file
+"""
+Contraction hierarchy for repeated route queries on a planet which does not change any more
+
+The nodes are contracted one after another, cheapest first (edge difference plus contracted neighbours).
+Contracting a node adds a shortcut between two of its neighbours if the path over the node is the only shortest
+one (checked by a bounded witness search). A query then only searches upwards (towards later contracted nodes)
+from both ends, the shortcuts of the route are unpacked into the original paths at the end.
+"""
+from heapq import heappush, heappop
+from typing import Dict, List, Optional, Tuple
+
+from RobolabCode.planet import Direction, Planet, Weight
+
+
+class ContractionHierarchy:
+    """
+    Shortcut index of the paths of a planet, built by Planet.build_hierarchy.
+    Blocked paths are ignored, paths which are not symmetric any more (after overwriting) are used in their
+    direction only.
+
+    Example:
+        hierarchy = ContractionHierarchy(planet)
+        hierarchy.route((0, 0), (2, 2)) returns: [((0, 0), Direction.EAST), ((1, 0), Direction.NORTH)]
+    """
+
+    def __init__(self, planet: Planet, witness_limit: int = 50):
+        """
+        :param planet: Planet
+        :param witness_limit: Integer, settled nodes per witness search, smaller limits build faster but add
+                              more (unneeded) shortcuts
+        """
+        paths = planet.get_paths()
+        self.nodes = list(paths)  # node id -> coordinates
+        self.index = {node: node_id for node_id, node in enumerate(self.nodes)}
+        self.witness_limit = witness_limit
+        self.rank = [0] * len(self.nodes)  # position in the contraction order
+        self.up_out = [{} for _ in self.nodes]  # node id -> {higher node id: weight}, searched from the start
+        self.up_in = [{} for _ in self.nodes]  # node id -> {higher node id: weight}, searched from the target
+        self.middle = {}  # (from id, to id) -> id of the node which a shortcut skips
+        self.directions = {}  # (from id, to id) -> Direction of the original path
+        self.shortcuts = 0
+        self.settled = 0  # nodes settled by the last query
+
+        out_edges = [{} for _ in self.nodes]
+        in_edges = [{} for _ in self.nodes]
+        for node, directions in paths.items():
+            node_id = self.index[node]
+            for direction, (goal, goal_direction, weight) in directions.items():
+                goal_id = self.index[goal]
+                if weight == -1 or goal_id == node_id:
+                    continue
+                if weight < out_edges[node_id].get(goal_id, Planet.infinity):
+                    out_edges[node_id][goal_id] = weight
+                    in_edges[goal_id][node_id] = weight
+                    self.directions[(node_id, goal_id)] = direction
+        self._contract(out_edges, in_edges)
+
+    def _contract(self, out_edges: List[dict], in_edges: List[dict]):
+        """ Contracts all nodes, the remaining edges of a node at its contraction are its upward edges """
+        contracted_neighbours = [0] * len(self.nodes)
+        heap = [(self._priority(node_id, self._shortcuts(node_id, out_edges, in_edges), out_edges, in_edges,
+                                contracted_neighbours), node_id)
+                for node_id in range(len(self.nodes))]
+        heap.sort()
+
+        rank = 0
+        while heap:
+            priority, node_id = heappop(heap)
+            # Lazy update: the priority may be outdated, contract the node only if it still is the cheapest
+            shortcuts = self._shortcuts(node_id, out_edges, in_edges)
+            priority = self._priority(node_id, shortcuts, out_edges, in_edges, contracted_neighbours)
+            if heap and priority > heap[0][0]:
+                heappush(heap, (priority, node_id))
+                continue
+
+            for from_id, to_id, weight in shortcuts:
+                # A witness search stopped by witness_limit may miss an existing cheaper edge
+                if weight < out_edges[from_id].get(to_id, Planet.infinity):
+                    out_edges[from_id][to_id] = weight
+                    in_edges[to_id][from_id] = weight
+                    self.middle[(from_id, to_id)] = node_id
+                    self.shortcuts += 1
+
+            self.rank[node_id] = rank
+            rank += 1
+            self.up_out[node_id] = out_edges[node_id]
+            self.up_in[node_id] = in_edges[node_id]
+            for goal_id in out_edges[node_id]:
+                del in_edges[goal_id][node_id]
+                contracted_neighbours[goal_id] += 1
+            for from_id in in_edges[node_id]:
+                del out_edges[from_id][node_id]
+                contracted_neighbours[from_id] += 1
+
+    @staticmethod
+    def _priority(node_id: int, shortcuts: list, out_edges: List[dict], in_edges: List[dict],
+                  contracted_neighbours: List[int]) -> int:
+        """ Edge difference of contracting the node plus its contracted neighbours """
+        return len(shortcuts) - len(out_edges[node_id]) - len(in_edges[node_id]) + contracted_neighbours[node_id]
+
+    def _shortcuts(self, node_id: int, out_edges: List[dict], in_edges: List[dict]) -> List[Tuple[int, int, int]]:
+        """ Returns the shortcuts (from id, to id, weight) needed if the node is contracted now """
+        shortcuts = []
+        outgoing = out_edges[node_id]
+        if not outgoing:
+            return shortcuts
+        longest = max(outgoing.values())
+        for from_id, in_weight in in_edges[node_id].items():
+            witness = self._witness_search(from_id, node_id, in_weight + longest, out_edges)
+            for to_id, out_weight in outgoing.items():
+                if to_id != from_id and witness.get(to_id, Planet.infinity) > in_weight + out_weight:
+                    shortcuts.append((from_id, to_id, in_weight + out_weight))
+        return shortcuts
+
+    def _witness_search(self, start_id: int, skipped_id: int, max_distance: int, out_edges: List[dict]) -> dict:
+        """ Dijkstra search from start without the skipped node, bounded by distance and settled nodes """
+        distances = {start_id: 0}
+        heap = [(0, start_id)]
+        settled = 0
+        while heap and settled < self.witness_limit:
+            current_distance, current_id = heappop(heap)
+            if current_distance > distances[current_id]:
+                continue
+            if current_distance > max_distance:
+                break
+            settled += 1
+            for goal_id, weight in out_edges[current_id].items():
+                if goal_id == skipped_id:
+                    continue
+                new_distance = current_distance + weight
+                if new_distance < distances.get(goal_id, Planet.infinity):
+                    distances[goal_id] = new_distance
+                    heappush(heap, (new_distance, goal_id))
+        return distances
+
+    def route(self, start: Tuple[int, int], target: Tuple[int, int]) -> Optional[List[Tuple[Tuple[int, int], Direction]]]:
+        """
+        Returns the shortest path between two nodes like Planet.shortest_path, with all shortcuts unpacked
+
+        :param start: 2-Tuple
+        :param target: 2-Tuple
+        :return: None, List[] or List[Tuple[Tuple[int, int], Direction]]
+        """
+        found = self._query(start, target)
+        if found is None:
+            return None
+        distance, node_ids = found
+
+        # Unpack every shortcut into the two edges it skips until only original paths are left
+        road = []
+        stack = list(zip(node_ids[-2::-1], node_ids[:0:-1]))
+        while stack:
+            from_id, to_id = stack.pop()
+            middle_id = self.middle.get((from_id, to_id))
+            if middle_id is None:
+                road.append((self.nodes[from_id], self.directions[(from_id, to_id)]))
+            else:
+                stack.append((middle_id, to_id))
+                stack.append((from_id, middle_id))
+        return road
+
+    def distance(self, start: Tuple[int, int], target: Tuple[int, int]) -> Optional[Weight]:
+        """
+        Returns the cost of the shortest path between two nodes or None if there is none
+
+        :param start: 2-Tuple
+        :param target: 2-Tuple
+        :return: Integer or None
+        """
+        found = self._query(start, target)
+        return None if found is None else found[0]
+
+    def _query(self, start: Tuple[int, int], target: Tuple[int, int]) -> Optional[Tuple[Weight, List[int]]]:
+        """ Upward search from both ends, returns (distance, node ids of the route with shortcuts) or None """
+        if start not in self.index or target not in self.index:
+            return None
+        start_id, target_id = self.index[start], self.index[target]
+        self.settled = 0
+        if start_id == target_id:
+            return 0, [start_id]
+
+        distances = ({start_id: 0}, {target_id: 0})
+        previous = ({}, {})
+        heaps = ([(0, start_id)], [(0, target_id)])
+        edges = (self.up_out, self.up_in)
+        best, meeting_id = Planet.infinity, None
+
+        # A side stops when its cheapest node costs at least the best route, there may be a cheaper meeting
+        # node further up the other side until then
+        while heaps[0] or heaps[1]:
+            side = 0 if heaps[0] and (not heaps[1] or heaps[0][0][0] <= heaps[1][0][0]) else 1
+            current_distance, current_id = heappop(heaps[side])
+            own = distances[side]
+            if current_distance > own[current_id]:
+                continue
+            if current_distance >= best:
+                heaps[side].clear()
+                continue
+            self.settled += 1
+            other_distance = distances[1 - side].get(current_id)
+            if other_distance is not None and current_distance + other_distance < best:
+                best, meeting_id = current_distance + other_distance, current_id
+
+            # Stall on demand: a node reached cheaper over a higher node is no part of a shortest route up
+            if any(own.get(higher_id, Planet.infinity) + weight < current_distance
+                   for higher_id, weight in edges[1 - side][current_id].items()):
+                continue
+            for goal_id, weight in edges[side][current_id].items():
+                new_distance = current_distance + weight
+                if new_distance < own.get(goal_id, Planet.infinity):
+                    own[goal_id] = new_distance
+                    previous[side][goal_id] = current_id
+                    heappush(heaps[side], (new_distance, goal_id))
+
+        if meeting_id is None:
+            return None
+        node_ids = [meeting_id]
+        while node_ids[-1] != start_id:
+            node_ids.append(previous[0][node_ids[-1]])
+        node_ids.reverse()
+        while node_ids[-1] != target_id:
+            node_ids.append(previous[1][node_ids[-1]])
+        return best, node_ids
+
+    def stats(self) -> Dict[str, int]:
+        """ Returns the node, shortcut and last query counters """
+        return {"nodes": len(self.nodes), "shortcuts": self.shortcuts, "settled": self.settled}
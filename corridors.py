@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+
+# Attention: Do not import the ev3dev.ev3 module in this file
+"""
+Planning graph over the corridors of a planet
+
+A node with exactly two free paths, both leading to other nodes and back to it (degree 2), only passes the robot
+on. Chains of such nodes are collapsed into one super-edge between the nodes at their ends (junctions), which
+remembers the hops of the chain and the cost to every node on it. Dead ends and loops are junctions, so stubs
+and self-loops become single super-edges as well. A chain which is a cycle without any junction gets one of its
+nodes as junction (anchor).
+
+Searches run on the junctions only. Routes starting or ending inside a chain enter or leave it at the known
+offset, the hops of the route are read from the super-edges at the end.
+"""
+from heapq import heappush, heappop
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from RobolabCode.planet import Direction, Planet, Weight
+
+
+class CorridorGraph:
+    """
+    Compressed planning graph of a planet, kept up to date by Planet.add_paths once Planet.use_corridors was called.
+    Blocked paths are ignored, paths which are not symmetric any more (after overwriting) end a chain and are used
+    in their direction only.
+
+    Example:
+        corridors = CorridorGraph(planet)
+        corridors.route((0, 0), (2, 2)) returns: [((0, 0), Direction.EAST), ((1, 0), Direction.NORTH)]
+        corridors.first_hop((0, 0), (2, 2)) returns: (4, Direction.EAST)
+    """
+
+    def __init__(self, planet: Planet):
+        """
+        :param planet: Planet
+        """
+        self.planet = planet
+        self.junctions = set()  # Nodes which are not inside a chain, including the anchors
+        self.anchors = set()  # Junctions chosen on cycles of degree 2 nodes
+        # junction -> {direction: (goal, goal direction, weight, hops, costs)}, hops are the (node, direction) steps
+        # of the chain, costs[i] the cost from the junction to the node of hops[i]
+        self.edges = {}
+        self.positions = {}  # node inside a chain -> [(junction, direction, index in hops), ...] of both directions
+        self.settled = 0  # nodes settled by the last search
+
+        nodes = set(planet.get_paths())
+        self.junctions = {node for node in nodes if self._is_junction(node)}
+        self._connect(nodes)
+
+    def _is_junction(self, node: Tuple[int, int]) -> bool:
+        """ Checks if node cannot be passed inside a chain: not exactly two free paths, a loop or an asymmetric path """
+        free = 0
+        for direction, (goal, goal_direction, weight) in self.planet.get_paths()[node].items():
+            if weight == -1:
+                continue
+            free += 1
+            if goal == node or self.planet._get_slot(goal, goal_direction) != (node, direction, weight):
+                return True
+        return free != 2
+
+    def _walk(self, junction: Tuple[int, int], direction: Direction):
+        """ Follows the chain leaving junction in direction up to the next junction and stores its super-edge """
+        paths = self.planet.get_paths()
+        hops = []
+        costs = []
+        total = 0
+        node = junction
+        while True:
+            goal, goal_direction, weight = paths[node][direction]
+            hops.append((node, direction))
+            costs.append(total)
+            total += weight
+            if goal in self.junctions or self.planet._get_slot(goal, goal_direction) != (node, direction, weight):
+                break
+            node = goal
+            direction = next(leaving for leaving, path in paths[goal].items()
+                             if leaving != goal_direction and path[2] != -1)
+
+        self.edges.setdefault(junction, {})[hops[0][1]] = (goal, goal_direction, total, hops, costs)
+        for index in range(1, len(hops)):
+            self.positions.setdefault(hops[index][0], []).append((junction, hops[0][1], index))
+
+    def _connect(self, region: Set[Tuple[int, int]]):
+        """ Builds the missing super-edges of the junctions in region, then anchors the cycles left in region """
+        paths = self.planet.get_paths()
+        for node in list(region):
+            if node in self.junctions:
+                known = self.edges.get(node, {})
+                for direction, path in list(paths[node].items()):
+                    if path[2] != -1 and direction not in known:
+                        self._walk(node, direction)
+                        known = self.edges[node]
+        for node in region:
+            if node not in self.junctions and node not in self.positions and node in paths:
+                self.junctions.add(node)
+                self.anchors.add(node)
+                for direction, path in list(paths[node].items()):
+                    if path[2] != -1:
+                        self._walk(node, direction)
+
+    def _remove_edge(self, junction: Tuple[int, int], direction: Direction, region: Set[Tuple[int, int]]):
+        """ Removes a super-edge and the one of the opposite direction, their nodes are added to region """
+        edge = self.edges.get(junction, {}).pop(direction, None)
+        if edge is None:
+            return
+        goal, goal_direction, weight, hops, costs = edge
+        region.add(junction)
+        region.add(goal)
+        for node, leaving in hops[1:]:
+            region.add(node)
+            remaining = [position for position in self.positions[node] if position[:2] != (junction, direction)]
+            if remaining:
+                self.positions[node] = remaining
+            else:
+                del self.positions[node]
+        self._remove_edge(goal, goal_direction, region)
+
+    def _remove_node(self, node: Tuple[int, int], region: Set[Tuple[int, int]]):
+        """ Removes all super-edges which start at or pass node """
+        for junction, direction, index in list(self.positions.get(node, ())):
+            self._remove_edge(junction, direction, region)
+        for direction in list(self.edges.get(node, ())):
+            self._remove_edge(node, direction, region)
+
+    def update(self, nodes: Iterable[Tuple[int, int]]):
+        """
+        Repairs the graph after paths of nodes were written: the chains through these nodes and their neighbours are
+        removed and walked again, all other super-edges are kept
+
+        :param nodes: Coordinates of both ends of every changed path
+        :return: void
+        """
+        paths = self.planet.get_paths()
+        region = set()
+        for node in nodes:
+            region.add(node)
+            region.update(path[0] for path in paths[node].values())
+            self._remove_node(node, region)
+
+        # Nodes which become or stop being junctions break the chains they are on or end
+        checked = set()
+        while len(checked) < len(region):
+            for node in list(region - checked):
+                checked.add(node)
+                was_junction = node in self.junctions
+                if self._is_junction(node):
+                    self.anchors.discard(node)
+                    if not was_junction:
+                        self.junctions.add(node)
+                        self._remove_node(node, region)
+                elif was_junction:
+                    self.junctions.discard(node)
+                    self.anchors.discard(node)
+                    self._remove_node(node, region)
+        self._connect(region)
+
+    def _search(self, start: Tuple[int, int], target: Tuple[int, int]) -> Tuple[Optional[Weight], dict]:
+        """
+        Dijkstra search over the super-edges, from and to nodes inside chains as well
+
+        :return: (distance or None if target is not reachable, parents), parents maps a node to
+                 (previous node, junction, direction, first hop index, end hop index) of the super-edge part taken
+        """
+        # Inside a chain the target is reached from both junctions of its chain, keyed by the super-edge
+        target_entries = {} if target in self.junctions else \
+            {(junction, direction): index for junction, direction, index in self.positions.get(target, ())}
+
+        distances = {start: 0}
+        parents = {}
+        settled = set()
+        heap = [(0, start)]
+        while heap:
+            current_distance, current_node = heappop(heap)
+            if current_node in settled:
+                continue
+            settled.add(current_node)
+            if current_node == target:
+                break
+
+            if current_node in self.junctions:
+                parts = [(current_node, direction, 0) for direction in self.edges.get(current_node, ())]
+            else:
+                parts = self.positions.get(current_node, ())
+            for junction, direction, index in parts:
+                goal, goal_direction, weight, hops, costs = self.edges[junction][direction]
+                target_index = target_entries.get((junction, direction))
+                if target_index is not None and target_index > index:
+                    reached = ((target, current_distance + costs[target_index] - costs[index],
+                                (current_node, junction, direction, index, target_index)),
+                               (goal, current_distance + weight - costs[index],
+                                (current_node, junction, direction, index, len(hops))))
+                else:
+                    reached = ((goal, current_distance + weight - costs[index],
+                                (current_node, junction, direction, index, len(hops))),)
+                for node, new_distance, parent in reached:
+                    if node not in settled and new_distance < distances.get(node, Planet.infinity):
+                        distances[node] = new_distance
+                        parents[node] = parent
+                        heappush(heap, (new_distance, node))
+
+        self.settled = len(settled)
+        return (distances[target] if target in settled else None), parents
+
+    def route(self, start: Tuple[int, int],
+              target: Tuple[int, int]) -> Optional[List[Tuple[Tuple[int, int], Direction]]]:
+        """
+        Returns the shortest route like Planet.shortest_path, the hops of the super-edges are read at the end
+
+        :param start: 2-Tuple
+        :param target: 2-Tuple
+        :return: None, List[] or List[Tuple[Tuple[int, int], Direction]]
+        """
+        paths = self.planet.get_paths()
+        if start not in paths or target not in paths:
+            return None
+        if start == target:
+            return []
+        distance, parents = self._search(start, target)
+        if distance is None:
+            return None
+
+        parts = []
+        node = target
+        while node != start:
+            node, junction, direction, first, end = parents[node]
+            parts.append(self.edges[junction][direction][3][first:end])
+        return [hop for part in reversed(parts) for hop in part]
+
+    def first_hop(self, start: Tuple[int, int], target: Tuple[int, int]) -> Optional[Tuple[Weight, Direction]]:
+        """
+        Returns the cost of the shortest route and its first direction without reading the hops of the route
+
+        :param start: 2-Tuple
+        :param target: 2-Tuple
+        :return: (Integer, Direction), (0, None) if start is the target or None if target is not reachable
+        """
+        if start not in self.planet.get_paths() or target not in self.planet.get_paths():
+            return None
+        if start == target:
+            return 0, None
+        distance, parents = self._search(start, target)
+        if distance is None:
+            return None
+        node = target
+        while True:
+            node, junction, direction, first, end = parents[node]
+            if node == start:
+                return distance, self.edges[junction][direction][3][first][1]
+
+    def stats(self) -> Dict[str, int]:
+        """ Returns the size of the graph compared to the planet """
+        return {
+            "nodes": len(self.planet.get_paths()),
+            "junctions": len(self.junctions),
+            "anchors": len(self.anchors),
+            "super_edges": sum(len(edges) for edges in self.edges.values()),
+        }
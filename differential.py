@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+
+# Attention: Do not import the ev3dev.ev3 module in this file
+"""
+Differential tests of the route engines against the original Dijkstra implementation (RobolabCode.reference)
+
+Random planets with blocked paths, loops, curves, overwritten (asymmetric) paths and several components are
+queried with random start/target pairs, including unknown nodes, unreachable targets and start == target.
+Every engine has to give the same None/[] results as the reference and otherwise a connected route over free
+paths with the same cost. The time of every engine is compared with the time of the reference.
+
+Run it with:
+    python -m RobolabCode.benchmark differential
+"""
+import random
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+from RobolabCode import reference
+from RobolabCode.batch_routes import solve_routes
+from RobolabCode.compact_planet import CompactPlanet
+from RobolabCode.planet import Direction, Planet
+from RobolabCode.planet_generator import Path, generate_paths
+
+Route = Optional[List[Tuple[Tuple[int, int], Direction]]]
+Engine = Callable[[List[Path], List[Tuple[Tuple[int, int], Tuple[int, int]]]], List[Route]]
+"""
+Builds its planet from the paths (included in its time) and answers all (start, target) queries
+"""
+
+
+def random_case(rng: random.Random) -> Tuple[List[Path], List[Tuple[Tuple[int, int], Tuple[int, int]]]]:
+    """
+    Returns the paths of a random planet and random queries on it
+
+    :param rng: random.Random
+    :return: (paths, [(start, target), ...])
+    """
+    paths = []
+    for component in range(rng.randint(1, 3)):
+        offset = component * 20
+        for (start, start_direction), (goal, goal_direction), weight in generate_paths(
+                rng.randint(1, 7), rng.randint(1, 7), density=rng.uniform(0.3, 1.0), blocked_ratio=0.15,
+                loop_ratio=0.1, curve_ratio=0.1, seed=rng.randrange(10 ** 6)):
+            paths.append((((start[0] + offset, start[1]), start_direction),
+                          ((goal[0] + offset, goal[1]), goal_direction), weight))
+    nodes = sorted({vertex[0] for path in paths for vertex in path[:2]})
+    # Paths overwriting a direction of a known path leave the other end of the old path asymmetric
+    for _ in range(rng.choice((0, 0, 1, 3))):
+        if nodes:
+            paths.append(((rng.choice(nodes), rng.choice(list(Direction))),
+                          (rng.choice(nodes), rng.choice(list(Direction))), rng.choice((-1, 1, 5, 20))))
+
+    candidates = nodes + [(99, 99)]
+    queries = [(rng.choice(candidates), rng.choice(candidates)) for _ in range(8)]
+    if nodes:
+        node = rng.choice(nodes)
+        queries.append((node, node))
+    return paths, queries
+
+
+def _planet(paths: List[Path], planet_class=Planet) -> Planet:
+    planet = planet_class()
+    for start, target, weight in paths:  # one by one, so every overwrite happens in the order of the paths
+        planet.add_path(start, target, weight)
+    return planet
+
+
+def _reference(paths, queries) -> List[Route]:
+    planet = _planet(paths)
+    nodes = planet.get_paths()
+    # The original raises for an unknown start, Planet.shortest_path returns None
+    return [reference.shortest_path(planet, start, target) if start in nodes else None for start, target in queries]
+
+
+def _search(paths, queries, build=None, **options) -> List[Route]:
+    planet = _planet(paths)
+    if build is not None:
+        build(planet)
+    return [planet.shortest_path(start, target, **options) for start, target in queries]
+
+
+def _astar(paths, queries) -> List[Route]:
+    planet = _planet(paths)
+    return [planet.shortest_path(start, target, planet.manhattan_heuristic) for start, target in queries]
+
+
+def _route_memo(paths, queries) -> List[Route]:
+    planet = _planet(paths)
+    for start, target in queries:
+        planet.shortest_path(start, target)
+    return [planet.shortest_path(start, target) for start, target in queries]
+
+
+def _corridors_incremental(paths, queries) -> List[Route]:
+    planet = Planet()
+    planet.use_corridors()
+    for start, target, weight in paths:
+        planet.add_path(start, target, weight)
+    return [planet.shortest_path(start, target) for start, target in queries]
+
+
+def _compact(paths, queries) -> List[Route]:
+    planet = _planet(paths, CompactPlanet)
+    return [planet.shortest_path(start, target) for start, target in queries]
+
+
+def _distance_matrix(paths, queries) -> List[Route]:
+    matrix = _planet(paths).distance_matrix()
+    return [matrix.route(start, target) for start, target in queries]
+
+
+def _batch(paths, queries) -> List[Route]:
+    return solve_routes(_planet(paths), queries, processes=1)
+
+
+ENGINES = {
+    "dijkstra": _search,
+    "astar": _astar,
+    "bidirectional": lambda paths, queries: _search(paths, queries, bidirectional=True),
+    "route_memo": _route_memo,
+    "hierarchy": lambda paths, queries: _search(paths, queries, Planet.build_hierarchy),
+    "corridors": lambda paths, queries: _search(paths, queries, Planet.use_corridors),
+    "corridors_incremental": _corridors_incremental,
+    "compact": _compact,
+    "distance_matrix": _distance_matrix,
+    "batch": _batch,
+}
+"""
+Route engines checked by run_differential, name -> Engine
+"""
+
+
+def check_route(planet: Planet, start: Tuple[int, int], target: Tuple[int, int], route: Route,
+                expected: Route) -> Optional[str]:
+    """
+    Compares a route with the route of the reference
+
+    :return: None if the route is correct, otherwise the reason
+    """
+    if not expected or not route:
+        return None if route == expected and type(route) is type(expected) else f"{route!r} instead of {expected!r}"
+    paths = planet.get_paths()
+    node = start
+    cost = 0
+    for coordinates, direction in route:
+        path = paths.get(coordinates, {}).get(direction)
+        if coordinates != node or path is None or path[2] == -1:
+            return f"{(coordinates, direction)} does not continue the route at {node}"
+        node = path[0]
+        cost += path[2]
+    if node != target:
+        return f"the route ends at {node}"
+    expected_cost = sum(paths[coordinates][direction][2] for coordinates, direction in expected)
+    if cost != expected_cost:
+        return f"the route costs {cost} instead of {expected_cost}"
+    return None
+
+
+def run_differential(cases: int = 1000, seed: int = 0, engines: Optional[Dict[str, Engine]] = None) -> dict:
+    """
+    Runs every engine on the same random cases as the reference
+
+    Example:
+        run_differential(100) returns:
+            {"reference": {"time": 0.9}, "dijkstra": {"queries": 900, "failures": [], "time": 0.05}, ...}
+    :param cases: Integer, number of random planets
+    :param seed: Integer, the same seed always gives the same planets and queries
+    :param engines: Dict name -> Engine, ENGINES by default
+    :return: Dict name -> results, failures are (case, start, target, reason)
+    """
+    engines = ENGINES if engines is None else engines
+    results = {"reference": {"queries": 0, "failures": [], "time": 0.0}}
+    results.update((name, {"queries": 0, "failures": [], "time": 0.0}) for name in engines)
+    rng = random.Random(seed)
+    for case in range(cases):
+        paths, queries = random_case(rng)
+        planet = _planet(paths)
+
+        begin = time.perf_counter()
+        expected = _reference(paths, queries)
+        results["reference"]["time"] += time.perf_counter() - begin
+        results["reference"]["queries"] += len(queries)
+
+        for name, engine in engines.items():
+            result = results[name]
+            begin = time.perf_counter()
+            try:
+                routes = engine(paths, queries)
+            except Exception as error:
+                routes = [error] * len(queries)
+            result["time"] += time.perf_counter() - begin
+            result["queries"] += len(queries)
+            for (start, target), route, expected_route in zip(queries, routes, expected):
+                reason = f"raised {route!r}" if isinstance(route, Exception) else \
+                    check_route(planet, start, target, route, expected_route)
+                if reason is not None:
+                    result["failures"].append((case, start, target, reason))
+    return results
+
+
+def print_report(results: dict):
+    """ Prints the pass/fail and speedup table of run_differential """
+    reference_time = results["reference"]["time"]
+    print(f"{'engine':>22} {'queries':>8} {'failures':>9} {'result':>7} {'time [ms]':>10} {'speedup':>8}")
+    for name, result in results.items():
+        speedup = reference_time / result["time"] if result["time"] else float('inf')
+        print(f"{name:>22} {result['queries']:>8} {len(result['failures']):>9} "
+              f"{'pass' if not result['failures'] else 'FAIL':>7} {result['time'] * 1000:>10.1f} {speedup:>7.1f}x")
+    for name, result in results.items():
+        for case, start, target, reason in result["failures"][:5]:
+            print(f"{name}: case {case}, {start} -> {target}: {reason}")
@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+
+# Attention: Do not import the ev3dev.ev3 module in this file
+from array import array
+from typing import Optional, List, Tuple, Iterable
+
+from RobolabCode.planet import DIRECTIONS, Direction, Planet, Weight
+
+try:
+    import numpy
+    from scipy.sparse import csr_matrix
+    from scipy.sparse.csgraph import dijkstra
+except ImportError:  # SciPy is not available on the EV3 brick
+    numpy = None
+
+NO_NODE = -1
+
+
+class DistanceMatrix:
+    """
+    Shortest distances, predecessors and first directions from a set of source nodes to every node of a planet.
+
+    Rows belong to the sources, columns to all nodes of the planet. Every row holds the complete shortest path tree
+    of its source, so routes from a source are answered without another search.
+    With SciPy all rows are computed in one batched csgraph.dijkstra call, otherwise one search per source is run.
+    """
+
+    def __init__(self, planet: Planet, sources: Optional[Iterable[Tuple[int, int]]] = None,
+                 use_scipy: Optional[bool] = None):
+        """
+        :param planet: Planet
+        :param sources: Coordinates of the rows, all nodes if None
+        :param use_scipy: Force (True) or avoid (False) SciPy, by default it is used if installed
+        """
+        paths = planet.get_paths()
+        self.nodes = list(paths)  # column index -> coordinates
+        self.index = {node: column for column, node in enumerate(self.nodes)}
+        self.sources = self.nodes if sources is None else [node for node in sources if node in self.index]
+        self.source_index = {node: row for row, node in enumerate(self.sources)}
+
+        # Rows per source: distance (Planet.infinity if unreachable), predecessor column (-1 if none),
+        # direction slot taken at the predecessor and direction slot taken at the source (-1 if none)
+        self.distances = []
+        self.predecessors = []
+        self.directions = []
+        self.first_hops = []
+
+        if use_scipy is None:
+            use_scipy = numpy is not None
+        if use_scipy:
+            self._compute_scipy(paths)
+        else:
+            self._compute_dijkstra(planet)
+
+    def _compute_dijkstra(self, planet: Planet):
+        """ Fills the rows with one search per source """
+        index, size = self.index, len(self.nodes)
+        for source in self.sources:
+            distances, nodes_to_target, settled_order = planet._dijkstra(source)
+            distance_row = array('q', [Planet.infinity]) * size
+            predecessor_row = array('i', [NO_NODE]) * size
+            direction_row = array('b', [NO_NODE]) * size
+            for node in settled_order:
+                distance_row[index[node]] = distances[node]
+            for node, (previous_node, direction) in nodes_to_target.items():
+                predecessor_row[index[node]] = index[previous_node]
+                direction_row[index[node]] = direction // 90
+            self._add_row(source, distance_row, predecessor_row, direction_row, settled_order)
+
+    def _compute_scipy(self, paths: dict):
+        """ Fills the rows with a single batched csgraph.dijkstra call """
+        index, size = self.index, len(self.nodes)
+
+        # Cheapest open path between every pair of different nodes, csr_matrix would add up parallel paths
+        cheapest = {}
+        for node, directions in paths.items():
+            for direction, (goal, goal_direction, weight) in directions.items():
+                key = (index[node], index[goal])
+                if weight != -1 and key[0] != key[1] and (key not in cheapest or weight < cheapest[key][0]):
+                    cheapest[key] = (weight, direction // 90)
+
+        if cheapest:
+            rows, columns = zip(*cheapest)
+            weights = [value[0] for value in cheapest.values()]
+        else:
+            rows, columns, weights = (), (), ()
+        graph = csr_matrix((weights, (rows, columns)), shape=(size, size), dtype=numpy.float64)
+        source_columns = [index[source] for source in self.sources]
+        distances, predecessors = dijkstra(graph, directed=True, indices=source_columns, return_predecessors=True)
+
+        for row, source in enumerate(self.sources):
+            reachable = numpy.isfinite(distances[row])
+            distance_row = array('q', numpy.where(reachable, distances[row], Planet.infinity).astype(numpy.int64))
+            predecessor_row = array('i', numpy.where(predecessors[row] < 0, NO_NODE, predecessors[row]).astype(numpy.int32))
+            direction_row = array('b', [NO_NODE]) * size
+            for column, previous in enumerate(predecessor_row):
+                if previous != NO_NODE:
+                    direction_row[column] = cheapest[(previous, column)][1]
+            # Sorting by distance puts every node behind its predecessor (weights are never 0)
+            order = [self.nodes[column] for column in numpy.argsort(distances[row], kind='stable') if reachable[column]]
+            self._add_row(source, distance_row, predecessor_row, direction_row, order)
+
+    def _add_row(self, source: Tuple[int, int], distance_row: array, predecessor_row: array, direction_row: array,
+                 order: List[Tuple[int, int]]):
+        """ Stores the rows of source and derives the first directions, order lists the reachable nodes by distance """
+        index, source_column = self.index, self.index[source]
+        first_hop_row = array('b', [NO_NODE]) * len(self.nodes)
+        for node in order:
+            column = index[node]
+            previous = predecessor_row[column]
+            if previous == source_column:
+                first_hop_row[column] = direction_row[column]
+            elif previous != NO_NODE:
+                first_hop_row[column] = first_hop_row[previous]
+        self.distances.append(distance_row)
+        self.predecessors.append(predecessor_row)
+        self.directions.append(direction_row)
+        self.first_hops.append(first_hop_row)
+
+    def distance(self, start: Tuple[int, int], target: Tuple[int, int]) -> Optional[Weight]:
+        """
+        Returns the cost of the shortest path or None if the target is unknown or not reachable
+
+        :param start: 2-Tuple, one of the sources
+        :param target: 2-Tuple
+        :return: Integer or None
+        """
+        if target not in self.index:
+            return None
+        distance = self.distances[self.source_index[start]][self.index[target]]
+        return None if distance == Planet.infinity else distance
+
+    def first_hop(self, start: Tuple[int, int], target: Tuple[int, int]) -> Optional[Direction]:
+        """
+        Returns the first direction of the shortest path or None if there is none (or start is the target)
+
+        :param start: 2-Tuple, one of the sources
+        :param target: 2-Tuple
+        :return: Direction or None
+        """
+        if target not in self.index:
+            return None
+        slot = self.first_hops[self.source_index[start]][self.index[target]]
+        return None if slot == NO_NODE else DIRECTIONS[slot]
+
+    def route(self, start: Tuple[int, int], target: Tuple[int, int]) -> Optional[List[Tuple[Tuple[int, int], Direction]]]:
+        """
+        Returns the shortest path like Planet.shortest_path
+
+        :param start: 2-Tuple, one of the sources
+        :param target: 2-Tuple
+        :return: None, List[] or List[Tuple[Tuple[int, int], Direction]]
+        """
+        if target not in self.index or start not in self.index:
+            return None
+        if start == target:
+            return []
+        row = self.source_index[start]
+        predecessors, directions = self.predecessors[row], self.directions[row]
+        column = self.index[target]
+        if predecessors[column] == NO_NODE:
+            return None
+
+        road_to_the_node = []
+        start_column = self.index[start]
+        while column != start_column:
+            previous = predecessors[column]
+            road_to_the_node.append((self.nodes[previous], DIRECTIONS[directions[column]]))
+            column = previous
+        road_to_the_node.reverse()
+        return road_to_the_node
@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+
+# Attention: Do not import the ev3dev.ev3 module in this file
+"""
+Opt-in instrumentation of the planning calls of a Planet
+
+Instrumentation.attach replaces the planning methods of one planet instance by timing wrappers, detach removes them
+again. A planet which was never attached runs the plain methods, so there is no cost when instrumentation is off.
+
+Example:
+    with instrument(planet) as profile:
+        planet.shortest_path((0, 0), (2, 2))
+    profile.summary()["calls"]["shortest_path"]["count"] returns: 1
+"""
+import json
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from functools import wraps
+from typing import Dict, List
+
+from RobolabCode.planet import Planet
+
+CALLS = ("shortest_path", "intelligent_explore", "next_direction", "handle_unveiled_paths", "add_path", "add_paths")
+"""
+Public planning methods which are timed
+"""
+
+SEARCHES = ("_dijkstra", "_astar", "_bidirectional")
+"""
+Search methods whose expanded nodes and edges are counted, all of them return the expanded nodes as third value
+"""
+
+ENGINE_SEARCHES = ("_hierarchy_route", "_corridor_route", "_corridor_first_hop")
+"""
+Searches on the hierarchy of build_hierarchy and the corridor graph of use_corridors, their settled nodes are counted
+as expanded nodes (from planet.expanded_nodes), their edges are not counted
+"""
+
+TIME_BUCKETS = (1e-5, 1e-4, 1e-3, 1e-2, 1e-1, 1.0)
+"""
+Upper bounds in seconds of the wall time histogram, the last bucket counts everything slower than one second
+"""
+
+SIZE_BUCKETS = (10, 100, 1000, 10000, 100000)
+"""
+Upper bounds of the histograms of expanded nodes and edges per search
+"""
+
+
+class Histogram:
+    """
+    Counts values in buckets with fixed upper bounds and keeps count, total and maximum
+    """
+
+    def __init__(self, bounds: tuple):
+        self.bounds = bounds
+        self.buckets = [0] * (len(bounds) + 1)
+        self.count = 0
+        self.total = 0
+        self.max = 0
+
+    def add(self, value):
+        self.buckets[bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+
+    def summary(self) -> dict:
+        labels = [f"<={bound:g}" for bound in self.bounds] + [f">{self.bounds[-1]:g}"]
+        return {
+            "count": self.count,
+            "total": self.total,
+            "mean": self.total / self.count if self.count else 0,
+            "max": self.max,
+            "histogram": dict(zip(labels, self.buckets)),
+        }
+
+
+class Instrumentation:
+    """
+    Records call counts and wall times of the planning calls and the nodes and edges expanded by every search
+    of the attached planets.
+    Nested calls are recorded on their own as well, e.g. next_direction includes the time of its shortest_path call
+    and add_path the time of its add_paths call.
+    """
+
+    def __init__(self):
+        self.calls: Dict[str, Histogram] = {name: Histogram(TIME_BUCKETS) for name in CALLS}
+        self.search_times: Dict[str, Histogram] = {name: Histogram(TIME_BUCKETS)
+                                                   for name in SEARCHES + ENGINE_SEARCHES}
+        self.expanded_nodes = Histogram(SIZE_BUCKETS)
+        self.expanded_edges = Histogram(SIZE_BUCKETS)
+        self.planets: List[Planet] = []
+
+    def attach(self, planet: Planet) -> Planet:
+        """
+        Starts recording the calls of planet
+
+        :param planet: Planet
+        :return: planet
+        """
+        for name in CALLS:
+            setattr(planet, name, self._timed(getattr(planet, name), self.calls[name]))
+        for name in SEARCHES:
+            setattr(planet, name, self._counted(planet, getattr(planet, name), self.search_times[name]))
+        for name in ENGINE_SEARCHES:
+            setattr(planet, name, self._settled(planet, getattr(planet, name), self.search_times[name]))
+        self.planets.append(planet)
+        return planet
+
+    def detach(self, planet: Planet):
+        """
+        Stops recording the calls of planet, the class methods are used again
+
+        :param planet: Planet
+        :return: void
+        """
+        for name in CALLS + SEARCHES + ENGINE_SEARCHES:
+            planet.__dict__.pop(name, None)
+        self.planets.remove(planet)
+
+    @staticmethod
+    def _timed(method, histogram: Histogram):
+        @wraps(method)
+        def wrapper(*args, **kwargs):
+            begin = time.perf_counter()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                histogram.add(time.perf_counter() - begin)
+        return wrapper
+
+    def _counted(self, planet: Planet, method, histogram: Histogram):
+        @wraps(method)
+        def wrapper(*args, **kwargs):
+            begin = time.perf_counter()
+            result = method(*args, **kwargs)
+            histogram.add(time.perf_counter() - begin)
+
+            # Counted after the clock stopped, the edges are the paths leaving the expanded nodes
+            expanded_order = result[2]
+            paths = planet.get_paths()
+            self.expanded_nodes.add(len(expanded_order))
+            self.expanded_edges.add(sum(len(paths[node]) for node in expanded_order))
+            return result
+        return wrapper
+
+    def _settled(self, planet: Planet, method, histogram: Histogram):
+        @wraps(method)
+        def wrapper(*args, **kwargs):
+            begin = time.perf_counter()
+            result = method(*args, **kwargs)
+            histogram.add(time.perf_counter() - begin)
+            self.expanded_nodes.add(planet.expanded_nodes)
+            return result
+        return wrapper
+
+    def summary(self) -> dict:
+        """
+        Returns all recorded values, times are in seconds
+
+        Example:
+            summary() returns: {"calls": {"shortest_path": {"count": 3, "total": 0.002, "mean": ..., "max": ...,
+                                                            "histogram": {"<=1e-05": 0, "<=0.0001": 1, ...}}, ...},
+                                "searches": {"_dijkstra": {...}, "_astar": {...}, "_corridor_route": {...}, ...},
+                                "expanded_nodes": {...}, "expanded_edges": {...}}
+        :return: Dict
+        """
+        return {
+            "calls": {name: histogram.summary() for name, histogram in self.calls.items()},
+            "searches": {name: histogram.summary() for name, histogram in self.search_times.items()},
+            "expanded_nodes": self.expanded_nodes.summary(),
+            "expanded_edges": self.expanded_edges.summary(),
+        }
+
+    def to_json(self, path: str):
+        """
+        Writes the summary to a JSON file
+
+        :param path: String, file name
+        :return: void
+        """
+        with open(path, 'w') as file:
+            json.dump(self.summary(), file, indent=2)
+
+
+@contextmanager
+def instrument(planet: Planet):
+    """
+    Records the planning calls of planet inside the with block
+
+    :param planet: Planet
+    :return: Instrumentation
+    """
+    instrumentation = Instrumentation()
+    instrumentation.attach(planet)
+    try:
+        yield instrumentation
+    finally:
+        instrumentation.detach(planet)
@@ -1,20 +1,44 @@
 #!/usr/bin/env python3
 
-import ev3dev.ev3 as ev3
-import logging
 import os
-import paho.mqtt.client as mqtt
-import uuid
 import signal
+import time
+import uuid
 
-from movement import Robot
+# The hardware, MQTT and planning modules are imported in run(): loading this file only costs the few standard
+# modules above, and the profiling code is only loaded when ROBOLAB_PROFILE is set.
+# Run "python3 -m compileall -q ." after deploying so the brick does not compile the sources at startup,
+# "python -m RobolabCode.benchmark import" checks the import time.
 
-from communication import *
+client = None  # DO NOT EDIT
 
-from odometry import Odometry
-from RobolabCode.planet import Planet
 
-client = None  # DO NOT EDIT
+class RobotDriver:
+    """
+    Connects the movement and odometry of the robot to the decision loop in RobolabCode.mission
+    """
+
+    def __init__(self, robot, odo):
+        self.robot = robot
+        self.odo = odo
+        # Drive to the first node
+        self.last_color, current_status, odo_data = robot.line_following()
+
+    def scan(self, orientation):
+        return self.robot.scan_outgoing_paths(orientation)
+
+    def drive(self, current_coord, current_orient, chosen_direction):
+        import ev3dev.ev3 as ev3
+        self.robot.turn_direction(current_orient, chosen_direction)
+        ev3.Sound.play_song((('D4', 'e3'),))
+        current_color, current_status, odo_data = self.robot.line_following()
+        if current_status == "blocked":
+            vertex_approx = (current_coord, chosen_direction)
+        else:
+            vertex_approx = self.odo.calculate_distance(current_coord, chosen_direction, odo_data, self.last_color,
+                                                        current_color)
+        self.last_color = current_color
+        return current_status, vertex_approx
 
 
 def run():
@@ -24,6 +48,9 @@ def run():
     # Your script isn't able to close the client after crashing.
     global client
 
+    import logging
+    import paho.mqtt.client as mqtt
+
     client_id = '130-' + str(uuid.uuid4())  # Replace YOURGROUPID with your group ID
     client = mqtt.Client(client_id=client_id,  # Unique Client-ID to recognize our program
                          clean_session=True,  # We want a clean session after disconnect or abort/crash
@@ -43,82 +70,40 @@ def run():
     # THE EXECUTION OF ALL CODE SHALL BE STARTED FROM WITHIN THIS FUNCTION.
     # ADD YOUR OWN IMPLEMENTATION HEREAFTER.
 
+    from movement import Robot
+    from odometry import Odometry
+    from communication import Communication
+    from RobolabCode.mission import SpeculativePlanner, run_mission
+    from RobolabCode.planet import Planet
+    from RobolabCode.replay import MissionRecorder
+
     robot = Robot()
     odo = Odometry()
     explorer = Planet()
     com = Communication(client, logger)
     com.client.loop_start()  # start listening to incoming messages
 
-    last_color, current_status, odo_data = robot.line_following()
-
-    # ready-message
-    current_coord, current_orient = com.return_message("ready")[1]  # (x, y)  # Direction.*
-    current_vertex = (current_coord, current_orient, last_color)  # ((x, y), Direction.*, "blue" | "red")
-
-    outgoing_paths = robot.scan_outgoing_paths(current_orient)
-    explorer.visited[current_coord] = outgoing_paths
-    chosen_direction = explorer.intelligent_explore(current_coord)
-
-    com.return_message("target")
-
-
-    while not (com.is_target_reached() or com.is_exploration_complete(chosen_direction)):
-
-        # pathSelect-message
-        forced_path = com.return_message("pathSelect", [current_coord, chosen_direction])
-        if len(forced_path):
-            chosen_direction = forced_path[0]
-
-        robot.turn_direction(current_orient, chosen_direction)
-        ev3.Sound.play_song((('D4', 'e3'),))
-        current_color, current_status, odo_data = robot.line_following()
-        com.clear_values()
-        if current_status == "blocked":
-            vertex_approx = (current_vertex[0], chosen_direction)
-        else:
-            vertex_approx = odo.calculate_distance(current_coord, chosen_direction, odo_data, last_color, current_color)
-
-        start_vertex, end_vertex, path_weight, path_status = com.return_message("path",
-                                                                                    [(current_coord, chosen_direction),
-                                                                                     vertex_approx, current_status])
-        last_color = current_color
-
-        explorer.add_path(start_vertex, end_vertex, int(path_weight))
-        current_vertex = (end_vertex[0], (end_vertex[1] + 180) % 360)
-        print(f"current_vertex: {current_vertex}")  # DEBUG
-        current_coord = current_vertex[0]
-        current_orient = current_vertex[1]
-
-        # target-message
-        target_message = com.return_message("target")
-        print("target message: ", target_message)
-        if target_message == "done":
-            break
-
-        if current_coord not in explorer.visited.keys():
-            outgoing_paths = robot.scan_outgoing_paths(current_orient)
-            if current_coord in explorer.unvisited:
-                explorer.remove_if_blocked(current_coord, outgoing_paths)
-            else:
-                explorer.visited[current_coord] = outgoing_paths
-
-
-        unveiled_paths = com.return_message("pathUnveiled")
-        explorer.remove_driven_paths(start_vertex, end_vertex)
-        explorer.handle_unveiled_paths(unveiled_paths)
-
-        if current_coord in explorer.paths.keys() and current_coord in explorer.visited.keys():
-            for direction in explorer.paths[current_coord].keys():
-                if direction in explorer.visited[current_coord]:
-                    explorer.visited[current_coord].remove(direction)
-
+    # Set ROBOLAB_PROFILE=1 to write the timings of the planning calls to logs/planning_profile.json
+    profile = None
+    if os.environ.get('ROBOLAB_PROFILE'):
+        from RobolabCode.instrumentation import Instrumentation
+        profile = Instrumentation()
+        profile.attach(explorer)
 
+    # Every message and decision is appended to logs/mission.rlog, "python -m RobolabCode.replay" replays it
+    recorder = MissionRecorder(com, RobotDriver(robot, odo), curr_dir + '/../logs/mission.rlog')
+    try:
+        # The next decision is planned while the robot drives known paths
+        chosen_direction = run_mission(explorer, recorder, recorder, recorder.decision,
+                                       speculation=SpeculativePlanner(explorer))
+    finally:
+        recorder.close()  # the end record is written after a crash as well, the replay stops at it
 
-        chosen_direction = explorer.next_direction(target_message, current_coord)
+    if profile is not None:
+        profile.to_json(curr_dir + '/../logs/planning_profile.json')
 
     if not com.is_target_reached():
         print("explo complete:", com.is_exploration_complete(chosen_direction))
-        com.return_message("explorationComplete")
 
     time.sleep(3)  # wait 3 seconds for messages
 
@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+
+# Attention: Do not import the ev3dev.ev3 module in this file
+"""
+Decision loop of a mission, shared by main.run (real robot and server) and the offline simulator
+
+The loop talks to two objects:
+    com    the server connection, like communication.Communication:
+           return_message(kind, args=None), clear_values(), is_target_reached(), is_exploration_complete(direction)
+    robot  drives and scans:
+           scan(orientation) -> [Direction, ...] outgoing paths at the current node
+           drive(coordinates, orientation, direction) -> (status, vertex_approx), status is "free" or "blocked"
+"""
+import sys
+import threading
+import time
+from typing import TYPE_CHECKING
+
+from RobolabCode.planet import Direction, Planet
+
+if TYPE_CHECKING:
+    from typing import Callable, Optional
+
+    Decision = Callable[[tuple, Optional[Direction], float], None]
+    """
+    Called after every decision with the current coordinates, the chosen direction and the seconds spent in the planet
+    """
+
+
+class SpeculativePlanner:
+    """
+    Computes the next decision in a background thread while the robot drives a path.
+
+    Only drives along a known free path to a visited node are speculated on: there the server's answer, the
+    scan and the closing of driven paths cannot change the planet, so next_direction at the arrival node gives the
+    same direction after the drive as during it. The thread plans on a Planet.planning_copy taken before the drive
+    and never writes to the explorer. Its decision (with the route and tour behind it) is adopted if the server
+    confirms the predicted path to the predicted node, the target did not change, no paths were unveiled and the
+    generation of the explorer was the one of the copy when the drive ended, otherwise the direction is computed
+    again. The explorer is not changed while the thread runs, it is joined first.
+
+    The planning thread competes with the motor loop for the GIL, the switch interval is lowered while it runs so
+    the motor loop waits at most switch_interval seconds for it.
+    """
+
+    def __init__(self, explorer: Planet, switch_interval: float = 0.001):
+        """
+        :param explorer: Planet
+        :param switch_interval: Float, sys.setswitchinterval while the thread runs (the default of Python is 0.005)
+        """
+        self.explorer = explorer
+        self.switch_interval = switch_interval
+        self.thread = None
+        self.prediction = None  # ((coordinates, direction), (goal, goal direction), weight, target)
+        self.planet = None  # planning copy of the explorer
+        self.generation = None  # generation of the explorer when the copy was taken
+        self.changed = False  # the explorer changed while the thread ran
+        self.direction = None
+        self.failed = False
+        self._switch_interval = None
+        self.hits = 0
+        self.misses = 0
+        self.skipped = 0
+
+    def start(self, coordinates: tuple, direction: Direction, target):
+        """
+        Starts the speculation for a drive from coordinates in direction, if the arrival can be predicted
+
+        :param coordinates: 2-Tuple
+        :param direction: Direction
+        :param target: 2-Tuple or None, the last target message
+        :return: void
+        """
+        explorer = self.explorer
+        self.prediction = None
+        path = explorer._get_slot(coordinates, direction)
+        if path is None or path[2] == -1 or not explorer.frontier.is_visited(path[0]) or \
+                explorer.frontier.is_open(coordinates, direction) or explorer.frontier.is_open(path[0], path[1]):
+            self.skipped += 1
+            return
+        self.prediction = ((coordinates, direction), (path[0], path[1]), path[2], target)
+        self.planet, self.generation = explorer.planning_copy(), explorer.generation
+        self.direction, self.failed, self.changed = None, False, False
+        self._switch_interval = sys.getswitchinterval()
+        sys.setswitchinterval(self.switch_interval)
+        self.thread = threading.Thread(target=self._run, args=(self.planet, path[0], target), daemon=True)
+        self.thread.start()
+
+    def _run(self, planet: Planet, coordinates: tuple, target):
+        try:
+            self.direction = planet.next_direction(target, coordinates)
+        except Exception:
+            self.failed = True
+
+    def join(self):
+        """ Waits for the running speculation, must be called before the planet is changed """
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+            sys.setswitchinterval(self._switch_interval)
+            self.changed = self.explorer.generation != self.generation
+
+    def result(self, start_vertex: tuple, end_vertex: tuple, weight: int, target, unveiled_paths: list):
+        """
+        Returns (True, direction) if the speculated direction is valid for the reported drive, else (False, None)
+
+        :param start_vertex: (coordinates, direction) reported by the server
+        :param end_vertex: (coordinates, direction) reported by the server
+        :param weight: Integer, reported by the server
+        :param target: 2-Tuple or None, the current target message
+        :param unveiled_paths: List, the current pathUnveiled message
+        :return: (Boolean, Direction or None)
+        """
+        self.join()
+        if self.prediction is None:
+            return False, None
+        prediction, self.prediction = self.prediction, None
+        planet, self.planet = self.planet, None
+        if self.failed or self.changed or unveiled_paths or \
+                prediction != (tuple(start_vertex), tuple(end_vertex), weight, target):
+            self.misses += 1
+            return False, None
+        self.explorer.adopt_plan(planet)
+        self.hits += 1
+        return True, self.direction
+
+    def stats(self) -> dict:
+        """ Returns the hit/miss/skipped counters """
+        return {"hits": self.hits, "misses": self.misses, "skipped": self.skipped}
+
+
+def run_mission(explorer: Planet, com, robot, on_decision: 'Optional[Decision]' = None,
+                speculation: 'Optional[SpeculativePlanner]' = None):
+    """
+    Explores the planet or drives to the target until the server is satisfied
+
+    :param explorer: Planet
+    :param com: Communication
+    :param robot: Robot adapter with scan and drive
+    :param on_decision: Decision or None
+    :param speculation: SpeculativePlanner of explorer to plan while driving, or None to plan at every node
+    :return: The last chosen direction
+    """
+    # ready-message
+    current_coord, current_orient = com.return_message("ready")[1]  # (x, y)  # Direction.*
+
+    begin = time.perf_counter()
+    outgoing_paths = robot.scan(current_orient)
+    explorer.frontier.visit(current_coord, outgoing_paths)
+    chosen_direction = explorer.intelligent_explore(current_coord)
+    if on_decision is not None:
+        on_decision(current_coord, chosen_direction, time.perf_counter() - begin)
+
+    target_message = com.return_message("target")
+
+    while not (com.is_target_reached() or com.is_exploration_complete(chosen_direction)):
+
+        # pathSelect-message
+        forced_path = com.return_message("pathSelect", [current_coord, chosen_direction])
+        if len(forced_path):
+            chosen_direction = forced_path[0]
+
+        if speculation is not None:
+            speculation.start(current_coord, chosen_direction, target_message)
+        current_status, vertex_approx = robot.drive(current_coord, current_orient, chosen_direction)
+        com.clear_values()
+
+        start_vertex, end_vertex, path_weight, path_status = com.return_message("path",
+                                                                                [(current_coord, chosen_direction),
+                                                                                 vertex_approx, current_status])
+        planning_time = 0.0
+        if speculation is not None:
+            begin = time.perf_counter()
+            speculation.join()
+            planning_time += time.perf_counter() - begin
+
+        begin = time.perf_counter()
+        explorer.add_path(start_vertex, end_vertex, int(path_weight))
+        current_coord = end_vertex[0]
+        current_orient = Direction((end_vertex[1] + 180) % 360)
+        planning_time += time.perf_counter() - begin
+
+        # target-message
+        target_message = com.return_message("target")
+        if target_message == "done":
+            break
+
+        if not explorer.frontier.is_visited(current_coord):
+            outgoing_paths = robot.scan(current_orient)
+            begin = time.perf_counter()
+            if current_coord in explorer.frontier.unvisited:
+                explorer.remove_if_blocked(current_coord, outgoing_paths)
+            else:
+                explorer.frontier.visit(current_coord, outgoing_paths)
+            planning_time += time.perf_counter() - begin
+
+        unveiled_paths = com.return_message("pathUnveiled")
+        begin = time.perf_counter()
+        explorer.remove_driven_paths(start_vertex, end_vertex)
+        explorer.handle_unveiled_paths(unveiled_paths)
+        explorer.close_known_paths(current_coord)
+
+        speculated = False
+        if speculation is not None:
+            speculated, chosen_direction = speculation.result(start_vertex, end_vertex, int(path_weight),
+                                                              target_message, unveiled_paths)
+        if not speculated:
+            chosen_direction = explorer.next_direction(target_message, current_coord)
+        planning_time += time.perf_counter() - begin
+        if on_decision is not None:
+            on_decision(current_coord, chosen_direction, planning_time)
+
+    if not com.is_target_reached():
+        com.return_message("explorationComplete")
+    return chosen_direction
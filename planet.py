@@ -2,7 +2,12 @@
 
 # Attention: Do not import the ev3dev.ev3 module in this file
 from enum import IntEnum, unique
-from typing import Optional, List, Tuple, Dict
+from heapq import heappush, heappop, heapify
+from typing import TYPE_CHECKING
+
+# The annotations are strings and the names are only imported by type checkers
+if TYPE_CHECKING:
+    from typing import Optional, List, Tuple, Dict, Callable, Iterable
 
 
 @unique
@@ -23,6 +28,13 @@ Value:  -1 if blocked path
         never 0
 """
 
+if TYPE_CHECKING:
+    Heuristic = Callable[[Tuple[int, int], Tuple[int, int]], float]
+    """
+    Lower bound of the path cost between a node and the target, used by the A* mode of shortest_path.
+    Must never overestimate (admissible), otherwise the returned path may not be the shortest one.
+    """
+
 
 class Planet:
     """
@@ -30,14 +42,30 @@ class Planet:
     it according to the specifications
     """
     infinity = 1000000000000000000
+    tree_cache_size = 8  # Number of shortest path trees kept in tree_cache
+    route_memo_size = 64  # Number of shortest_path results kept in route_memo
 
     def __init__(self):
         """ Initializes the data structure """
         self.paths = {}
-        self.visited = {}  # key: coordinates, values: [Direction.*, ...]
-        self.unvisited = []  # Coordinates that we get from unveiledPaths (if they are not in visited dictionary)
+        self.frontier = Frontier()  # Open directions of visited nodes and the nodes known from unveiledPaths only
+        self.frontier_index = FrontierIndex(self)
+        self.tree_cache = PathTreeCache(self.tree_cache_size)
+        self.route_memo = RouteMemo(self.route_memo_size)
+        self.active_route = ActiveRoute()  # Route of next_direction to the current target, followed until it changes
+        self.generation = 0  # Bumped by every change of paths or frontier, tags the results in route_memo
+        self.target_heuristic = None  # Heuristic used by next_direction for targets, e.g. self.manhattan_heuristic
+        self.target_bidirectional = False  # next_direction searches targets from both ends (without a heuristic)
+        self.hierarchy = None  # ContractionHierarchy of build_hierarchy, dropped when a path changes
+        self.corridors = None  # CorridorGraph of use_corridors, repaired when a path changes
+        self.tour_planner = None  # Used by intelligent_explore instead of the nearest frontier node, see tour_planner
+        self.expanded_nodes = 0  # Number of nodes expanded by the last search (0 if answered from tree_cache)
+        self._manhattan_scale = None  # Smallest weight per grid unit of all known paths
+        # node -> {(node, direction), ...} of the paths leading to node whose entry at node points elsewhere (after
+        # overwriting), None if unknown (paths not written by add_paths), see _asymmetric_paths
+        self._asymmetric_in = {}
 
-    def add_path(self, start: Tuple[Tuple[int, int], Direction], target: Tuple[Tuple[int, int], Direction],
+    def add_path(self, start: 'Tuple[Tuple[int, int], Direction]', target: 'Tuple[Tuple[int, int], Direction]',
                  weight: int):
         """
          Adds a bidirectional path defined between the start and end coordinates to the map and assigns the weight to it
@@ -50,6 +78,74 @@ class Planet:
         :return: void
         """
 
+        self.add_paths([(start, target, weight)])
+
+    def add_paths(self,
+                  paths: 'Iterable[Tuple[Tuple[Tuple[int, int], Direction], Tuple[Tuple[int, int], Direction], int]]'):
+        """
+        Adds many bidirectional paths at once. Paths given more than once are only written once (the last weight
+        counts), and the cached shortest path trees are repaired or dropped only once for the whole batch.
+
+        Example:
+            add_paths([(((0, 3), Direction.NORTH), ((0, 3), Direction.WEST), 1),
+                       (((0, 3), Direction.EAST), ((1, 3), Direction.WEST), 2)])
+        :param paths: Iterable of (start, target, weight) as for add_path
+        :return: void
+        """
+        self.generation += 1
+        batch = {}
+        for start, target, weight in paths:
+            key = (start, target) if start <= target else (target, start)
+            batch.pop(key, None)  # a repeated path counts at the position of its last occurrence
+            batch[key] = (start, target, weight)
+
+        # A path which is replaced by a blocked or longer one can make routes longer -> cached trees are dropped
+        invalidate = False
+        changed_edges = []
+        route_changes = []
+        changed_nodes = []
+        for start, target, weight in batch.values():
+            if self.corridors is not None and (self._get_slot(start[0], start[1]) != (target[0], target[1], weight) or
+                                               self._get_slot(target[0], target[1]) != (start[0], start[1], weight)):
+                changed_nodes += (start[0], target[0])
+            if self.hierarchy is not None and (self._get_slot(start[0], start[1]) != (target[0], target[1], weight) or
+                                               self._get_slot(target[0], target[1]) != (start[0], start[1], weight)):
+                self.hierarchy = None
+            if self.active_route.route and (self._get_slot(start[0], start[1]) != (target[0], target[1], weight) or
+                                            self._get_slot(target[0], target[1]) != (start[0], start[1], weight)):
+                route_changes.append((start, target, weight))
+            if self.tree_cache.trees and not (self._only_shortens(start, target, weight) and
+                                              self._only_shortens(target, start, weight)):
+                invalidate = True
+
+            old_paths = (self._get_slot(start[0], start[1]), self._get_slot(target[0], target[1]))
+            self._store_path(start, target, weight)
+            if self._asymmetric_in is not None:
+                self._track_asymmetric(start, target, old_paths)
+
+            # Keep the Manhattan heuristic a lower bound for every known path
+            grid_distance = abs(start[0][0] - target[0][0]) + abs(start[0][1] - target[0][1])
+            if weight != -1 and grid_distance > 0:
+                scale = weight / grid_distance
+                if self._manhattan_scale is None or scale < self._manhattan_scale:
+                    self._manhattan_scale = scale
+
+            if weight != -1:
+                changed_edges.append((start[0], start[1], target[0], weight))
+                changed_edges.append((target[0], target[1], start[0], weight))
+
+        if invalidate:
+            self.tree_cache.invalidate()
+        elif self.tree_cache.trees and changed_edges:
+            self.tree_cache.repair(self.paths, changed_edges)
+        if route_changes:
+            self.active_route.check(route_changes, self._manhattan_scale or 0)
+        if changed_nodes:
+            self.corridors.update(changed_nodes)
+
+    def _store_path(self, start: 'Tuple[Tuple[int, int], Direction]', target: 'Tuple[Tuple[int, int], Direction]',
+                    weight: int):
+        """ Writes the path into both directions of the adjacency, storage backends override this """
         # If statement to avoid overwriting
         if start[0] not in self.paths.keys():
             self.paths[start[0]] = {}
@@ -58,7 +154,45 @@ class Planet:
             self.paths[target[0]] = {}
         self.paths[target[0]][target[1]] = (start[0], start[1], weight)
 
-    def get_paths(self) -> Dict[Tuple[int, int], Dict[Direction, Tuple[Tuple[int, int], Direction, Weight]]]:
+    def _track_asymmetric(self, start: 'Tuple[Tuple[int, int], Direction]',
+                          target: 'Tuple[Tuple[int, int], Direction]', old_paths: tuple):
+        """ Updates _asymmetric_in after the path start -> target replaced the old paths of both ends """
+        for (node, direction), other, old in ((start, target, old_paths[0]), (target, start, old_paths[1])):
+            if old is None:
+                continue
+            # The slot is symmetric now, the old path may have left the slot at its other end pointing here
+            self._asymmetric_in.get(old[0], set()).discard((node, direction))
+            if (old[0], old[1]) != other and self._get_slot(old[0], old[1]) == (node, direction, old[2]):
+                self._asymmetric_in.setdefault(node, set()).add((old[0], old[1]))
+
+    def _asymmetric_paths(self) -> 'Dict[Tuple[int, int], set]':
+        """ Returns _asymmetric_in, reading all paths once if it is unknown """
+        if self._asymmetric_in is None:
+            asymmetric = {}
+            for node, directions in self.get_paths().items():
+                for direction, (goal, goal_direction, weight) in directions.items():
+                    if self._get_slot(goal, goal_direction) != (node, direction, weight):
+                        asymmetric.setdefault(goal, set()).add((node, direction))
+            self._asymmetric_in = asymmetric
+        return self._asymmetric_in
+
+    def _get_slot(self, node: 'Tuple[int, int]',
+                  direction: Direction) -> 'Optional[Tuple[Tuple[int, int], Direction, Weight]]':
+        """ Returns the path leaving node in direction or None, storage backends override this """
+        return self.paths.get(node, {}).get(direction)
+
+    def _only_shortens(self, start: 'Tuple[Tuple[int, int], Direction]', target: 'Tuple[Tuple[int, int], Direction]',
+                       weight: int) -> bool:
+        """
+        Checks if writing the path start -> target into the slot of start can only make routes shorter,
+        meaning the slot was empty, blocked or held the same path with a weight not smaller than the new one
+        """
+        old = self._get_slot(start[0], start[1])
+        if old is None or old[2] == -1:
+            return True
+        return weight != -1 and old[0] == target[0] and old[1] == target[1] and weight <= old[2]
+
+    def get_paths(self) -> 'Dict[Tuple[int, int], Dict[Direction, Tuple[Tuple[int, int], Direction, Weight]]]':
         """
         Returns all paths
 
@@ -80,162 +214,439 @@ class Planet:
 
         return self.paths
 
-    def shortest_path(self, start: Tuple[int, int], target: Tuple[int, int]) -> Optional[List[Tuple[Tuple[int, int], Direction]]]:
+    def shortest_path(self, start: 'Tuple[int, int]', target: 'Tuple[int, int]',
+                      heuristic: 'Optional[Heuristic]' = None,
+                      bidirectional: bool = False) -> 'Optional[List[Tuple[Tuple[int, int], Direction]]]':
         """
-        Returns the shortest path between two nodes
+        Returns the shortest path between two nodes.
+        With a heuristic an A* search towards the target is run instead of reading the full tree from tree_cache,
+        with bidirectional=True a bidirectional Dijkstra search from both ends.
+        Without both the hierarchy of build_hierarchy answers the query if there is one, otherwise the corridor
+        graph of use_corridors.
+        Results are kept in route_memo until the generation changes.
 
         Examples:
             shortest_path((0,0), (2,2)) returns: [((0, 0), Direction.EAST), ((1, 0), Direction.NORTH)]
             shortest_path((0,0), (1,2)) returns: None
+            shortest_path((0,0), (2,2), planet.manhattan_heuristic) returns a path of the same cost
+            shortest_path((0,0), (2,2), bidirectional=True) returns a path of the same cost
         :param start: 2-Tuple
         :param target: 2-Tuple
+        :param heuristic: Heuristic or None
+        :param bidirectional: Boolean, cannot be combined with a heuristic
         :return: None, List[] or List[Tuple[Tuple[int, int], Direction]]
         """
 
-        # Input to the function - all the nodes that the robot has gone through
         nodes = self.get_paths()
-        road_to_the_node = list()
 
-        # Check if it's an empty planet / target not in nodes / start is the target -> return None
-        if len(nodes) == 0 or (target not in nodes):
+        # Check if it's an empty planet / target not in nodes -> return None, start is the target -> return []
+        if len(nodes) == 0 or (target not in nodes) or (start not in nodes):
             return None
-        elif start == target:
-            return road_to_the_node
-            # Dictionary with unvisited nodes
+        if start == target:
+            return []
+
+        key = (start, target, heuristic, bidirectional)
+        road_to_the_node = self.route_memo.get(key, self.generation)
+        if road_to_the_node is not RouteMemo.MISSING:
+            self.expanded_nodes = 0
+            return None if road_to_the_node is None else list(road_to_the_node)
+        road_to_the_node = self._search_route(start, target, heuristic, bidirectional)
+        self.route_memo.put(key, self.generation, road_to_the_node)
+        return None if road_to_the_node is None else list(road_to_the_node)
+
+    def _search_route(self, start: 'Tuple[int, int]', target: 'Tuple[int, int]', heuristic: 'Optional[Heuristic]',
+                      bidirectional: bool) -> 'Optional[List[Tuple[Tuple[int, int], Direction]]]':
+        """ Runs the search of shortest_path for two different known nodes """
+        if bidirectional:
+            if heuristic is not None:
+                raise ValueError("A bidirectional search cannot use a heuristic")
+            return self._bidirectional(start, target)[1]
+        if heuristic is None and self.hierarchy is not None:
+            return self._hierarchy_route(start, target)
+        if heuristic is None and self.corridors is not None:
+            return self._corridor_route(start, target)
+        if heuristic is not None:
+            nodes_to_target = self._astar(start, target, heuristic)[1]
         else:
-            unvisited_nodes = nodes
-
-            # Current node = start node at the beginning, is later updated to the node with the smallest weight
-            current_node = start
-
-            # Dictionary with the distances from the start node
-            # Each node has an infinity value at the beginning, except for start node
-            distances = {}
-            for node in unvisited_nodes.keys():
-                if node == start:
-                    distances[node] = 0
-                else:
-                    distances[node] = self.infinity
-
-            # Keeps track of the road which leads to the target
-            nodes_to_target = {}
-
-            # As long as target is in distances -> iterate over current_neighbour and replace the distance to the
-            # current node if it's smaller than the current known distance
-            while target in distances:
-
-                # get access of the neighbours of the current node
-                current_neighbour = unvisited_nodes[current_node].items()
-
-                # key is the direction
-                # value contains
-                for key, value in current_neighbour:
-                    goal = value[0]  # Goal coordinates e.g. (0, 3)
-                    distance_to_the_neighbour = value[2]  # Weight of the path
-                    # 2 if statements below
-                    # check if goal is in distances.keys() and check if distance of current_node (it's the distance from
-                    # the start to our current node) + the distance to the current neighbour is smaller than
-                    # the smallest know weight to this goal and if so:
-                    if goal in distances.keys() and value[2] != -1:
-                        if distances[current_node] + distance_to_the_neighbour < distances[goal]:
-                            current_distance = distances[current_node] + distance_to_the_neighbour
-                            distances[goal] = current_distance
-                            nodes_to_target[goal] = (current_node, key)
-
-                distances.pop(current_node)
-
-                # Step4.  Loop through the dictionary of distances and find the node with the smallest weight
-                # Assign it as a current node
-                for new_node, weight in distances.items():
-                    if weight == min(distances.values()):
-                        current_node = new_node
-
-            current_node = target
-            while current_node != start:
-                if current_node not in nodes_to_target:
-                    return None
-                # key -> coordinates; value -> e.g. ((1, 1), <Direction.NORTH: 0>)
-                for key, value in nodes_to_target.items():
-                    if key == current_node:
-                        road_to_the_node.append(value)
-                        current_node = value[0]
-            if len(road_to_the_node) > 1:
-                road_to_the_node.reverse()
-            return road_to_the_node
+            nodes_to_target = self._tree(start)[1]
+        return self._follow_predecessors(nodes_to_target, start, target)
+
+    @staticmethod
+    def _follow_predecessors(nodes_to_target: 'Dict[Tuple[int, int], Tuple[Tuple[int, int], Direction]]',
+                             start: 'Tuple[int, int]',
+                             target: 'Tuple[int, int]') -> 'Optional[List[Tuple[Tuple[int, int], Direction]]]':
+        """
+        Returns the route from start to target in nodes_to_target of a search from start, None if the search did not
+        reach target
+        """
+        if target == start:
+            return []
+        if target not in nodes_to_target:
+            return None
+
+        # Follow the predecessors back to the start, every lookup is O(1)
+        road_to_the_node = []
+        current_node = target
+        while current_node != start:
+            step = nodes_to_target[current_node]
+            road_to_the_node.append(step)
+            current_node = step[0]
+        road_to_the_node.reverse()
+        return road_to_the_node
+
+    def _hierarchy_route(self, start: 'Tuple[int, int]',
+                         target: 'Tuple[int, int]') -> 'Optional[List[Tuple[Tuple[int, int], Direction]]]':
+        """ Searches the route on the hierarchy of build_hierarchy """
+        road_to_the_node = self.hierarchy.route(start, target)
+        self.expanded_nodes = self.hierarchy.settled
+        return road_to_the_node
+
+    def _corridor_route(self, start: 'Tuple[int, int]',
+                        target: 'Tuple[int, int]') -> 'Optional[List[Tuple[Tuple[int, int], Direction]]]':
+        """ Searches the route on the corridor graph of use_corridors """
+        road_to_the_node = self.corridors.route(start, target)
+        self.expanded_nodes = self.corridors.settled
+        return road_to_the_node
+
+    def _corridor_first_hop(self, start: 'Tuple[int, int]',
+                            target: 'Tuple[int, int]') -> 'Optional[Tuple[Weight, Optional[Direction]]]':
+        """ Searches the cost and first direction of the route on the corridor graph of use_corridors """
+        first_hop = self.corridors.first_hop(start, target)
+        self.expanded_nodes = self.corridors.settled
+        return first_hop
+
+    def distances_from(self, start: 'Tuple[int, int]') -> 'Dict[Tuple[int, int], Tuple[Weight, Optional[Direction]]]':
+        """
+        Returns the cost of the shortest path and the first direction to take for every node reachable from start.
+        Runs a single search, the first directions are the same shortest_path would return.
+
+        Example:
+            distances_from((0, 0)) returns: {(0, 0): (0, None), (1, 0): (3, Direction.EAST), ...}
+        :param start: 2-Tuple
+        :return: Dict
+        """
+        if start not in self.get_paths():
+            return {}
+
+        tree = self._tree(start)
+        return {node: (distance, self._first_hop(tree, start, node)) for node, distance in tree[0].items()}
+
+    @staticmethod
+    def _first_hop(tree: list, start: 'Tuple[int, int]', node: 'Tuple[int, int]') -> 'Optional[Direction]':
+        """
+        Returns the first direction of the route from start to node in the tree of start (None for start itself)
+        """
+        nodes_to_target, first_hops = tree[1], tree[2]
+
+        # Walk up the tree until a node with known first hop is found, then fill in the walked nodes
+        first_hops[start] = None
+        walked = []
+        while node not in first_hops:
+            walked.append(node)
+            previous_node, direction = nodes_to_target[node]
+            if previous_node == start:
+                first_hops[node] = direction
+                walked.pop()
+                break
+            node = previous_node
+        first_hop = first_hops[node]
+        for node in walked:
+            first_hops[node] = first_hop
+        return first_hop
+
+    def _tree(self, start: 'Tuple[int, int]') -> list:
+        """
+        Returns the shortest path tree of start as [distances, nodes_to_target, first_hops, decreased],
+        from tree_cache if possible
+        """
+        tree = self.tree_cache.get(start)
+        if tree is None:
+            distances, nodes_to_target = self._dijkstra(start)[:2]
+            tree = self.tree_cache.put(start, distances, nodes_to_target)
+        else:
+            self.expanded_nodes = 0
+        return tree
+
+    def distance_matrix(self, nodes: 'Optional[List[Tuple[int, int]]]' = None, use_scipy: 'Optional[bool]' = None):
+        """
+        Computes shortest distances, predecessors and first directions from many nodes at once.
+        Blocked paths are ignored. Any route starting at one of the nodes is answered without another search.
+
+        Example:
+            matrix = planet.distance_matrix()
+            matrix.distance((0, 0), (2, 2)) returns: 4
+            matrix.route((0, 0), (2, 2)) returns: [((0, 0), Direction.EAST), ((1, 0), Direction.NORTH)]
+        :param nodes: List of 2-Tuples used as sources, all nodes if None
+        :param use_scipy: Force (True) or avoid (False) the batched SciPy computation, used if installed by default
+        :return: DistanceMatrix
+        """
+        from RobolabCode.distance_matrix import DistanceMatrix  # NumPy/SciPy are optional and slow to import
+        return DistanceMatrix(self, nodes, use_scipy)
+
+    def build_hierarchy(self, witness_limit: int = 50):
+        """
+        Builds a contraction hierarchy of the current paths, shortest_path uses it until a path is added or changed.
+        Worth it once the planet is explored and many routes are queried on the same paths.
+
+        :param witness_limit: Integer, see contraction.ContractionHierarchy
+        :return: ContractionHierarchy
+        """
+        from RobolabCode.contraction import ContractionHierarchy  # contraction imports this module
+        self.hierarchy = ContractionHierarchy(self, witness_limit)
+        return self.hierarchy
+
+    def use_corridors(self):
+        """
+        Builds the corridor graph of the current paths, which collapses chains of degree 2 nodes into single edges.
+        shortest_path searches it instead of all nodes, add_paths repairs it where paths change.
+        Worth it on planets with long corridors.
+
+        :return: CorridorGraph
+        """
+        from RobolabCode.corridors import CorridorGraph  # corridors imports this module
+        self.corridors = CorridorGraph(self)
+        return self.corridors
+
+    def planning_copy(self) -> 'Planet':
+        """
+        Returns a planet of the same class for planning in another thread. It shares the paths, which must not change
+        while it is used, and has its own frontier, caches, active route and tour, so its decisions never write to
+        this planet. The hierarchy and corridor graph are shared as well, their searches only count settled nodes.
+
+        :return: Planet
+        """
+        planet = object.__new__(type(self))
+        planet.__dict__.update(self.__dict__)
+        planet.frontier = self.frontier.copy()
+        planet.frontier_index = FrontierIndex(planet)
+        planet.tree_cache = PathTreeCache(self.tree_cache_size)
+        planet.route_memo = RouteMemo(self.route_memo_size)
+        for name in ("active_route", "hierarchy", "corridors", "tour_planner"):
+            engine = getattr(self, name)
+            if engine is not None:
+                engine = object.__new__(type(engine))
+                engine.__dict__.update(getattr(self, name).__dict__)
+                if hasattr(engine, "planet"):
+                    engine.planet = planet
+                setattr(planet, name, engine)
+        return planet
+
+    def adopt_plan(self, planet: 'Planet'):
+        """
+        Takes over the route to the target and the tour of a planning_copy whose decision is used, so the following
+        decisions continue them like after a decision of this planet
+        """
+        self.active_route = planet.active_route
+        if self.tour_planner is not None:
+            self.tour_planner = planet.tour_planner
+            self.tour_planner.planet = self
+
+    def manhattan_heuristic(self, node: 'Tuple[int, int]', target: 'Tuple[int, int]') -> float:
+        """
+        Heuristic for shortest_path: grid distance between node and target times the smallest weight per grid unit
+        of all known paths, which never overestimates the real cost
+
+        :param node: 2-Tuple
+        :param target: 2-Tuple
+        :return: Float
+        """
+        if self._manhattan_scale is None:
+            return 0
+        return (abs(node[0] - target[0]) + abs(node[1] - target[1])) * self._manhattan_scale
+
+    def _astar(self, start: 'Tuple[int, int]', target: 'Tuple[int, int]', heuristic: 'Heuristic'):
+        """
+        A* search from start to target
+
+        :param start: 2-Tuple
+        :param target: 2-Tuple
+        :param heuristic: Heuristic
+        :return: (distances, nodes_to_target, expanded_order) like _dijkstra, a node may be expanded more than once
+        """
+        nodes = self.get_paths()
+
+        # Heap with (estimated total cost, -distance, node) entries, on equal estimates the deeper node goes first.
+        # A node is expanded again if it is reached cheaper later, so inconsistent heuristics still give shortest paths.
+        distances = {start: 0}
+        nodes_to_target = {}
+        heap = [(heuristic(start, target), 0, start)]
+        expanded_order = []
+
+        while heap:
+            estimate, current_distance, current_node = heappop(heap)
+            current_distance = -current_distance
+            if current_distance > distances[current_node]:
+                continue
+            expanded_order.append(current_node)
+            if current_node == target:
+                break
+
+            for key, value in nodes[current_node].items():
+                goal, distance_to_the_neighbour = value[0], value[2]
+                if distance_to_the_neighbour == -1:
+                    continue
+                new_distance = current_distance + distance_to_the_neighbour
+                if new_distance < distances.get(goal, self.infinity):
+                    distances[goal] = new_distance
+                    nodes_to_target[goal] = (current_node, key)
+                    heappush(heap, (new_distance + heuristic(goal, target), -new_distance, goal))
+
+        self.expanded_nodes = len(expanded_order)
+        return distances, nodes_to_target, expanded_order
+
+    def _bidirectional(self, start: 'Tuple[int, int]', target: 'Tuple[int, int]'):
+        """
+        Bidirectional Dijkstra search: one search from start over the paths, one from target over the reversed
+        paths, the side with the cheaper next node goes first. The reversed paths are the entries of paths
+        themselves, paths[node][direction] = (goal, goal direction, weight) is also the path from goal to node.
+        Entries which are no longer symmetric (after overwriting) are skipped by the backward search, it takes the
+        paths leading to a node without an entry back from _asymmetric_paths instead.
+        The search stops once the cheapest nodes of both sides cost at least the best route found so far.
+
+        :param start: 2-Tuple
+        :param target: 2-Tuple
+        :return: (distance, route, settled_order), distance and route are None if target is not reachable
+        """
+        nodes = self.get_paths()
+        asymmetric = self._asymmetric_paths()
+        distances = ({start: 0}, {target: 0})
+        # Forward: node -> (previous node, direction taken there), backward: node -> (next node, direction taken here)
+        links = ({}, {})
+        settled = (set(), set())
+        heaps = ([(0, start)], [(0, target)])
+        settled_order = []
+        best, meeting_node = self.infinity, None
+
+        while heaps[0] and heaps[1] and heaps[0][0][0] + heaps[1][0][0] < best:
+            side = 0 if heaps[0][0][0] <= heaps[1][0][0] else 1
+            current_distance, current_node = heappop(heaps[side])
+            if current_node in settled[side]:
+                continue
+            settled[side].add(current_node)
+            settled_order.append(current_node)
+
+            own, other = distances[side], distances[1 - side]
+            neighbours = nodes[current_node].items()
+            if side == 1 and current_node in asymmetric:
+                # As entries of current node: (direction here, (node, direction taken there, weight))
+                neighbours = list(neighbours)
+                for node, direction in asymmetric[current_node]:
+                    path = self._get_slot(node, direction)
+                    neighbours.append((path[1], (node, direction, path[2])))
+            for key, value in neighbours:
+                goal, goal_direction, weight = value
+                if weight == -1:
+                    continue
+                if side == 1 and self._get_slot(goal, goal_direction) != (current_node, key, weight):
+                    continue
+                new_distance = current_distance + weight
+                if new_distance < own.get(goal, self.infinity):
+                    own[goal] = new_distance
+                    links[side][goal] = (current_node, key) if side == 0 else (current_node, goal_direction)
+                    heappush(heaps[side], (new_distance, goal))
+                if goal in other and new_distance + other[goal] < best:
+                    best, meeting_node = new_distance + other[goal], goal
+
+        self.expanded_nodes = len(settled_order)
+        if meeting_node is None:
+            return None, None, settled_order
+
+        # Start ... meeting node from the forward links, meeting node ... target from the backward links
+        route = self._follow_predecessors(links[0], start, meeting_node)
+        current_node = meeting_node
+        while current_node != target:
+            next_node, direction = links[1][current_node]
+            route.append((current_node, direction))
+            current_node = next_node
+        return best, route, settled_order
+
+    def _dijkstra(self, start: 'Tuple[int, int]', target: 'Optional[Tuple[int, int]]' = None):
+        """
+        Dijkstra search from start over all known paths, stops as soon as target is reached (if given)
+
+        :param start: 2-Tuple
+        :param target: 2-Tuple or None to search the whole planet
+        :return: (distances, nodes_to_target, settled_order) where nodes_to_target maps a node to
+                 (previous node, direction taken there) and settled_order lists the settled nodes
+        """
+        nodes = self.get_paths()
+
+        # Binary heap with (distance, node) entries. Entries are never decreased in place, a node may be pushed
+        # several times and outdated entries are skipped when popped (lazy deletion).
+        distances = {start: 0}
+        settled = set()
+        settled_order = []
+        heap = [(0, start)]
+
+        # Keeps track of the road which leads to the target: node -> (previous node, direction taken there)
+        nodes_to_target = {}
+
+        while heap:
+            current_distance, current_node = heappop(heap)
+            if current_node in settled:
+                continue
+            settled.add(current_node)
+            settled_order.append(current_node)
+            if current_node == target:
+                break
+
+            # key is the direction, value contains (goal coordinates, goal direction, weight)
+            for key, value in nodes[current_node].items():
+                goal, distance_to_the_neighbour = value[0], value[2]
+                if distance_to_the_neighbour == -1 or goal in settled:
+                    continue
+                new_distance = current_distance + distance_to_the_neighbour
+                if new_distance < distances.get(goal, self.infinity):
+                    distances[goal] = new_distance
+                    nodes_to_target[goal] = (current_node, key)
+                    heappush(heap, (new_distance, goal))
+
+        self.expanded_nodes = len(settled_order)
+        return distances, nodes_to_target, settled_order
 
     def intelligent_explore(self, coordinates):
         """
         Returns the direction which the robot should take.
-        If there are any outgoing paths from the current vertex, it chooses the first one scanned.
-        Otherwise, it goes through visited and unvisited to find the node to which the path cost is the smallest.
+        If there are any open directions at the current vertex, it chooses the first one (in the order N, E, S, W).
+        Otherwise, it asks the frontier index for the visited node with open directions or unvisited node
+        to which the path cost is the smallest, or the tour_planner for the first node of its tour.
         """
 
-        # Check if our current vertex has any outgoing paths, if it doesn't, then it goes inside this if statement
-        # in order to find the most optimal way to choose a path.
-        if len(self.visited[coordinates]) == 0:
+        # If there are any outgoing paths from the current vertex, choose the first open one.
+        if self.frontier.has_open(coordinates):
+            return self.frontier.first_open(coordinates)
 
-            # List with tuples (node, total weight to the node)
-            known_paths_to_coord = []
+        if self.tour_planner is not None:
+            return self.tour_planner.next_direction(coordinates)
 
-            # Looks for all known nodes (in visited or in unvisited) and if there is a known road to them, appends them
-            # to known_paths_to_coord.
-            for coord in self.visited.keys():
-                if len(self.visited[coord]):
-                    path = self.shortest_path(coordinates, coord)
-                    if path is None:
-                        continue
-                    if len(path) == 0:
-                        break
-                    else:
-                        total = 0
-                        for vertex in path:  # path -> [((0, 0), Direction.EAST), ((1, 0), Direction.NORTH)]
-                            direction = vertex[1]
-                            weight = self.paths[vertex[0]][direction][2]
-                            total += weight
-                        known_paths_to_coord.append((coord, total))
-
-            for coord in self.unvisited:
-                path = self.shortest_path(coordinates, coord)
-                if path:
-                    total = 0
-                    for vertex in path:
-                        direction = vertex[1]
-                        weight = self.paths[vertex[0]][direction][2]
-                        total += weight
-                    known_paths_to_coord.append((coord, total))
-
-            # Loops through known_paths_to_coord and chooses the one with the smallest weight
-            shortest_path_weight = self.infinity
-            coord_smallest_weight = None
-            for vertex in known_paths_to_coord:
-                if vertex[1] < shortest_path_weight:
-                    coord_smallest_weight = vertex[0]
-                    shortest_path_weight = vertex[1]
-
-            # Returns the direction to the node, which has the smallest weight relative to our current coordinates
-            road_to_the_node = self.shortest_path(coordinates, coord_smallest_weight)
-            # if road_to_the_node == []:
-            #     return 'empty'
-            if not road_to_the_node:
-                return road_to_the_node
-            else:
-                return road_to_the_node[0][1]  # Returns direction
-            # --------------------------------------------------------#
-        else:
-            # If there are any outgoing paths from the current vertex, choose the first one scanned by the robot.
-            direction_to_take = self.visited[coordinates][0]
-            return direction_to_take
+        # Returns the direction to the node, which has the smallest weight relative to our current coordinates
+        nearest = self.frontier_index.nearest(coordinates)
+        return nearest[2] if nearest else None
 
     def next_direction(self, target_message, coordinates):
         """
             takes target message and current coordinates
-            checks if there is target and if target is reachable
+            checks if there is target and if target is reachable (A* search if target_heuristic is set,
+            bidirectional search if target_bidirectional is set)
             otherwise intelligent exploration
             returns a direction the robot should choose
+            the route to the target is kept in active_route and followed without a search until a path changes it,
+            with the corridor graph of use_corridors only the first hop is searched at every node
         """
         if target_message is not None:
             # print("es gibt ein Target!")
-            road_to_target = self.shortest_path(coordinates, target_message)  # (StartX, StartY), (TargetX, TargetY)
+            direction = self.active_route.follow(coordinates, target_message)
+            if direction is not None:
+                return direction
+            if self.corridors is not None and self.hierarchy is None and self.target_heuristic is None and \
+                    not self.target_bidirectional:
+                first_hop = self._corridor_first_hop(coordinates, target_message)
+                if first_hop is not None and first_hop[1] is not None:
+                    return first_hop[1]
+                return self.intelligent_explore(coordinates)
+            road_to_target = self.shortest_path(coordinates, target_message,  # (StartX, StartY), (TargetX, TargetY)
+                                                self.target_heuristic, self.target_bidirectional)
+            self.active_route.plan(self, target_message, road_to_target)
             if road_to_target:
                 direction = road_to_target[0][1]
             else:
@@ -247,54 +658,490 @@ class Planet:
     def handle_unveiled_paths(self, unveiled_paths):
         """
         Adds paths unveiled by the mothership to dict "paths" and if the vertex
-        was not yet visited by the robot, to dict "unvisited".
-        """
-        if len(unveiled_paths):
-            for path in unveiled_paths:
-                first_vertex, last_vertex, path_weight, path_status = path
-                if first_vertex[0] not in self.visited.keys() and first_vertex[0] not in self.unvisited:
-                    self.unvisited.append(first_vertex[0])  # (StartX, StartY)
-                if last_vertex[0] not in self.visited.keys() and last_vertex[0] not in self.unvisited:
-                    self.unvisited.append(last_vertex[0])  # (EndX, EndY)
-
-                self.add_path(first_vertex, last_vertex, path_weight)
-
-        for path in unveiled_paths:
-            start_vertex, end_vertex, path_weight, path_status = path
-            if start_vertex[0] in self.visited.keys():
-                for direction in self.visited[start_vertex[0]]:
-                    if direction in self.paths[start_vertex[0]].keys():
-                        self.visited[start_vertex[0]].remove(direction)
-            if end_vertex[0] in self.visited.keys():
-                print("in if statement, end_vertex:", end_vertex)
-                for direction in self.visited[end_vertex[0]]:
-                    print("in for loop, direction:", direction)
-                    if direction in self.paths[end_vertex[0]].keys():
-                        self.visited[end_vertex[0]].remove(direction)
-
-    def remove_if_blocked(self, current_coord: tuple[int, int], outgoing_paths: list) -> None:
-        """
-        Permanently removes a blocked path (path with weight -1) from dict "visited" put adds every
-        other available direction on the current coordinate.
-        """
-        for direction, value in self.paths[current_coord].items():
-            if value[2] == -1:
-                outgoing_paths.remove(direction)
-        self.unvisited.remove(current_coord)
-        self.visited[current_coord] = outgoing_paths
-
-
-    def remove_driven_paths(self, start_vertex: tuple[tuple[int, int], Direction], last_vertex: tuple[tuple[int, int], Direction]):
-        """
-        Deletes the start direction from the last node which robot took and the end direction of the node to which the
+        was not yet visited by the robot, to the unvisited nodes of the frontier.
+        Directions of visited vertices which lead into a known path are closed.
+        """
+        self.generation += 1
+        self.ingest_unveiled(unveiled_paths)
+
+    def ingest_unveiled(self, batch):
+        """
+        Ingests a whole pathUnveiled batch in a single pass: every path is written once, every vertex is added to
+        the frontier and checked for known paths once, and the caches are updated once.
+
+        Example:
+            ingest_unveiled([(((0, 0), Direction.NORTH), ((0, 1), Direction.SOUTH), 1, "free"), ...])
+        :param batch: Iterable of (start vertex, end vertex, weight, status) as received from the server
+        :return: void
+        """
+        paths = []
+        vertices = {}  # ordered set of all coordinates in the batch
+        for first_vertex, last_vertex, path_weight, path_status in batch:
+            paths.append((first_vertex, last_vertex, path_weight))
+            vertices[first_vertex[0]] = None  # (StartX, StartY)
+            vertices[last_vertex[0]] = None  # (EndX, EndY)
+
+        for coordinates in vertices:
+            self.frontier.discover(coordinates)
+        self.add_paths(paths)
+        for coordinates in vertices:
+            self.close_known_paths(coordinates)
+
+    def close_known_paths(self, coordinates: 'Tuple[int, int]'):
+        """
+        Closes every open direction of a visited vertex which leads into an already known path
+        """
+        for direction in self.frontier.directions(coordinates):
+            if self._get_slot(coordinates, direction) is not None:
+                self.frontier.close(coordinates, direction)
+
+    def remove_if_blocked(self, current_coord: 'Tuple[int, int]', outgoing_paths: list) -> None:
+        """
+        Marks the current coordinate as visited with every scanned direction open,
+        except for the ones already known to be blocked (path with weight -1).
+        """
+        self.generation += 1
+        open_paths = [direction for direction in outgoing_paths
+                      if self._get_slot(current_coord, direction) is None or
+                      self._get_slot(current_coord, direction)[2] != -1]
+        self.frontier.visit(current_coord, open_paths)
+
+    def remove_driven_paths(self, start_vertex: 'Tuple[Tuple[int, int], Direction]',
+                            last_vertex: 'Tuple[Tuple[int, int], Direction]'):
+        """
+        Closes the start direction at the last node which robot took and the end direction of the node to which the
         robot came.
         """
-        start_in_visited, end_in_visited = False, False
-        if start_vertex[1] in self.visited[start_vertex[0]]:
-            start_in_visited = True
-        if last_vertex[1] in self.visited[last_vertex[0]]:
-            end_in_visited = True
-        if start_in_visited:
-            self.visited[start_vertex[0]].remove(start_vertex[1])
-        if end_in_visited and (start_vertex[0] != last_vertex[0] or (start_vertex[0] == last_vertex[0] and start_vertex[1] != last_vertex[1])):
-            self.visited[last_vertex[0]].remove(last_vertex[1])
+        self.frontier.close(start_vertex[0], start_vertex[1])
+        self.frontier.close(last_vertex[0], last_vertex[1])
+
+
+DIRECTIONS = sorted(Direction)  # bit / slot number -> Direction, slot = direction // 90
+OPEN_DIRECTIONS = [[DIRECTIONS[slot] for slot in range(4) if mask >> slot & 1] for mask in range(16)]
+
+
+class Frontier:
+    """
+    Exploration state of the planet.
+
+    Every visited node has a 4 bit mask of its open directions (bit direction // 90 is set while the direction still
+    has to be explored). Nodes only known from unveiled paths are kept in an ordered set of unvisited nodes.
+    All updates are O(1).
+    """
+
+    def __init__(self):
+        """ Initializes the data structure """
+        self.open_directions = {}  # key: visited coordinates, value: bitmask of open directions
+        self.unvisited = {}  # key: unvisited coordinates in order of discovery, value: None (ordered set)
+        self.ranks = {}  # key: coordinates, value: (0 if visited else 1, order of visit / discovery)
+        self.on_open = None  # Called with the coordinates of a node which becomes (again) worth exploring
+        self.discovered = 0  # Number of nodes added by discover, counts the frontier nodes of unveiled paths
+        self._sequence = 0
+
+    def visit(self, coordinates: 'Tuple[int, int]', directions: 'List[Direction]'):
+        """ Marks coordinates as visited with the given directions open """
+        mask = 0
+        for direction in directions:
+            mask |= 1 << (direction // 90)
+        if coordinates not in self.open_directions:
+            self._rank(coordinates, 0)
+        self.open_directions[coordinates] = mask
+        self.unvisited.pop(coordinates, None)
+        if mask and self.on_open is not None:
+            self.on_open(coordinates)
+
+    def discover(self, coordinates: 'Tuple[int, int]'):
+        """ Adds coordinates to the unvisited nodes, unless they were visited already """
+        if coordinates not in self.open_directions and coordinates not in self.unvisited:
+            self._rank(coordinates, 1)
+            self.unvisited[coordinates] = None
+            self.discovered += 1
+            if self.on_open is not None:
+                self.on_open(coordinates)
+
+    def _rank(self, coordinates: 'Tuple[int, int]', kind: int):
+        """ Visited nodes rank before unvisited ones, then by the order in which they were added """
+        self.ranks[coordinates] = (kind, self._sequence + 1)
+        self._sequence += 1
+
+    def is_candidate(self, coordinates: 'Tuple[int, int]') -> bool:
+        """ Checks if coordinates is worth driving to: visited with open directions or unvisited """
+        return self.open_directions.get(coordinates, 0) != 0 or coordinates in self.unvisited
+
+    def open(self, coordinates: 'Tuple[int, int]', direction: Direction):
+        """ Opens a direction of a visited node """
+        self.open_directions[coordinates] |= 1 << (direction // 90)
+        if self.on_open is not None:
+            self.on_open(coordinates)
+
+    def close(self, coordinates: 'Tuple[int, int]', direction: Direction):
+        """ Closes a direction, nothing happens for nodes which are not visited """
+        if coordinates in self.open_directions:
+            self.open_directions[coordinates] &= ~(1 << (direction // 90))
+
+    def is_visited(self, coordinates: 'Tuple[int, int]') -> bool:
+        return coordinates in self.open_directions
+
+    def is_open(self, coordinates: 'Tuple[int, int]', direction: Direction) -> bool:
+        return bool(self.open_directions.get(coordinates, 0) >> (direction // 90) & 1)
+
+    def has_open(self, coordinates: 'Tuple[int, int]') -> bool:
+        return self.open_directions.get(coordinates, 0) != 0
+
+    def directions(self, coordinates: 'Tuple[int, int]') -> 'List[Direction]':
+        """ Returns the open directions of coordinates in the order N, E, S, W """
+        return OPEN_DIRECTIONS[self.open_directions.get(coordinates, 0)]
+
+    def first_open(self, coordinates: 'Tuple[int, int]') -> 'Optional[Direction]':
+        """ Returns the first open direction of coordinates or None """
+        open_directions = OPEN_DIRECTIONS[self.open_directions.get(coordinates, 0)]
+        return open_directions[0] if open_directions else None
+
+    def open_nodes(self):
+        """ Iterates over the visited nodes with at least one open direction """
+        return (coordinates for coordinates, mask in self.open_directions.items() if mask)
+
+    def copy(self) -> 'Frontier':
+        """ Returns an independent copy without on_open callback """
+        frontier = Frontier()
+        frontier.open_directions = dict(self.open_directions)
+        frontier.unvisited = dict(self.unvisited)
+        frontier.ranks = dict(self.ranks)
+        frontier.discovered = self.discovered
+        frontier._sequence = self._sequence
+        return frontier
+
+
+class FrontierIndex:
+    """
+    Keeps the frontier nodes (visited with open directions or unvisited) ordered by path cost from the robot.
+
+    The costs come from the shortest path tree of the robot's node in tree_cache. Nodes which become frontier nodes
+    and nodes which get closer through repaired trees are pushed into a heap, nodes which stop being frontier nodes
+    or have outdated costs are dropped when they reach the top of the heap (lazy deletion).
+    Queries after an update therefore cost O(log n) per change. The heap is rebuilt from the tree when the robot is
+    at another node or the tree was dropped because a path got blocked.
+    """
+
+    def __init__(self, planet: Planet):
+        self.planet = planet
+        self.source = None
+        self.tree = None
+        self.heap = []  # (cost, rank, coordinates)
+        self.pending = set()  # nodes which became frontier nodes since the last query
+        self.rebuilds = 0
+        planet.frontier.on_open = self.pending.add
+
+    def nearest(self, source: 'Tuple[int, int]') -> 'Optional[Tuple[Tuple[int, int], Weight, Direction]]':
+        """
+        Returns the cheapest reachable frontier node from source as (coordinates, cost, first direction), or None.
+        On equal cost visited nodes come first, then the order in which they were added.
+
+        :param source: 2-Tuple, current position of the robot
+        :return: 3-Tuple or None
+        """
+        nearest = self.nearest_k(source, 1)
+        return nearest[0] if nearest else None
+
+    def nearest_k(self, source: 'Tuple[int, int]', k: int) -> 'List[Tuple[Tuple[int, int], Weight, Direction]]':
+        """
+        Returns up to k cheapest reachable frontier nodes from source, cheapest first
+
+        :param source: 2-Tuple, current position of the robot
+        :param k: Integer
+        :return: List of (coordinates, cost, first direction)
+        """
+        if source not in self.planet.get_paths():
+            return []
+        self._update(source)
+
+        # A node may be in the heap more than once with the same valid entry (opened again without a new rank),
+        # the copies are dropped
+        nearest, valid_entries, seen = [], [], set()
+        while self.heap and len(nearest) < k:
+            entry = heappop(self.heap)
+            if entry[2] not in seen and self._is_valid(entry):
+                seen.add(entry[2])
+                valid_entries.append(entry)
+                nearest.append((entry[2], entry[0], self.planet._first_hop(self.tree, source, entry[2])))
+        for entry in valid_entries:
+            heappush(self.heap, entry)
+        return nearest
+
+    def _is_valid(self, entry: 'Tuple[Weight, tuple, Tuple[int, int]]') -> bool:
+        cost, rank, coordinates = entry
+        frontier = self.planet.frontier
+        return (coordinates != self.source and frontier.is_candidate(coordinates) and
+                frontier.ranks[coordinates] == rank and self.tree[0].get(coordinates) == cost)
+
+    def _update(self, source: 'Tuple[int, int]'):
+        """ Brings the heap up to date with the tree of source and the frontier """
+        planet = self.planet
+        frontier = planet.frontier
+        if source != self.source or self.tree is None or planet.tree_cache.trees.get(source) is not self.tree:
+            self.source = source
+            self.tree = planet._tree(source)
+            distances = self.tree[0]
+            self.heap = [(distances[coordinates], frontier.ranks[coordinates], coordinates)
+                         for coordinates in frontier.ranks
+                         if coordinates in distances and frontier.is_candidate(coordinates)]
+            heapify(self.heap)
+            self.tree[3].clear()
+            self.pending.clear()
+            self.rebuilds += 1
+            return
+
+        # Push new frontier nodes and nodes which got closer since the last query
+        distances, decreased = self.tree[0], self.tree[3]
+        for coordinates in decreased | self.pending:
+            if coordinates in distances and frontier.is_candidate(coordinates):
+                heappush(self.heap, (distances[coordinates], frontier.ranks[coordinates], coordinates))
+        decreased.clear()
+        self.pending.clear()
+
+
+class PathTreeCache:
+    """
+    Caches shortest path trees (one per source node) and keeps them up to date while paths are added.
+
+    A new path or a cheaper weight can only shorten distances, so the cached trees are repaired by relaxing from the
+    changed path (decrease-only dynamic shortest paths). A path which gets blocked or more expensive can make routes
+    longer, in this case all trees are dropped.
+    """
+
+    def __init__(self, max_sources: int = 8):
+        """
+        :param max_sources: Integer, number of trees kept at most (least recently used are evicted), 0 disables
+        """
+        self.max_sources = max_sources
+        self.trees = {}  # key: source, values: [distances, nodes_to_target, first_hops, decreased]
+        self.hits = 0
+        self.misses = 0
+        self.repairs = 0
+        self.invalidations = 0
+
+    def get(self, source: 'Tuple[int, int]') -> 'Optional[list]':
+        """ Returns the tree of source or None, counts a hit or a miss """
+        tree = self.trees.pop(source, None)
+        if tree is None:
+            self.misses += 1
+            return None
+        self.trees[source] = tree  # re-insert as most recently used
+        self.hits += 1
+        return tree
+
+    def put(self, source: 'Tuple[int, int]', distances: dict, nodes_to_target: dict) -> list:
+        """
+        Stores a freshly computed tree and returns it. first_hops is filled lazily by Planet._first_hop,
+        decreased collects the nodes which got closer by repairs until a reader clears it.
+        """
+        tree = [distances, nodes_to_target, {}, set()]
+        if self.max_sources > 0:
+            self.trees[source] = tree
+            while len(self.trees) > self.max_sources:
+                self.trees.pop(next(iter(self.trees)))
+        return tree
+
+    def invalidate(self):
+        """ Drops all cached trees """
+        if self.trees:
+            self.trees.clear()
+            self.invalidations += 1
+
+    def repair(self, paths: dict, edges: list):
+        """
+        Updates all cached trees after paths got cheaper or were added
+
+        :param paths: Dict, the planet's paths already containing the new edges
+        :param edges: List of (start coordinates, start direction, target coordinates, weight), one per direction
+        """
+        for tree in self.trees.values():
+            distances, nodes_to_target, first_hops, decreased = tree
+            heap = []
+            for node, direction, goal, weight in edges:
+                if weight == -1 or node not in distances:
+                    continue
+                new_distance = distances[node] + weight
+                if new_distance < distances.get(goal, Planet.infinity):
+                    distances[goal] = new_distance
+                    nodes_to_target[goal] = (node, direction)
+                    decreased.add(goal)
+                    heappush(heap, (new_distance, goal))
+            if not heap:
+                continue
+
+            # Propagate the improvement through the rest of the tree
+            while heap:
+                current_distance, current_node = heappop(heap)
+                if current_distance > distances[current_node]:
+                    continue
+                for key, value in paths[current_node].items():
+                    goal, weight = value[0], value[2]
+                    if weight == -1:
+                        continue
+                    new_distance = current_distance + weight
+                    if new_distance < distances.get(goal, Planet.infinity):
+                        distances[goal] = new_distance
+                        nodes_to_target[goal] = (current_node, key)
+                        decreased.add(goal)
+                        heappush(heap, (new_distance, goal))
+            first_hops.clear()
+            self.repairs += 1
+
+    def stats(self) -> 'Dict[str, int]':
+        """ Returns the hit/miss/repair/invalidation counters """
+        return {"hits": self.hits, "misses": self.misses, "repairs": self.repairs,
+                "invalidations": self.invalidations, "trees": len(self.trees)}
+
+
+class RouteMemo:
+    """
+    Keeps the latest results of shortest_path (least recently used are evicted).
+    Every result is tagged with the generation of the planet it was computed in, results of another generation
+    are never returned.
+    """
+
+    MISSING = object()  # returned by get if there is no valid result, None is a valid result (unreachable)
+
+    def __init__(self, max_entries: int = 64):
+        """
+        :param max_entries: Integer, number of results kept at most, 0 disables
+        """
+        self.max_entries = max_entries
+        self.entries = {}  # key: (start, target, heuristic, bidirectional), values: (generation, route)
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0
+
+    def get(self, key: tuple, generation: int):
+        """ Returns the route of key computed in generation or MISSING, counts a hit or a miss """
+        entry = self.entries.pop(key, None)
+        if entry is None or entry[0] != generation:
+            if entry is not None:
+                self.stale += 1
+            self.misses += 1
+            return self.MISSING
+        self.entries[key] = entry  # re-insert as most recently used
+        self.hits += 1
+        return entry[1]
+
+    def put(self, key: tuple, generation: int, route: 'Optional[List[Tuple[Tuple[int, int], Direction]]]'):
+        """ Stores a route or None for an unreachable target """
+        if self.max_entries > 0:
+            self.entries[key] = (generation, route)
+            while len(self.entries) > self.max_entries:
+                self.entries.pop(next(iter(self.entries)))
+
+    def clear(self):
+        self.entries.clear()
+
+    def stats(self) -> 'Dict[str, float]':
+        """ Returns the hit/miss/stale counters and the hit rate """
+        lookups = self.hits + self.misses
+        return {"hits": self.hits, "misses": self.misses, "stale": self.stale,
+                "hit_rate": self.hits / lookups if lookups else 0.0, "entries": len(self.entries)}
+
+
+class ActiveRoute:
+    """
+    Route of next_direction to the current target together with the paths it depends on.
+
+    At every node of the route the next direction is looked up in O(1). The route stays the shortest one while no
+    path on it changes and no new or cheaper path can lead to a cheaper route: a route over a changed path
+    u -> v costs at least scale * |current - u| + weight + scale * |v - target| (Manhattan distances, scale is the
+    smallest weight per grid unit of all paths). Only if this bound is below the remaining cost the route is dropped
+    and the next call of next_direction searches again.
+    """
+
+    def __init__(self):
+        self.target = None
+        self.route = []  # List[Tuple[Tuple[int, int], Direction]] of the last search
+        self.positions = {}  # key: node of the route, value: index in route (the target has index len(route))
+        self.costs = []  # cost from the start of the route to the node at every index
+        self.slots = set()  # (node, direction) of both ends of every path of the route
+        self.position = 0  # index of the node of the last decision
+        self.replans = 0
+        self.avoided_replans = 0
+        self.invalidations = 0
+
+    def plan(self, planet: 'Planet', target: 'Tuple[int, int]',
+             route: 'Optional[List[Tuple[Tuple[int, int], Direction]]]'):
+        """
+        Starts following the route of a new search, an empty or missing route only clears the old one
+
+        :param planet: Planet of the route
+        :param target: 2-Tuple
+        :param route: Result of Planet.shortest_path
+        :return: void
+        """
+        self.replans += 1
+        self.clear()
+        if not route:
+            return
+        self.target = target
+        self.route = route
+        self.costs = [0]
+        for index, (node, direction) in enumerate(route):
+            goal, goal_direction, weight = planet._get_slot(node, direction)
+            self.positions[node] = index
+            self.costs.append(self.costs[-1] + weight)
+            self.slots.add((node, direction))
+            self.slots.add((goal, goal_direction))
+        self.positions[target] = len(route)
+
+    def follow(self, coordinates: 'Tuple[int, int]', target: 'Tuple[int, int]') -> 'Optional[Direction]':
+        """
+        Returns the next direction of the route at coordinates or None if the route does not answer it
+        (other target, node not ahead on the route, target reached or route dropped)
+
+        :param coordinates: 2-Tuple
+        :param target: 2-Tuple
+        :return: Direction or None
+        """
+        index = self.positions.get(coordinates)
+        if target != self.target or index is None or index < self.position or index == len(self.route):
+            return None
+        self.position = index
+        self.avoided_replans += 1
+        return self.route[index][1]
+
+    def check(self, changes: list, scale: float):
+        """
+        Drops the route if one of the changed paths is part of it or may lead to a cheaper route
+
+        :param changes: List of (start, target, weight) as for Planet.add_path, paths whose slots changed
+        :param scale: Float, lower bound of the weight per grid unit of all paths
+        :return: void
+        """
+        current = self.route[self.position][0]
+        remaining = self.costs[-1] - self.costs[self.position]
+        for start, goal, weight in changes:
+            if tuple(start) in self.slots or tuple(goal) in self.slots:
+                self.invalidate()
+                return
+            if weight == -1:
+                continue  # a blocked path only makes other routes longer
+            for first, second in ((start[0], goal[0]), (goal[0], start[0])):
+                bound = (scale * (abs(current[0] - first[0]) + abs(current[1] - first[1])) + weight +
+                         scale * (abs(second[0] - self.target[0]) + abs(second[1] - self.target[1])))
+                if bound < remaining:
+                    self.invalidate()
+                    return
+
+    def invalidate(self):
+        """ Drops the route because the planet changed """
+        self.invalidations += 1
+        self.clear()
+
+    def clear(self):
+        self.target = None
+        self.route = []
+        self.positions = {}
+        self.costs = []
+        self.slots = set()
+        self.position = 0
+
+    def stats(self) -> 'Dict[str, int]':
+        """ Returns the replan/avoided replan/invalidation counters """
+        return {"replans": self.replans, "avoided_replans": self.avoided_replans,
+                "invalidations": self.invalidations}
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+
+# Attention: Do not import the ev3dev.ev3 module in this file
+"""
+Seeded random planets for tests, benchmarks and the simulator
+"""
+import random
+from typing import List, Optional, Tuple
+
+from RobolabCode.planet import Direction, Planet
+
+Path = Tuple[Tuple[Tuple[int, int], Direction], Tuple[Tuple[int, int], Direction], int]
+"""
+Arguments of Planet.add_path: (start, target, weight)
+"""
+
+OPPOSITE = {Direction.NORTH: Direction.SOUTH, Direction.EAST: Direction.WEST,
+            Direction.SOUTH: Direction.NORTH, Direction.WEST: Direction.EAST}
+
+
+def generate_paths(width: int, height: Optional[int] = None, density: float = 1.0, blocked_ratio: float = 0.0,
+                   loop_ratio: float = 0.0, curve_ratio: float = 0.0, min_weight: int = 1, max_weight: int = 10,
+                   seed: int = 0) -> List[Path]:
+    """
+    Generates the paths of a grid planet. Every direction slot of a node is used by one path at most.
+
+    Example:
+        generate_paths(2, 1) returns: [(((0, 0), Direction.EAST), ((1, 0), Direction.WEST), 7)]
+    :param width: Integer, number of nodes in x direction
+    :param height: Integer, number of nodes in y direction (width by default)
+    :param density: Probability that two neighbouring nodes are connected by a straight path
+    :param blocked_ratio: Probability that a path is blocked (weight -1)
+    :param loop_ratio: Probability that a node gets a path back to itself, e.g. ((0, 0), NORTH) -> ((0, 0), WEST)
+    :param curve_ratio: Probability that two neighbouring nodes get a path leaving both on the same side,
+                        e.g. ((0, 1), WEST) -> ((0, 0), WEST)
+    :param min_weight: Integer, smallest weight of a free path
+    :param max_weight: Integer, biggest weight of a free path
+    :param seed: Integer, the same arguments always give the same paths
+    :return: List of (start, target, weight)
+    """
+    height = width if height is None else height
+    rng = random.Random(seed)
+    used = set()  # (coordinates, direction) of occupied slots
+    paths = []
+
+    def add(start, target):
+        weight = -1 if rng.random() < blocked_ratio else rng.randint(min_weight, max_weight)
+        used.add(start)
+        used.add(target)
+        paths.append((start, target, weight))
+
+    for x in range(width):
+        for y in range(height):
+            if x + 1 < width and rng.random() < density:
+                add(((x, y), Direction.EAST), ((x + 1, y), Direction.WEST))
+            if y + 1 < height and rng.random() < density:
+                add(((x, y), Direction.NORTH), ((x, y + 1), Direction.SOUTH))
+
+    for x in range(width):
+        for y in range(height):
+            free = [direction for direction in Direction if ((x, y), direction) not in used]
+            if len(free) >= 2 and rng.random() < loop_ratio:
+                first, second = rng.sample(free, 2)
+                add(((x, y), first), ((x, y), second))
+
+            # Curved path to the upper or right neighbour, leaving both nodes on the same side
+            if rng.random() < curve_ratio:
+                if rng.random() < 0.5 and y + 1 < height:
+                    neighbour, sides = (x, y + 1), (Direction.EAST, Direction.WEST)
+                elif x + 1 < width:
+                    neighbour, sides = (x + 1, y), (Direction.NORTH, Direction.SOUTH)
+                else:
+                    continue
+                side = rng.choice(sides)
+                if ((x, y), side) not in used and (neighbour, side) not in used:
+                    add((neighbour, side), ((x, y), side))
+    return paths
+
+
+def generate_planet(width: int, height: Optional[int] = None, planet_class=Planet, **options) -> Planet:
+    """
+    Returns a planet with the paths of generate_paths
+
+    :param width: Integer, number of nodes in x direction
+    :param height: Integer, number of nodes in y direction (width by default)
+    :param planet_class: Planet or a subclass with another storage backend
+    :param options: Further arguments of generate_paths
+    :return: Planet
+    """
+    planet = planet_class()
+    planet.add_paths(generate_paths(width, height, **options))
+    return planet
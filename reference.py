@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+
+# Attention: Do not import the ev3dev.ev3 module in this file
+"""
+Reference implementations of the original planning algorithms.
+
+They are kept verbatim (as free functions taking the planet as first argument) so that benchmarks and tests can
+compare the optimized engines in planet.py against the behaviour the robot originally shipped with.
+intelligent_explore runs the original shortest_path of this module, so routes of the same cost may start in another
+direction than in planet.py; tests compare such decisions by their cost.
+It reads the open directions from the frontier as lists, like the original visited/unvisited attributes.
+"""
+from typing import Optional, List, Tuple
+
+from RobolabCode.planet import Direction, Planet
+
+
+def shortest_path(planet: Planet, start: Tuple[int, int],
+                  target: Tuple[int, int]) -> Optional[List[Tuple[Tuple[int, int], Direction]]]:
+    """
+    Original Dijkstra implementation which scans all distances for the minimum in every step
+
+    :param planet: Planet
+    :param start: 2-Tuple
+    :param target: 2-Tuple
+    :return: None, List[] or List[Tuple[Tuple[int, int], Direction]]
+    """
+    nodes = planet.get_paths()
+    road_to_the_node = list()
+
+    if len(nodes) == 0 or (target not in nodes):
+        return None
+    elif start == target:
+        return road_to_the_node
+    else:
+        unvisited_nodes = nodes
+        current_node = start
+
+        distances = {}
+        for node in unvisited_nodes.keys():
+            if node == start:
+                distances[node] = 0
+            else:
+                distances[node] = planet.infinity
+
+        nodes_to_target = {}
+
+        while target in distances:
+            current_neighbour = unvisited_nodes[current_node].items()
+            for key, value in current_neighbour:
+                goal = value[0]
+                distance_to_the_neighbour = value[2]
+                if goal in distances.keys() and value[2] != -1:
+                    if distances[current_node] + distance_to_the_neighbour < distances[goal]:
+                        current_distance = distances[current_node] + distance_to_the_neighbour
+                        distances[goal] = current_distance
+                        nodes_to_target[goal] = (current_node, key)
+
+            distances.pop(current_node)
+
+            for new_node, weight in distances.items():
+                if weight == min(distances.values()):
+                    current_node = new_node
+
+        current_node = target
+        while current_node != start:
+            if current_node not in nodes_to_target:
+                return None
+            for key, value in nodes_to_target.items():
+                if key == current_node:
+                    road_to_the_node.append(value)
+                    current_node = value[0]
+        if len(road_to_the_node) > 1:
+            road_to_the_node.reverse()
+        return road_to_the_node
+
+
+def intelligent_explore(planet: Planet, coordinates):
+    """
+    Original exploration strategy which runs one shortest_path query for every known node with open directions
+
+    :param planet: Planet
+    :param coordinates: 2-Tuple
+    :return: Direction, None or List[]
+    """
+    visited = {coord: planet.frontier.directions(coord) for coord in planet.frontier.open_directions}
+    unvisited = list(planet.frontier.unvisited)
+
+    if len(visited[coordinates]) == 0:
+        known_paths_to_coord = []
+
+        for coord in visited.keys():
+            if len(visited[coord]):
+                path = shortest_path(planet, coordinates, coord)
+                if path is None:
+                    continue
+                if len(path) == 0:
+                    break
+                else:
+                    total = 0
+                    for vertex in path:
+                        direction = vertex[1]
+                        weight = planet.paths[vertex[0]][direction][2]
+                        total += weight
+                    known_paths_to_coord.append((coord, total))
+
+        for coord in unvisited:
+            path = shortest_path(planet, coordinates, coord)
+            if path:
+                total = 0
+                for vertex in path:
+                    direction = vertex[1]
+                    weight = planet.paths[vertex[0]][direction][2]
+                    total += weight
+                known_paths_to_coord.append((coord, total))
+
+        shortest_path_weight = planet.infinity
+        coord_smallest_weight = None
+        for vertex in known_paths_to_coord:
+            if vertex[1] < shortest_path_weight:
+                coord_smallest_weight = vertex[0]
+                shortest_path_weight = vertex[1]
+
+        road_to_the_node = shortest_path(planet, coordinates, coord_smallest_weight)
+        if not road_to_the_node:
+            return road_to_the_node
+        else:
+            return road_to_the_node[0][1]
+    else:
+        direction_to_take = visited[coordinates][0]
+        return direction_to_take
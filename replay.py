@@ -0,0 +1,388 @@
+#!/usr/bin/env python3
+
+# Attention: Do not import the ev3dev.ev3 module in this file
+"""
+Mission log and replay
+
+MissionRecorder sits between the decision loop (RobolabCode.mission.run_mission) and the server connection and
+robot. It appends every answer the loop receives and every decision of the planet to a binary log, one record per
+event, flushed as it happens so the log of a crashed mission is complete up to the crash.
+
+replay_mission runs the decision loop again on the log: the messages, scans and drives are read from the log, so
+the mission is re-executed as fast as the planning code allows. It reports the time of every decision and every
+decision which differs from the recorded one.
+
+Layout (little endian): magic "RLML", version, then records of a one byte kind followed by its fields
+    vertex      int32 x, int32 y, uint8 direction // 90 (255 if there is no direction)
+    READY       vertex of the robot at the first node
+    TARGET      uint8 flag (0 no target, 1 coordinates, 2 "done"), int32 x, int32 y
+    SELECT      uint8 count, count * uint8 direction, the directions forced by pathSelect
+    PATH        start vertex, end vertex, int32 weight, uint8 status (0 free, 1 blocked)
+    UNVEILED    uint16 count, count * PATH fields
+    SCAN        uint8 count, count * uint8 direction
+    DRIVE       uint8 direction driven, uint8 status, vertex approximated by the odometry
+    DECISION    vertex of the chosen direction, float64 seconds spent in the planet
+    COMPLETE    the explorationComplete message was sent
+    END         uint8 target reached
+A log may hold several missions, each starts with READY.
+"""
+import struct
+import sys
+import time
+from typing import TYPE_CHECKING
+
+from RobolabCode.mission import run_mission
+from RobolabCode.planet import Direction, Planet
+
+if TYPE_CHECKING:
+    from typing import List, Optional, Tuple
+
+MAGIC = b'RLML'
+VERSION = 1
+HEADER = struct.Struct('<4sH')
+
+READY, TARGET, SELECT, PATH, UNVEILED, SCAN, DRIVE, DECISION, COMPLETE, END = range(1, 11)
+
+NO_DIRECTION = 255
+STATUS = ("free", "blocked")
+
+VERTEX = struct.Struct('<iiB')
+TARGET_FIELDS = struct.Struct('<Bii')
+PATH_FIELDS = struct.Struct('<iiBiiBiB')
+COUNT = struct.Struct('<B')
+UNVEILED_COUNT = struct.Struct('<H')
+DRIVE_FIELDS = struct.Struct('<BBiiB')
+DECISION_FIELDS = struct.Struct('<iiBd')
+END_FIELDS = struct.Struct('<B')
+
+
+def _direction_code(direction) -> int:
+    return NO_DIRECTION if direction is None or direction == [] else int(direction) // 90
+
+
+def _direction(code: int) -> 'Optional[Direction]':
+    return None if code == NO_DIRECTION else Direction(code * 90)
+
+
+def _pack_path(start_vertex, end_vertex, weight, status) -> bytes:
+    return PATH_FIELDS.pack(start_vertex[0][0], start_vertex[0][1], _direction_code(start_vertex[1]),
+                            end_vertex[0][0], end_vertex[0][1], _direction_code(end_vertex[1]),
+                            int(weight), STATUS.index(status))
+
+
+def _unpack_path(data, offset: int) -> tuple:
+    x, y, direction, end_x, end_y, end_direction, weight, status = PATH_FIELDS.unpack_from(data, offset)
+    return ((x, y), _direction(direction)), ((end_x, end_y), _direction(end_direction)), weight, STATUS[status]
+
+
+class LogEnd(Exception):
+    """ Raised by ReplayServer when the decision loop asks for more than the log holds (a crashed mission) """
+
+
+class MissionRecorder:
+    """
+    Logs a mission while passing every call of the decision loop to the server connection and the robot.
+    Implements the interface of communication.Communication used by run_mission and the robot adapter, use it as
+    both and decision as on_decision:
+        recorder = MissionRecorder(com, robot, "mission.rlog")
+        run_mission(explorer, recorder, recorder, recorder.decision)
+        recorder.close()
+    """
+
+    def __init__(self, com, robot, path: str):
+        """
+        :param com: Communication
+        :param robot: Robot adapter with scan and drive
+        :param path: String, file name, the mission is appended if the file exists
+        """
+        self.com = com
+        self.robot = robot
+        self.file = open(path, 'ab')
+        if self.file.tell() == 0:
+            self._write(HEADER.pack(MAGIC, VERSION))
+
+    def _write(self, record: bytes):
+        self.file.write(record)
+        self.file.flush()
+
+    # --- Communication ---
+
+    def return_message(self, kind: str, args=None):
+        answer = self.com.return_message(kind, args)
+        if kind == "ready":
+            coordinates, orientation = answer[1]
+            self._write(bytes((READY,)) + VERTEX.pack(coordinates[0], coordinates[1], _direction_code(orientation)))
+        elif kind == "target":
+            if answer is None:
+                fields = TARGET_FIELDS.pack(0, 0, 0)
+            elif answer == "done":
+                fields = TARGET_FIELDS.pack(2, 0, 0)
+            else:
+                fields = TARGET_FIELDS.pack(1, answer[0], answer[1])
+            self._write(bytes((TARGET,)) + fields)
+        elif kind == "pathSelect":
+            self._write(bytes((SELECT, len(answer))) + bytes(_direction_code(direction) for direction in answer))
+        elif kind == "path":
+            self._write(bytes((PATH,)) + _pack_path(*answer))
+        elif kind == "pathUnveiled":
+            self._write(bytes((UNVEILED,)) + UNVEILED_COUNT.pack(len(answer)) +
+                        b''.join(_pack_path(*path) for path in answer))
+        elif kind == "explorationComplete":
+            self._write(bytes((COMPLETE,)))
+        return answer
+
+    def clear_values(self):
+        self.com.clear_values()
+
+    def is_target_reached(self) -> bool:
+        return self.com.is_target_reached()
+
+    def is_exploration_complete(self, direction) -> bool:
+        return self.com.is_exploration_complete(direction)
+
+    # --- Robot ---
+
+    def scan(self, orientation: Direction):
+        directions = self.robot.scan(orientation)
+        self._write(bytes((SCAN, len(directions))) + bytes(_direction_code(direction) for direction in directions))
+        return directions
+
+    def drive(self, coordinates, orientation, direction):
+        status, vertex_approx = self.robot.drive(coordinates, orientation, direction)
+        self._write(bytes((DRIVE,)) + DRIVE_FIELDS.pack(_direction_code(direction), STATUS.index(status),
+                                                        vertex_approx[0][0], vertex_approx[0][1],
+                                                        _direction_code(vertex_approx[1])))
+        return status, vertex_approx
+
+    # --- Planet ---
+
+    def decision(self, coordinates: tuple, direction, seconds: float):
+        """ on_decision of run_mission """
+        self._write(bytes((DECISION,)) + DECISION_FIELDS.pack(coordinates[0], coordinates[1],
+                                                              _direction_code(direction), seconds))
+
+    def close(self):
+        """ Ends the mission in the log """
+        self._write(bytes((END,)) + END_FIELDS.pack(self.com.is_target_reached()))
+        self.file.close()
+
+
+def read_log(path: str) -> 'List[List[Tuple[int, tuple]]]':
+    """
+    Reads a mission log
+
+    Example:
+        read_log("mission.rlog") returns:
+            [[(READY, ((0, 0), Direction.NORTH)), (SCAN, [Direction.NORTH]), (DECISION, ((0, 0), ..., 0.0002)), ...]]
+    :param path: String, file name
+    :return: List of missions, each a list of (kind, fields)
+    """
+    with open(path, 'rb') as file:
+        data = file.read()
+    if len(data) < HEADER.size:
+        raise ValueError(f"{path} is not a mission log of version {VERSION}")
+    magic, version = HEADER.unpack_from(data, 0)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError(f"{path} is not a mission log of version {VERSION}")
+
+    missions = []
+    offset = HEADER.size
+    while offset < len(data):
+        kind = data[offset]
+        offset += 1
+        if kind == READY:
+            x, y, direction = VERTEX.unpack_from(data, offset)
+            offset += VERTEX.size
+            fields = ((x, y), _direction(direction))
+            missions.append([])
+        elif kind == TARGET:
+            flag, x, y = TARGET_FIELDS.unpack_from(data, offset)
+            offset += TARGET_FIELDS.size
+            fields = (None, (x, y), "done")[flag]
+        elif kind in (SELECT, SCAN):
+            count = data[offset]
+            fields = [_direction(code) for code in data[offset + 1:offset + 1 + count]]
+            offset += 1 + count
+        elif kind == PATH:
+            fields = _unpack_path(data, offset)
+            offset += PATH_FIELDS.size
+        elif kind == UNVEILED:
+            count, = UNVEILED_COUNT.unpack_from(data, offset)
+            offset += UNVEILED_COUNT.size
+            fields = [_unpack_path(data, offset + i * PATH_FIELDS.size) for i in range(count)]
+            offset += count * PATH_FIELDS.size
+        elif kind == DRIVE:
+            direction, status, x, y, approx_direction = DRIVE_FIELDS.unpack_from(data, offset)
+            offset += DRIVE_FIELDS.size
+            fields = (_direction(direction), STATUS[status], ((x, y), _direction(approx_direction)))
+        elif kind == DECISION:
+            x, y, direction, seconds = DECISION_FIELDS.unpack_from(data, offset)
+            offset += DECISION_FIELDS.size
+            fields = ((x, y), _direction(direction), seconds)
+        elif kind == COMPLETE:
+            fields = None
+        elif kind == END:
+            fields = bool(data[offset])
+            offset += END_FIELDS.size
+        else:
+            raise ValueError(f"Unknown record {kind} at byte {offset - 1} of {path}")
+        if offset > len(data):
+            raise ValueError(f"{path} ends inside a record")
+        if not missions:
+            raise ValueError(f"{path} does not start with a ready record")
+        missions[-1].append((kind, fields))
+    return missions
+
+
+class ReplayServer:
+    """
+    Answers the calls of the decision loop from the records of one mission.
+    Implements the interface of communication.Communication used by run_mission and the robot adapter.
+    If the planet chooses a different direction than in the log, pathSelect forces the recorded one, so the rest of
+    the mission is replayed on the recorded drives. LogEnd is raised when the log of a crashed mission runs out.
+    """
+
+    def __init__(self, records: 'List[Tuple[int, tuple]]'):
+        self.records = records
+        self.position = 0
+        self.drives_left = sum(1 for kind, fields in records if kind == PATH)
+        self.reached = any(kind == END and fields for kind, fields in records)
+
+    def _next(self, kind: int):
+        """ Returns the fields of the next record, which must be of kind (decisions are skipped) """
+        while self.position < len(self.records) and self.records[self.position][0] == DECISION:
+            self.position += 1
+        if self.position == len(self.records) or self.records[self.position][0] == END and kind != END:
+            raise LogEnd(f"The log ends at record {self.position}")
+        if self.records[self.position][0] != kind:
+            found = self.records[self.position][0]
+            raise ValueError(f"The decision loop asks for record {kind}, the log has {found} at {self.position}")
+        self.position += 1
+        return self.records[self.position - 1][1]
+
+    def _next_drive(self):
+        """ Returns the direction of the next recorded drive """
+        for kind, fields in self.records[self.position:]:
+            if kind == DRIVE:
+                return fields[0]
+        return None
+
+    # --- Communication ---
+
+    def return_message(self, kind: str, args=None):
+        if kind == "ready":
+            return "replay", self._next(READY)
+        if kind == "pathSelect":
+            forced = self._next(SELECT)
+            driven = self._next_drive()
+            if not forced and driven is not None and args[1] != driven:
+                return [driven]
+            return forced
+        if kind == "path":
+            self.drives_left -= 1
+            return self._next(PATH)
+        if kind == "target":
+            return self._next(TARGET)
+        if kind == "pathUnveiled":
+            return self._next(UNVEILED)
+        if kind == "explorationComplete":
+            return self._next(COMPLETE)
+        raise ValueError(f"Unknown message {kind}")
+
+    def clear_values(self):
+        pass
+
+    def is_target_reached(self) -> bool:
+        return self.drives_left == 0 and self.reached
+
+    def is_exploration_complete(self, direction) -> bool:
+        return self.drives_left == 0
+
+    # --- Robot ---
+
+    def scan(self, orientation: Direction):
+        return self._next(SCAN)
+
+    def drive(self, coordinates, orientation, direction):
+        driven, status, vertex_approx = self._next(DRIVE)
+        return status, vertex_approx
+
+
+def replay_mission(path: str, mission: int = -1, explorer: 'Optional[Planet]' = None) -> dict:
+    """
+    Re-executes a recorded mission on the planning code. The log of a crashed mission is replayed up to its last
+    record, "complete" is False then and "log_end" the index of the record at which the log ends.
+
+    Example:
+        replay_mission("logs/mission.rlog") returns:
+            {"decisions": 41, "planning_time": 0.003, "times": [...], "recorded_times": [...],
+             "divergences": [(12, (1, 2), Direction.EAST, Direction.NORTH)], "complete": True, ...}
+    :param path: String, file name of the log
+    :param mission: Integer, index of the mission in the log
+    :param explorer: Planet used for the replay, a new Planet by default
+    :return: Dict with the results, divergences are (decision index, coordinates, recorded, replayed)
+    """
+    records = read_log(path)[mission]
+    recorded = [fields for kind, fields in records if kind == DECISION]
+    server = ReplayServer(records)
+    explorer = Planet() if explorer is None else explorer
+    times = []
+    divergences = []
+
+    def on_decision(coordinates, direction, seconds):
+        index = len(times)
+        times.append(seconds)
+        if direction == []:
+            direction = None
+        if index >= len(recorded):
+            divergences.append((index, coordinates, None, direction))
+        elif recorded[index][:2] != (coordinates, direction):
+            divergences.append((index, coordinates, recorded[index][1], direction))
+
+    begin = time.perf_counter()
+    log_end = None
+    try:
+        run_mission(explorer, server, server, on_decision)
+    except LogEnd:
+        log_end = server.position
+    elapsed = time.perf_counter() - begin
+
+    return {
+        "decisions": len(times),
+        "recorded_decisions": len(recorded),
+        "planning_time": sum(times),
+        "max_planning_time": max(times, default=0.0),
+        "recorded_planning_time": sum(seconds for coordinates, direction, seconds in recorded),
+        "times": times,
+        "recorded_times": [seconds for coordinates, direction, seconds in recorded],
+        "divergences": divergences,
+        "complete": log_end is None,
+        "log_end": log_end,
+        "elapsed": elapsed,
+        "explorer": explorer,
+    }
+
+
+def main():
+    """ Replays the missions of a log and prints the timings and divergences """
+    if len(sys.argv) != 2:
+        raise SystemExit("usage: python -m RobolabCode.replay <mission log>")
+    for index in range(len(read_log(sys.argv[1]))):
+        result = replay_mission(sys.argv[1], index)
+        print(f"mission {index}: {result['decisions']} decisions ({result['recorded_decisions']} recorded), "
+              f"planning {result['planning_time'] * 1000:.2f} ms "
+              f"(recorded {result['recorded_planning_time'] * 1000:.2f} ms), replay {result['elapsed'] * 1000:.2f} ms")
+        print(f"{'decision':>9} {'recorded [ms]':>14} {'replay [ms]':>12}")
+        for decision, seconds in enumerate(result["times"]):
+            recorded = result["recorded_times"][decision] if decision < len(result["recorded_times"]) else None
+            print(f"{decision:>9} {'-' if recorded is None else format(recorded * 1000, '.3f'):>14} "
+                  f"{seconds * 1000:>12.3f}")
+        for decision, coordinates, recorded, replayed in result["divergences"]:
+            print(f"divergence at decision {decision} at {coordinates}: recorded {recorded}, replayed {replayed}")
+        if not result["complete"]:
+            print(f"the log ends at record {result['log_end']} after decision {result['decisions'] - 1}, "
+                  f"the mission did not finish")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+
+# Attention: Do not import the ev3dev.ev3 module in this file
+"""
+One planet shared by several robots (threads) of one process
+
+A single writer at a time changes the planet, every change is published as a new immutable snapshot. Readers plan
+on a PlanetView of the latest snapshot and never wait for a writer: publishing replaces one reference.
+Snapshots are copy on write: the nodes and frontier entries are kept in layers of dictionaries (_Layers), a change
+writes only the entries it touches into a new layer, all other entries are shared between the snapshots. The
+direction dictionaries are copied for the nodes whose paths change only.
+
+Example:
+    shared = SharedPlanet()
+    shared.add_paths([(((0, 0), Direction.EAST), ((1, 0), Direction.WEST), 2)])  # writer thread
+    shared.reader().shortest_path((0, 0), (1, 0))  # any thread
+"""
+import threading
+from collections.abc import MutableMapping
+from contextlib import contextmanager
+from typing import Iterable, Optional, Tuple
+
+from RobolabCode.planet import Direction, Frontier, FrontierIndex, Planet
+
+_DELETED = object()  # marks a key deleted in a layer
+_MISSING = object()
+
+
+class _Layers(MutableMapping):
+    """
+    Dictionary made of a stack of dictionaries (layers), the newest first. Writes only go into the newest layer,
+    the layers below are shared with published snapshots and never changed, deleted keys are marked in the newest
+    layer. freeze() publishes the layers and merges a layer into a new dictionary with the one below it while it
+    holds at least half as many keys: every key is copied O(log n) times over all writes and a lookup reads O(log n)
+    layers. The keys are iterated in the order in which they were first added.
+    """
+    __slots__ = ("layers", "size", "frozen")
+
+    def __init__(self, layers: tuple = (), size: int = 0, frozen: bool = False):
+        """
+        :param layers: Tuple of dictionaries, newest first, which are not changed any more
+        :param size: Integer, number of keys in layers
+        :param frozen: Boolean, a frozen dictionary raises a TypeError on writes, others write into a new layer
+        """
+        self.layers = layers if frozen else ({},) + layers
+        self.size = size
+        self.frozen = frozen
+
+    def __getitem__(self, key):
+        for layer in self.layers:
+            value = layer.get(key, _MISSING)
+            if value is not _MISSING:
+                if value is _DELETED:
+                    break
+                return value
+        raise KeyError(key)
+
+    def get(self, key, default=None):
+        for layer in self.layers:
+            value = layer.get(key, _MISSING)
+            if value is not _MISSING:
+                return default if value is _DELETED else value
+        return default
+
+    def __contains__(self, key) -> bool:
+        return self.get(key, _DELETED) is not _DELETED
+
+    def __len__(self) -> int:
+        return self.size
+
+    def __iter__(self):
+        seen = set()
+        for layer in reversed(self.layers):
+            for key in layer:
+                if key not in seen:
+                    seen.add(key)
+                    if key in self:
+                        yield key
+
+    def __setitem__(self, key, value):
+        if self.frozen:
+            raise TypeError("A snapshot is read-only")
+        if key not in self:
+            self.size += 1
+        self.layers[0][key] = value
+
+    def __delitem__(self, key):
+        if self.frozen:
+            raise TypeError("A snapshot is read-only")
+        if key not in self:
+            raise KeyError(key)
+        self.size -= 1
+        if len(self.layers) == 1:
+            del self.layers[0][key]
+        else:
+            self.layers[0][key] = _DELETED
+
+    def freeze(self) -> '_Layers':
+        """ Returns the current content as a frozen _Layers, the following writes go into a new layer above it """
+        layers = list(self.layers)
+        while len(layers) > 1 and 2 * len(layers[0]) >= len(layers[1]):
+            merged = dict(layers[1])
+            merged.update(layers[0])
+            if len(layers) == 2:
+                merged = {key: value for key, value in merged.items() if value is not _DELETED}
+            layers[:2] = [merged]
+        frozen = _Layers(tuple(layers), self.size, frozen=True)
+        self.layers = ({},) + frozen.layers
+        return frozen
+
+
+def _frontier(frontier: Frontier, make) -> Frontier:
+    """ Returns a Frontier whose dictionaries are make(dictionary) of the ones of frontier """
+    result = Frontier()
+    result.open_directions = make(frontier.open_directions)
+    result.unvisited = make(frontier.unvisited)
+    result.ranks = make(frontier.ranks)
+    result.discovered = frontier.discovered
+    result._sequence = frontier._sequence
+    return result
+
+
+class PlanetSnapshot:
+    """
+    Immutable state of a SharedPlanet: paths, frontier and Manhattan scale of one version, the dictionaries are frozen
+    _Layers
+    """
+    __slots__ = ("version", "paths", "frontier", "manhattan_scale")
+
+    def __init__(self, version: int, paths: _Layers, frontier: Frontier, manhattan_scale: Optional[float]):
+        self.version = version
+        self.paths = paths
+        self.frontier = frontier
+        self.manhattan_scale = manhattan_scale
+
+
+class PlanetView(Planet):
+    """
+    Read-only planet of one snapshot. The caches (tree_cache, route_memo, frontier_index) belong to the view,
+    so views in different threads do not share any mutable state. Every method which changes the paths or the
+    frontier raises a TypeError, the frontier itself is frozen as well.
+    """
+
+    def __init__(self, snapshot: PlanetSnapshot):
+        super().__init__()
+        self.version = snapshot.version
+        self.paths = snapshot.paths
+        self.frontier = _frontier(snapshot.frontier, lambda layers: layers)
+        self.frontier_index = FrontierIndex(self)
+        self._manhattan_scale = snapshot.manhattan_scale
+        self._asymmetric_in = None
+
+    def _read_only(self, *args, **kwargs):
+        raise TypeError("A PlanetView is read-only, change the planet through the SharedPlanet")
+
+    add_paths = handle_unveiled_paths = ingest_unveiled = close_known_paths = remove_if_blocked = \
+        remove_driven_paths = _read_only
+
+
+class _CopyOnWritePlanet(Planet):
+    """
+    Planet of the writer, it never changes a dictionary which was published in a snapshot
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.paths = _Layers()
+        self.frontier = _frontier(self.frontier, lambda dictionary: _Layers())
+        self.frontier_index = FrontierIndex(self)
+        self._owned = set()  # nodes whose direction dictionary was copied since the last snapshot
+
+    def begin(self):
+        """ Starts a change: the direction dictionaries are copied again before they are changed """
+        self._owned = set()
+
+    def _store_path(self, start: Tuple[Tuple[int, int], Direction], target: Tuple[Tuple[int, int], Direction],
+                    weight: int):
+        for node in (start[0], target[0]):
+            if node not in self._owned:
+                self.paths[node] = dict(self.paths.get(node, {}))
+                self._owned.add(node)
+        super()._store_path(start, target, weight)
+
+
+class SharedPlanet:
+    """
+    Planet for one writer and many readers in different threads
+    """
+
+    def __init__(self, planet: Optional[Planet] = None):
+        """
+        :param planet: Planet whose paths and frontier are copied, an empty planet if None
+        """
+        self.lock = threading.Lock()  # held by the writer
+        self.writer = _CopyOnWritePlanet()
+        if planet is not None:
+            paths = {node: dict(directions) for node, directions in planet.get_paths().items()}
+            self.writer.paths = _Layers((paths,), len(paths))
+            self.writer.frontier = _frontier(planet.frontier, lambda dictionary: _Layers((dict(dictionary),),
+                                                                                         len(dictionary)))
+            self.writer.frontier_index = FrontierIndex(self.writer)
+            self.writer._manhattan_scale = planet._manhattan_scale
+            self.writer._asymmetric_in = None
+        self.snapshot = self._publish(0)
+        self._local = threading.local()
+
+    def _publish(self, version: int) -> PlanetSnapshot:
+        writer = self.writer
+        return PlanetSnapshot(version, writer.paths.freeze(), _frontier(writer.frontier, _Layers.freeze),
+                              writer._manhattan_scale)
+
+    @contextmanager
+    def write(self):
+        """
+        Changes the planet: yields the writer's Planet, the changes are published together at the end of the block.
+        If the block raises, none of its changes are published. Writers wait for each other, readers do not wait.
+
+        Example:
+            with shared.write() as planet:
+                planet.add_path(((0, 0), Direction.EAST), ((1, 0), Direction.WEST), 2)
+                planet.frontier.visit((0, 0), [Direction.NORTH])
+        :return: Planet
+        """
+        with self.lock:
+            self.writer.begin()
+            try:
+                yield self.writer
+            except BaseException:
+                self._roll_back()
+                raise
+            self.snapshot = self._publish(self.snapshot.version + 1)
+
+    def _roll_back(self):
+        """ Drops the changes of a failed write, the dictionaries of the last snapshot were not changed """
+        writer, snapshot = self.writer, self.snapshot
+        writer.paths = _Layers(snapshot.paths.layers, len(snapshot.paths))
+        writer.frontier = _frontier(snapshot.frontier, lambda layers: _Layers(layers.layers, len(layers)))
+        writer.frontier_index = FrontierIndex(writer)
+        writer._manhattan_scale = snapshot.manhattan_scale
+        writer._asymmetric_in = None
+        writer.tree_cache.invalidate()
+        writer.hierarchy = None
+        if writer.corridors is not None:
+            writer.use_corridors()
+        writer.active_route.clear()
+        writer.generation += 1
+
+    def add_path(self, start: Tuple[Tuple[int, int], Direction], target: Tuple[Tuple[int, int], Direction],
+                 weight: int):
+        """ Planet.add_path as one change """
+        with self.write() as planet:
+            planet.add_path(start, target, weight)
+
+    def add_paths(self, paths: Iterable[Tuple[Tuple[Tuple[int, int], Direction], Tuple[Tuple[int, int], Direction], int]]):
+        """ Planet.add_paths as one change """
+        with self.write() as planet:
+            planet.add_paths(paths)
+
+    def handle_unveiled_paths(self, unveiled_paths):
+        """ Planet.handle_unveiled_paths as one change """
+        with self.write() as planet:
+            planet.handle_unveiled_paths(unveiled_paths)
+
+    def reader(self) -> PlanetView:
+        """
+        Returns the view of the latest snapshot for the calling thread. The view is kept while no change is published,
+        so its caches are reused by the following queries of the thread.
+
+        :return: PlanetView
+        """
+        snapshot = self.snapshot
+        view = getattr(self._local, "view", None)
+        if view is None or view.version != snapshot.version:
+            view = PlanetView(snapshot)
+            self._local.view = view
+        return view
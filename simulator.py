@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+
+# Attention: Do not import the ev3dev.ev3 module in this file
+"""
+Offline simulation of a mission
+
+A ground truth planet plays the role of the server and of the robot's sensors, the decision loop is the one of
+main.run (RobolabCode.mission.run_mission). No ev3dev, MQTT or robot is needed.
+"""
+import random
+import time
+from typing import Optional, Tuple
+
+from RobolabCode.mission import SpeculativePlanner, run_mission
+from RobolabCode.planet import Direction, Planet
+
+
+class SimulatedServer:
+    """
+    Answers the messages of the decision loop from a ground truth planet and drives a perfect robot on it.
+    Implements the interface of communication.Communication used by run_mission and the robot adapter.
+    """
+
+    def __init__(self, truth: Planet, start: Tuple[Tuple[int, int], Direction], target: Optional[Tuple[int, int]] = None,
+                 unveil_rate: float = 0.0, unveil_count: int = 3, seed: int = 0, max_drives: int = 100000):
+        """
+        :param truth: Planet with all paths
+        :param start: Coordinates and orientation of the robot at the first node
+        :param target: Coordinates sent as target or None for an exploration
+        :param unveil_rate: Probability that a pathUnveiled message contains paths
+        :param unveil_count: Number of paths in such a message
+        :param seed: Integer, seeds the unveiled paths
+        :param max_drives: Integer, the mission fails with a RuntimeError after this many drives
+        """
+        self.truth = truth
+        self.start = start
+        self.target = target
+        self.unveil_rate = unveil_rate
+        self.unveil_count = unveil_count
+        self.rng = random.Random(seed)
+        self.max_drives = max_drives
+
+        self.position = start[0]
+        self.known = set()  # (coordinates, direction) of path ends the robot knows about
+        self.drive_cost = 0
+        self.drives = 0
+        self.blocked_drives = 0
+        self.exploration_completed = False
+
+    # --- Communication ---
+
+    def return_message(self, kind: str, args=None):
+        if kind == "ready":
+            return "simulation", self.start
+        if kind == "pathSelect":
+            return []
+        if kind == "path":
+            return self._path(*args)
+        if kind == "target":
+            return self.target
+        if kind == "pathUnveiled":
+            return self._unveil()
+        if kind == "explorationComplete":
+            self.exploration_completed = True
+            return None
+        raise ValueError(f"Unknown message {kind}")
+
+    def clear_values(self):
+        pass
+
+    def is_target_reached(self) -> bool:
+        return self.target is not None and self.position == self.target
+
+    @staticmethod
+    def is_exploration_complete(direction) -> bool:
+        return direction is None or direction == []
+
+    def _path(self, start_vertex, vertex_approx, status):
+        """ The robot reports a driven path, the server answers with the real one """
+        coordinates, direction = start_vertex
+        goal, goal_direction, weight = self.truth.get_paths()[coordinates][direction]
+        self.drives += 1
+        if self.drives > self.max_drives:
+            raise RuntimeError(f"Mission did not finish after {self.max_drives} drives")
+        if weight == -1:
+            self.blocked_drives += 1
+            self.known.add((coordinates, direction))
+            return (coordinates, direction), (coordinates, direction), -1, "blocked"
+        self.drive_cost += weight
+        self.position = goal
+        self.known.add((coordinates, direction))
+        self.known.add((goal, goal_direction))
+        return (coordinates, direction), (goal, goal_direction), weight, "free"
+
+    def _unveil(self):
+        """ Sends some paths of the planet which the robot does not know yet """
+        if self.unveil_rate <= 0 or self.rng.random() >= self.unveil_rate:
+            return []
+        unveiled = []
+        for _ in range(self.unveil_count):
+            coordinates = self.rng.choice(list(self.truth.get_paths()))
+            for direction, (goal, goal_direction, weight) in self.truth.get_paths()[coordinates].items():
+                if (coordinates, direction) not in self.known:
+                    self.known.add((coordinates, direction))
+                    self.known.add((goal, goal_direction))
+                    unveiled.append(((coordinates, direction), (goal, goal_direction), weight,
+                                     "blocked" if weight == -1 else "free"))
+                    break
+        return unveiled
+
+    # --- Robot ---
+
+    def scan(self, orientation: Direction):
+        """ Returns all directions with a line at the robot's node """
+        return list(self.truth.get_paths().get(self.position, {}).keys())
+
+    def drive(self, coordinates, orientation, direction):
+        """ Perfect odometry: the approximated vertex is the real one """
+        goal, goal_direction, weight = self.truth.get_paths()[coordinates][direction]
+        if weight == -1:
+            return "blocked", (coordinates, direction)
+        return "free", (goal, goal_direction)
+
+
+def simulate(truth: Planet, start: Tuple[Tuple[int, int], Direction], target: Optional[Tuple[int, int]] = None,
+             explorer: Optional[Planet] = None, speculate: bool = False, **server_options) -> dict:
+    """
+    Runs one mission against the ground truth planet
+
+    Example:
+        simulate(truth, ((0, 0), Direction.NORTH)) returns:
+            {"drive_cost": 120, "drives": 40, "blocked_drives": 2, "decisions": 41, "planning_time": 0.003, ...}
+    :param truth: Planet with all paths
+    :param start: Coordinates and orientation of the robot at the first node
+    :param target: Coordinates or None for an exploration
+    :param explorer: Planet used by the robot, a new Planet by default
+    :param speculate: Boolean, plans the next decision while driving (mission.SpeculativePlanner)
+    :param server_options: Further arguments of SimulatedServer
+    :return: Dict with the results
+    """
+    server = SimulatedServer(truth, start, target, **server_options)
+    explorer = Planet() if explorer is None else explorer
+    speculation = SpeculativePlanner(explorer) if speculate else None
+    planning_times = []
+
+    begin = time.perf_counter()
+    run_mission(explorer, server, server, lambda coordinates, direction, seconds: planning_times.append(seconds),
+                speculation)
+    elapsed = time.perf_counter() - begin
+
+    return {
+        "drive_cost": server.drive_cost,
+        "drives": server.drives,
+        "blocked_drives": server.blocked_drives,
+        "decisions": len(planning_times),
+        "planning_time": sum(planning_times),
+        "max_planning_time": max(planning_times),
+        "elapsed": elapsed,
+        "target_reached": server.is_target_reached(),
+        "exploration_completed": server.exploration_completed,
+        "speculation": speculation.stats() if speculation is not None else None,
+        "explorer": explorer,
+    }
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+
+# Attention: Do not import the ev3dev.ev3 module in this file
+"""
+Binary snapshots of a planet
+
+Layout (little endian, every section starts at a multiple of 4 bytes):
+    header      magic "RLPS", version, node count, visited count, unvisited count, Manhattan scale (NaN if unknown)
+    xs, ys      int32 per node
+    neighbours  int32 per direction slot (4 per node, -1 if there is no path)
+    weights     int32 per direction slot
+    arrivals    int8 per direction slot (direction // 90 of the arrival direction)
+    visited     int32 x, int32 y per visited node, then one uint8 bitmask of open directions per visited node
+    unvisited   int32 x, int32 y per unvisited node
+
+The slot arrays are the ones of CompactPlanet, load_snapshot maps them into memory without reading them.
+"""
+import math
+import mmap
+import struct
+import sys
+from array import array
+from typing import List, Tuple
+
+from RobolabCode.compact_planet import CompactPlanet, CompactPaths
+from RobolabCode.planet import OPEN_DIRECTIONS, Planet
+
+MAGIC = b'RLPS'
+VERSION = 1
+HEADER = struct.Struct('<4sHxxIIId')
+
+
+def _pad(data: bytes) -> bytes:
+    """ Pads data to a multiple of 4 bytes """
+    return data + b'\0' * (-len(data) % 4)
+
+
+def _little_endian(values: array) -> bytes:
+    if sys.byteorder != 'little':
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+
+def save_snapshot(planet: Planet, path: str):
+    """
+    Writes paths, weights, open directions of visited nodes and unvisited nodes of planet to a file
+
+    :param planet: Planet or CompactPlanet
+    :param path: String, file name
+    :return: void
+    """
+    if isinstance(planet, CompactPlanet):
+        compact = planet
+    else:
+        # Copy slot by slot, so paths which are not symmetric (after overwriting) stay as they are
+        compact = CompactPlanet()
+        for node in planet.get_paths():
+            compact.intern(node)
+        for node, directions in planet.get_paths().items():
+            for direction, (goal, goal_direction, weight) in directions.items():
+                slot = compact.ids[node] * 4 + direction // 90
+                compact.neighbours[slot] = compact.ids[goal]
+                compact.arrivals[slot] = goal_direction // 90
+                compact.weights[slot] = weight
+
+    frontier = planet.frontier
+    visited = list(frontier.open_directions)
+    unvisited = list(frontier.unvisited)
+    scale = planet._manhattan_scale
+
+    sections = [
+        HEADER.pack(MAGIC, VERSION, len(compact.coordinates), len(visited), len(unvisited),
+                    math.nan if scale is None else scale),
+        _little_endian(array('i', (node[0] for node in compact.coordinates))),
+        _little_endian(array('i', (node[1] for node in compact.coordinates))),
+        _little_endian(array('i', compact.neighbours)),
+        _little_endian(array('i', compact.weights)),
+        _pad(array('b', compact.arrivals).tobytes()),
+        _little_endian(array('i', (value for node in visited for value in node))),
+        _pad(bytes(frontier.open_directions[node] for node in visited)),
+        _little_endian(array('i', (value for node in unvisited for value in node))),
+    ]
+    with open(path, 'wb') as file:
+        for section in sections:
+            file.write(section)
+
+
+def load_snapshot(path: str) -> CompactPlanet:
+    """
+    Loads a planet written by save_snapshot. The file is memory mapped (copy on write) and the path arrays are used
+    in place, only the coordinates and the frontier are read.
+
+    :param path: String, file name
+    :return: CompactPlanet
+    """
+    with open(path, 'rb') as file:
+        mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_COPY)
+    if len(mapped) < HEADER.size:
+        raise ValueError(f"{path} is not a planet snapshot")
+    magic, version, node_count, visited_count, unvisited_count, scale = HEADER.unpack_from(mapped)
+    if magic != MAGIC:
+        raise ValueError(f"{path} is not a planet snapshot")
+    if version != VERSION:
+        raise ValueError(f"Unsupported planet snapshot version {version} (expected {VERSION})")
+    if sys.byteorder != 'little':
+        raise ValueError("Planet snapshots can only be memory mapped on little endian machines")
+
+    view = memoryview(mapped)
+    offset = HEADER.size
+
+    def section(typecode: str, count: int, size: int) -> memoryview:
+        nonlocal offset
+        data = view[offset:offset + count * size]
+        if len(data) != count * size:
+            raise ValueError(f"{path} is truncated")
+        offset += count * size + (-count * size % 4)
+        return data.cast(typecode)
+
+    xs, ys = section('i', node_count, 4), section('i', node_count, 4)
+    neighbours, weights = section('i', 4 * node_count, 4), section('i', 4 * node_count, 4)
+    arrivals = section('b', 4 * node_count, 1)
+    visited_coordinates = section('i', 2 * visited_count, 4)
+    visited_masks = section('B', visited_count, 1)
+    unvisited_coordinates = section('i', 2 * unvisited_count, 4)
+
+    planet = CompactPlanet()
+    planet.coordinates = list(zip(xs.tolist(), ys.tolist()))
+    planet.ids = {node: node_id for node_id, node in enumerate(planet.coordinates)}
+    planet.neighbours, planet.weights, planet.arrivals = neighbours, weights, arrivals
+    planet.paths = CompactPaths(planet)
+    planet._manhattan_scale = None if math.isnan(scale) else scale
+    planet._asymmetric_in = None
+
+    for node, mask in zip(_pairs(visited_coordinates), visited_masks):
+        planet.frontier.visit(node, OPEN_DIRECTIONS[mask])
+    for node in _pairs(unvisited_coordinates):
+        planet.frontier.discover(node)
+    return planet
+
+
+def _pairs(values: memoryview) -> List[Tuple[int, int]]:
+    values = values.tolist()
+    return list(zip(values[0::2], values[1::2]))
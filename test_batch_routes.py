@@ -0,0 +1,29 @@
+#!/usr/bin/env python3
+
+import random
+import unittest
+from RobolabCode import differential, test_planet
+from RobolabCode.batch_routes import solve_routes
+
+
+class TestBatchRoutes(unittest.TestCase):
+    def test_same_as_shortest_path(self):
+        """
+        This test should check that the batch answers every query in order with a route of the same cost as
+        shortest_path, with and without worker processes
+        """
+        rng = random.Random(14)
+        for processes in (1, 2):
+            for _ in range(10 if processes == 1 else 2):
+                planet = test_planet.TestIntelligentExplore.random_planet(rng)
+                nodes = list(planet.get_paths())
+                queries = [(rng.choice(nodes + [(9, 9)]), rng.choice(nodes + [(9, 9)])) for _ in range(40)]
+                routes = solve_routes(planet, queries, processes=processes)
+                self.assertEqual(len(routes), len(queries))
+                for (start, target), road in zip(queries, routes):
+                    expected = planet.shortest_path(start, target)
+                    self.assertIsNone(differential.check_route(planet, start, target, road, expected))
+
+
+if __name__ == "__main__":
+    unittest.main()
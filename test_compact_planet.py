@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+
+import random
+import unittest
+from RobolabCode import test_planet
+from RobolabCode.compact_planet import CompactPlanet
+from RobolabCode.planet import Direction, Planet
+
+
+class TestCompactPlanet(test_planet.TestRoboLabPlanet):
+    """
+    Runs all tests of the dictionary planet against the array backend
+    """
+    planet_class = CompactPlanet
+
+    def test_memory_usage(self):
+        """
+        This test should check that every node takes four slots of 9 bytes
+        """
+        self.assertEqual(self.planet.memory_usage(), len(self.planet.get_paths()) * 4 * 9)
+
+
+class TestCompactPlanetEquivalence(unittest.TestCase):
+    def test_same_as_planet(self):
+        """
+        This test should check that both backends hold the same paths and find routes of the same cost,
+        including paths which are overwritten or blocked later
+        """
+        rng = random.Random(5)
+        for _ in range(50):
+            planet, compact = Planet(), CompactPlanet()
+            for _ in range(rng.randint(1, 60)):
+                start = (rng.randint(0, 5), rng.randint(0, 5))
+                target = (rng.randint(0, 5), rng.randint(0, 5))
+                path = ((start, rng.choice(list(Direction))), (target, rng.choice(list(Direction))),
+                        -1 if rng.random() < 0.1 else rng.randint(1, 9))
+                planet.add_path(*path)
+                compact.add_path(*path)
+            self.assertEqual(compact.get_paths(), planet.get_paths())
+
+            nodes = list(planet.get_paths())
+            for _ in range(10):
+                start, target = rng.choice(nodes), rng.choice(nodes)
+                costs = [None if road is None else sum(owner.get_paths()[coord][direction][2] for coord, direction in road)
+                         for owner, road in ((planet, planet.shortest_path(start, target)),
+                                             (compact, compact.shortest_path(start, target)))]
+                self.assertEqual(costs[0], costs[1])
+                self.assertEqual({node: cost for node, (cost, direction) in compact.distances_from(start).items()},
+                                 {node: cost for node, (cost, direction) in planet.distances_from(start).items()})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+
+import random
+import unittest
+from RobolabCode import differential, test_planet
+
+
+class TestContractionHierarchy(unittest.TestCase):
+    def test_same_cost_as_dijkstra(self):
+        """
+        This test should check that routes of the hierarchy are connected, cost the same as the ones of the plain
+        search and give the same None/[] results, also with very short witness searches
+        """
+        rng = random.Random(13)
+        for _ in range(100):
+            planet = test_planet.TestIntelligentExplore.random_planet(rng)
+            paths = planet.get_paths()
+            nodes = list(paths)
+            pairs = [(rng.choice(nodes), rng.choice(nodes + [(9, 9)])) for _ in range(5)]
+            expected = [planet.shortest_path(start, target) for start, target in pairs]
+            planet.build_hierarchy(witness_limit=rng.choice((1, 50)))
+            for (start, target), expected_road in zip(pairs, expected):
+                road = planet.shortest_path(start, target)
+                self.assertIsNone(differential.check_route(planet, start, target, road, expected_road))
+                if not road:
+                    continue
+                self.assertEqual(planet.hierarchy.distance(start, target),
+                                 sum(paths[coord][direction][2] for coord, direction in road))
+
+    def test_invalidated_by_add_path(self):
+        """
+        This test should check that adding a path drops the hierarchy, adding a known path again does not
+        """
+        planet = test_planet.TestRoboLabPlanet.build_planet()
+        hierarchy = planet.build_hierarchy()
+        road = planet.shortest_path((0, 0), (2, 2))
+        start, goal = road[0][0], planet.get_paths()[road[0][0]][road[0][1]]
+        start_vertex, target_vertex = (start, road[0][1]), (goal[0], goal[1])
+
+        planet.add_path(start_vertex, target_vertex, goal[2])
+        self.assertIs(planet.hierarchy, hierarchy)
+        planet.add_path(start_vertex, target_vertex, -1)
+        self.assertIsNone(planet.hierarchy)
+        self.assertNotEqual(planet.shortest_path((0, 0), (2, 2))[0], road[0])
+
+
+if __name__ == "__main__":
+    unittest.main()
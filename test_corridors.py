@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+
+import random
+import unittest
+from RobolabCode import differential, test_planet
+from RobolabCode.corridors import CorridorGraph
+from RobolabCode.planet import Direction, Planet
+from RobolabCode.planet_generator import generate_planet
+
+
+class TestCorridorGraph(unittest.TestCase):
+    def assertSameRoute(self, planet: Planet, start, target, expected_road):
+        """ Checks the route and the first hop of the corridor graph against the route of the plain search """
+        road = planet.corridors.route(start, target)
+        self.assertIsNone(differential.check_route(planet, start, target, road, expected_road))
+        if not road:
+            self.assertEqual(planet.corridors.first_hop(start, target), None if road is None else (0, None))
+            return
+        paths = planet.get_paths()
+        cost = sum(paths[coord][direction][2] for coord, direction in road)
+        self.assertEqual(planet.corridors.first_hop(start, target), (cost, road[0][1]))
+
+    def test_same_cost_as_dijkstra(self):
+        """
+        This test should check that routes over the corridor graph are connected, cost the same as the ones of the
+        plain search and give the same None/[] results, between junctions and nodes inside chains
+        """
+        rng = random.Random(17)
+        for attempt in range(150):
+            if attempt % 2:
+                planet = test_planet.TestIntelligentExplore.random_planet(rng)
+            else:
+                planet = generate_planet(rng.randint(2, 8), density=0.6, blocked_ratio=0.1, loop_ratio=0.1,
+                                         curve_ratio=0.1, seed=attempt)
+            nodes = list(planet.get_paths())
+            pairs = [(rng.choice(nodes), rng.choice(nodes + [(9, 9)])) for _ in range(8)]
+            expected = [planet.shortest_path(start, target) for start, target in pairs]
+            planet.use_corridors()
+            for (start, target), expected_road in zip(pairs, expected):
+                self.assertSameRoute(planet, start, target, expected_road)
+
+    def test_update(self):
+        """
+        This test should check that the graph stays correct while paths are added, blocked, overwritten
+        (asymmetric paths) and looped back one by one, and that it ends up as small as a new graph
+        """
+        rng = random.Random(29)
+        for _ in range(40):
+            planet = Planet()
+            planet.use_corridors()
+            side = rng.randint(2, 6)
+            for step in range(rng.randint(5, 40)):
+                start = ((rng.randrange(side), rng.randrange(side)), rng.choice(list(Direction)))
+                target = ((rng.randrange(side), rng.randrange(side)), rng.choice(list(Direction)))
+                weight = -1 if rng.random() < 0.1 else rng.randint(1, 5)
+                planet.add_path(start, target, weight)
+                nodes = list(planet.get_paths())
+                for _ in range(3):
+                    source, goal = rng.choice(nodes), rng.choice(nodes)
+                    planet.corridors, corridors = None, planet.corridors
+                    expected_road = planet.shortest_path(source, goal)
+                    planet.corridors = corridors
+                    self.assertSameRoute(planet, source, goal, expected_road)
+            fresh = CorridorGraph(planet)
+            self.assertEqual(planet.corridors.junctions - planet.corridors.anchors, fresh.junctions - fresh.anchors)
+            self.assertEqual(set(planet.corridors.positions) | planet.corridors.anchors,
+                             set(fresh.positions) | fresh.anchors)
+            self.assertEqual(len(planet.corridors.anchors), len(fresh.anchors))
+
+    def test_collapses_chains(self):
+        """
+        This test should check that a corridor with a dead end stub and a loop is collapsed to its junctions,
+        a route into the corridor is read from the super-edges and splitting the chain is repaired
+
+        (0,0)-(1,0)-...-(9,0)-(10,0)  with a loop at (10,0) and a stub (5,1) at (5,0)
+        """
+        planet = Planet()
+        for x in range(10):
+            planet.add_path(((x, 0), Direction.EAST), ((x + 1, 0), Direction.WEST), 1)
+        planet.add_path(((10, 0), Direction.NORTH), ((10, 0), Direction.EAST), 3)
+        planet.add_path(((5, 0), Direction.NORTH), ((5, 1), Direction.SOUTH), 2)
+        corridors = planet.use_corridors()
+        self.assertEqual(corridors.junctions, {(0, 0), (5, 0), (5, 1), (10, 0)})
+        self.assertEqual(corridors.stats()["super_edges"], 8)
+
+        road = planet.shortest_path((2, 0), (8, 0))
+        self.assertEqual(road, [((x, 0), Direction.EAST) for x in range(2, 8)])
+        self.assertEqual(planet.expanded_nodes, 5)  # start, (0,0), (5,0), the stub (5,1) and the target
+
+        planet.add_path(((7, 0), Direction.NORTH), ((7, 0), Direction.SOUTH), 1)
+        self.assertIn((7, 0), corridors.junctions)
+        self.assertEqual(corridors.junctions, CorridorGraph(planet).junctions)
+        planet.add_path(((3, 0), Direction.EAST), ((4, 0), Direction.WEST), -1)
+        self.assertIsNone(planet.shortest_path((2, 0), (8, 0)))
+        self.assertEqual(planet.shortest_path((4, 0), (8, 0))[0], ((4, 0), Direction.EAST))
+
+    def test_next_direction(self):
+        """
+        This test should check that next_direction only searches the first hop on the corridor graph instead of
+        expanding and following the whole route
+        """
+        rng = random.Random(31)
+        for attempt in range(50):
+            planet = generate_planet(rng.randint(2, 8), density=0.6, blocked_ratio=0.1, seed=attempt)
+            nodes = list(planet.get_paths())
+            for node in nodes:
+                planet.frontier.visit(node, [])
+            planet.use_corridors()
+            for _ in range(8):
+                start, target = rng.choice(nodes), rng.choice(nodes + [(9, 9)])
+                road = planet.shortest_path(start, target)
+                direction = planet.next_direction(target, start)
+                self.assertEqual(direction, road[0][1] if road else None)
+                self.assertEqual(planet.active_route.route, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+
+import unittest
+from RobolabCode import differential
+
+
+class TestDifferential(unittest.TestCase):
+    def test_engines_match_reference(self):
+        """
+        This test should check that every route engine gives the same None/[] results and route costs as the
+        original Dijkstra implementation on random planets (python -m RobolabCode.benchmark differential runs more)
+        """
+        results = differential.run_differential(cases=150, seed=7)
+        self.assertEqual(results.keys(), {"reference"} | differential.ENGINES.keys())
+        for name, result in results.items():
+            self.assertEqual(result["queries"], results["reference"]["queries"])
+            self.assertEqual(result["failures"], [], name)
+
+    def test_detects_wrong_routes(self):
+        """
+        This test should check that wrong costs, routes over blocked paths, wrong None/[] results and exceptions
+        are reported
+        """
+        def over_blocked_paths(paths, queries):
+            planet = differential._planet([(start, target, abs(weight)) for start, target, weight in paths])
+            return [planet.shortest_path(start, target) for start, target in queries]
+
+        def empty_instead_of_none(paths, queries):
+            return [route or [] for route in differential.ENGINES["dijkstra"](paths, queries)]
+
+        def raises(paths, queries):
+            raise ValueError("broken")
+
+        results = differential.run_differential(cases=100, seed=3, engines={
+            "over_blocked_paths": over_blocked_paths, "empty_instead_of_none": empty_instead_of_none,
+            "raises": raises})
+        self.assertEqual(results["reference"]["failures"], [])
+        for name in ("over_blocked_paths", "empty_instead_of_none", "raises"):
+            self.assertTrue(results[name]["failures"], name)
+        self.assertEqual(len(results["raises"]["failures"]), results["raises"]["queries"])
+
+
+if __name__ == "__main__":
+    unittest.main()
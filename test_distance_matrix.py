@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+
+import random
+import unittest
+from RobolabCode import distance_matrix, test_planet
+from RobolabCode.planet import Direction, Planet
+
+
+class TestDistanceMatrix(unittest.TestCase):
+    def check_against_shortest_path(self, use_scipy: bool):
+        """ Compares every entry of the matrix with shortest_path on random planets """
+        rng = random.Random(17)
+        for _ in range(40):
+            planet = test_planet.TestIntelligentExplore.random_planet(rng)
+            paths = planet.get_paths()
+            matrix = planet.distance_matrix(use_scipy=use_scipy)
+            for start in paths:
+                for target in list(paths) + [(9, 9)]:
+                    road = planet.shortest_path(start, target)
+                    route = matrix.route(start, target)
+                    if road is None:
+                        self.assertIsNone(route)
+                        self.assertIsNone(matrix.distance(start, target))
+                        continue
+                    cost = sum(paths[coord][direction][2] for coord, direction in road)
+                    self.assertEqual(sum(paths[coord][direction][2] for coord, direction in route), cost)
+                    self.assertEqual(matrix.distance(start, target), cost)
+                    self.assertEqual(matrix.first_hop(start, target), route[0][1] if route else None)
+
+    def test_search_per_source(self):
+        """
+        This test should check that the matrix computed without SciPy answers all routes like shortest_path
+        """
+        self.check_against_shortest_path(use_scipy=False)
+
+    @unittest.skipIf(distance_matrix.numpy is None, 'SciPy is not installed')
+    def test_scipy(self):
+        """
+        This test should check that the batched SciPy matrix answers all routes like shortest_path
+        """
+        self.check_against_shortest_path(use_scipy=True)
+
+    def test_sources(self):
+        """
+        This test should check that a matrix for some sources only has rows for them, and that parallel paths and
+        blocked paths are handled
+        """
+        planet = test_planet.TestRoboLabPlanet.build_planet()
+        planet.add_path(((0, 0), Direction.WEST), ((1, 0), Direction.SOUTH), 1)
+        planet.add_path(((2, 3), Direction.EAST), ((3, 3), Direction.WEST), -1)
+        for use_scipy in (False, distance_matrix.numpy is not None):
+            matrix = planet.distance_matrix([(0, 0), (4, 4)], use_scipy=use_scipy)
+            self.assertEqual(matrix.sources, [(0, 0)])
+            self.assertEqual(matrix.route((0, 0), (1, 0)), [((0, 0), Direction.WEST)])
+            self.assertEqual(matrix.distance((0, 0), (2, 0)), 4)
+            self.assertIsNone(matrix.route((0, 0), (3, 3)))
+            self.assertEqual(matrix.route((0, 0), (0, 0)), [])
+            with self.assertRaises(KeyError):
+                matrix.route((1, 0), (0, 0))
+
+    def test_empty_planet(self):
+        """
+        This test should check that an empty planet gives an empty matrix
+        """
+        for use_scipy in (False, distance_matrix.numpy is not None):
+            matrix = Planet().distance_matrix(use_scipy=use_scipy)
+            self.assertEqual(matrix.nodes, [])
+            self.assertIsNone(matrix.route((0, 0), (0, 0)))
+
+
+if __name__ == "__main__":
+    unittest.main()
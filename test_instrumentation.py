@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+
+import json
+import os
+import tempfile
+import unittest
+from RobolabCode import test_planet
+from RobolabCode.instrumentation import instrument
+from RobolabCode.planet import Direction
+from RobolabCode.simulator import simulate
+
+
+class TestInstrumentation(unittest.TestCase):
+    def setUp(self):
+        self.planet = test_planet.TestRoboLabPlanet.build_planet()
+
+    def test_counts(self):
+        """
+        This test should check that calls and searches are counted and that the routes do not change
+        """
+        expected = self.planet.shortest_path((0, 0), (3, 3))
+        self.planet.tree_cache.invalidate()
+        self.planet.route_memo.clear()
+        with instrument(self.planet) as profile:
+            self.assertEqual(self.planet.shortest_path((0, 0), (3, 3)), expected)
+            self.planet.shortest_path((0, 0), (2, 2))  # answered from the tree cache
+            self.planet.shortest_path((0, 0), (3, 3), self.planet.manhattan_heuristic)
+            self.planet.add_path(((3, 3), Direction.NORTH), ((3, 4), Direction.SOUTH), 1)
+
+        summary = profile.summary()
+        self.assertEqual(summary["calls"]["shortest_path"]["count"], 3)
+        self.assertEqual(summary["calls"]["add_path"]["count"], 1)
+        self.assertEqual(summary["calls"]["next_direction"]["count"], 0)
+        self.assertEqual(summary["searches"]["_dijkstra"]["count"], 1)
+        self.assertEqual(summary["searches"]["_astar"]["count"], 1)
+        self.assertEqual(summary["expanded_nodes"]["count"], 2)
+        self.assertGreater(summary["expanded_edges"]["total"], summary["expanded_nodes"]["total"])
+        self.assertEqual(sum(summary["calls"]["shortest_path"]["histogram"].values()), 3)
+
+    def test_batches_and_engines(self):
+        """
+        This test should check that add_paths batches of unveiled paths are timed and that searches answered by the
+        hierarchy and the corridor graph are counted
+        """
+        with instrument(self.planet) as profile:
+            self.planet.handle_unveiled_paths([(((3, 3), Direction.NORTH), ((3, 4), Direction.SOUTH), 1, "free"),
+                                               (((3, 4), Direction.NORTH), ((3, 5), Direction.SOUTH), 2, "free")])
+            self.planet.build_hierarchy()
+            self.planet.shortest_path((0, 0), (3, 5))
+            self.planet.hierarchy = None
+            self.planet.use_corridors()
+            self.planet.shortest_path((0, 0), (3, 4))
+            self.planet.next_direction((3, 5), (0, 0))
+
+        summary = profile.summary()
+        self.assertEqual(summary["calls"]["add_paths"]["count"], 1)
+        self.assertEqual(summary["calls"]["add_path"]["count"], 0)
+        for name in ("_hierarchy_route", "_corridor_route", "_corridor_first_hop"):
+            self.assertEqual(summary["searches"][name]["count"], 1)
+        self.assertEqual(summary["expanded_nodes"]["count"], 3)
+        self.assertGreater(summary["expanded_nodes"]["total"], 0)
+
+    def test_detach(self):
+        """
+        This test should check that nothing is recorded after the with block
+        """
+        with instrument(self.planet) as profile:
+            pass
+        self.planet.shortest_path((0, 0), (3, 3))
+        self.assertEqual(profile.summary()["calls"]["shortest_path"]["count"], 0)
+        self.assertNotIn("shortest_path", self.planet.__dict__)
+
+    def test_mission_json(self):
+        """
+        This test should check that a simulated mission can be profiled and exported as JSON
+        """
+        truth = test_planet.TestRoboLabPlanet.build_planet()
+        explorer = test_planet.TestRoboLabPlanet.planet_class()
+        with instrument(explorer) as profile:
+            result = simulate(truth, ((0, 0), Direction.NORTH), explorer=explorer)
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "profile.json")
+            profile.to_json(path)
+            with open(path) as file:
+                summary = json.load(file)
+        self.assertEqual(summary["calls"]["next_direction"]["count"], result["drives"])
+        self.assertEqual(summary["calls"]["add_path"]["count"], result["drives"])
+        # add_path and every pathUnveiled batch write through add_paths
+        self.assertEqual(summary["calls"]["add_paths"]["count"],
+                         result["drives"] + summary["calls"]["handle_unveiled_paths"]["count"])
+
+
+if __name__ == "__main__":
+    unittest.main()
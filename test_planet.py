@@ -1,7 +1,9 @@
 #!/usr/bin/env python3
 
+import random
 import unittest
-from RobolabCode.planet import Direction, Planet
+from RobolabCode import differential, reference
+from RobolabCode.planet import Direction, Planet, PathTreeCache, RouteMemo
 
 
 class ExampleTestPlanet(unittest.TestCase):
@@ -39,6 +41,8 @@ class ExampleTestPlanet(unittest.TestCase):
 
 
 class TestRoboLabPlanet(unittest.TestCase):
+    planet_class = Planet
+
     def setUp(self):
         """
         Instantiates the planet data structure and fills it with paths
@@ -57,22 +61,28 @@ class TestRoboLabPlanet(unittest.TestCase):
 
         """
         # Initialize your data structure here
-        self.planet = Planet()
-        self.planet.add_path(((0, 0), Direction.EAST), ((1, 0), Direction.WEST), 3)
-        self.planet.add_path(((1, 0), Direction.EAST), ((2, 0), Direction.WEST), 3)
-        self.planet.add_path(((0, 0), Direction.NORTH), ((0, 1), Direction.SOUTH), 1)
-        self.planet.add_path(((0, 1), Direction.NORTH), ((0, 2), Direction.SOUTH), 1)
-        self.planet.add_path(((0, 1), Direction.EAST), ((1, 1), Direction.WEST), 3)
-        self.planet.add_path(((1, 0), Direction.NORTH), ((1, 1), Direction.SOUTH), 1)
-        self.planet.add_path(((1, 1), Direction.EAST), ((2, 1), Direction.WEST), 3)
-        self.planet.add_path(((1, 1), Direction.NORTH), ((1, 2), Direction.SOUTH), 1)
-        self.planet.add_path(((0, 2), Direction.EAST), ((1, 2), Direction.WEST), 3)
-        self.planet.add_path(((1, 2), Direction.EAST), ((2, 2), Direction.WEST), 3)
-        self.planet.add_path(((2, 1), Direction.NORTH), ((2, 2), Direction.SOUTH), 1)
-        self.planet.add_path(((2, 2), Direction.NORTH), ((2, 3), Direction.SOUTH), 1)
-        self.planet.add_path(((2, 1), Direction.EAST), ((3, 1), Direction.WEST), 3)
-        self.planet.add_path(((2, 3), Direction.EAST), ((3, 3), Direction.WEST), 3)
-        self.planet.add_path(((2, 1), Direction.SOUTH), ((2, 0), Direction.NORTH), 1)
+        self.planet = self.build_planet()
+
+    @classmethod
+    def build_planet(cls) -> Planet:
+        """ Returns the planet drawn above """
+        planet = cls.planet_class()
+        planet.add_path(((0, 0), Direction.EAST), ((1, 0), Direction.WEST), 3)
+        planet.add_path(((1, 0), Direction.EAST), ((2, 0), Direction.WEST), 3)
+        planet.add_path(((0, 0), Direction.NORTH), ((0, 1), Direction.SOUTH), 1)
+        planet.add_path(((0, 1), Direction.NORTH), ((0, 2), Direction.SOUTH), 1)
+        planet.add_path(((0, 1), Direction.EAST), ((1, 1), Direction.WEST), 3)
+        planet.add_path(((1, 0), Direction.NORTH), ((1, 1), Direction.SOUTH), 1)
+        planet.add_path(((1, 1), Direction.EAST), ((2, 1), Direction.WEST), 3)
+        planet.add_path(((1, 1), Direction.NORTH), ((1, 2), Direction.SOUTH), 1)
+        planet.add_path(((0, 2), Direction.EAST), ((1, 2), Direction.WEST), 3)
+        planet.add_path(((1, 2), Direction.EAST), ((2, 2), Direction.WEST), 3)
+        planet.add_path(((2, 1), Direction.NORTH), ((2, 2), Direction.SOUTH), 1)
+        planet.add_path(((2, 2), Direction.NORTH), ((2, 3), Direction.SOUTH), 1)
+        planet.add_path(((2, 1), Direction.EAST), ((3, 1), Direction.WEST), 3)
+        planet.add_path(((2, 3), Direction.EAST), ((3, 3), Direction.WEST), 3)
+        planet.add_path(((2, 1), Direction.SOUTH), ((2, 0), Direction.NORTH), 1)
+        return planet
 
     def test_integrity(self):
         """
@@ -143,7 +153,7 @@ class TestRoboLabPlanet(unittest.TestCase):
         """
         This test should check that an empty planet really is empty
         """
-        self.new_planet = Planet()
+        self.new_planet = self.planet_class()
         self.assertEqual(self.new_planet.get_paths(), {})
 
     def test_target(self):
@@ -207,6 +217,514 @@ class TestRoboLabPlanet(unittest.TestCase):
         target = None
         self.assertEqual(self.planet.shortest_path((0, 0), (4, 4)), target)
 
+    def test_start_is_target(self):
+        """
+        This test should check that the road from a node to itself is empty
+        """
+        self.assertEqual(self.planet.shortest_path((1, 1), (1, 1)), [])
+
+    def test_blocked_path_is_avoided(self):
+        """
+        This test should check that the shortest-path algorithm never uses a blocked path (weight -1)
+
+        Result: Target is not reachable until the detour over 3,1 is added
+        """
+        self.planet.add_path(((2, 3), Direction.EAST), ((3, 3), Direction.WEST), -1)
+        self.assertIsNone(self.planet.shortest_path((0, 0), (3, 3)))
+        self.planet.add_path(((3, 1), Direction.NORTH), ((3, 3), Direction.SOUTH), 2)
+        result = [((0, 0), Direction.NORTH), ((0, 1), Direction.EAST), ((1, 1), Direction.EAST),
+                  ((2, 1), Direction.EAST), ((3, 1), Direction.NORTH)]
+        self.assertEqual(self.planet.shortest_path((0, 0), (3, 3)), result)
+
+
+class TestIntelligentExplore(unittest.TestCase):
+    @staticmethod
+    def random_planet(rng: random.Random) -> Planet:
+        """
+        Builds a random grid planet with missing and blocked paths and marks some of the nodes as visited (with a
+        random subset of their directions still open) or as unvisited
+        """
+        planet = Planet()
+        side = rng.randint(2, 7)
+        for x in range(side):
+            for y in range(side):
+                if x + 1 < side and rng.random() < 0.8:
+                    weight = -1 if rng.random() < 0.1 else rng.randint(1, 5)
+                    planet.add_path(((x, y), Direction.EAST), ((x + 1, y), Direction.WEST), weight)
+                if y + 1 < side and rng.random() < 0.8:
+                    weight = -1 if rng.random() < 0.1 else rng.randint(1, 5)
+                    planet.add_path(((x, y), Direction.NORTH), ((x, y + 1), Direction.SOUTH), weight)
+        for coord in planet.get_paths():
+            if rng.random() < 0.6:
+                planet.frontier.visit(coord, [direction for direction in Direction if rng.random() < 0.2])
+            else:
+                planet.frontier.discover(coord)
+        return planet
+
+    @staticmethod
+    def explore_cost(planet: Planet, coordinates, direction: Direction):
+        """
+        Returns the cost of driving from coordinates in direction and on to the nearest node with open directions
+        or the nearest unvisited node, measured with the reference shortest_path. Routes of the same cost can start
+        in different directions, so the decisions of both strategies are compared by this cost.
+        """
+        goal, _, weight = planet.get_paths()[coordinates][direction]
+        candidates = [coord for coord in planet.frontier.open_directions if planet.frontier.directions(coord)]
+        candidates += [coord for coord in planet.frontier.unvisited if coord != goal]
+        costs = [sum(planet.get_paths()[node][way][2] for node, way in road)
+                 for road in (reference.shortest_path(planet, goal, coord) for coord in candidates)
+                 if road is not None]
+        if goal in planet.frontier.unvisited or planet.frontier.directions(goal):
+            costs.append(0)
+        return weight + min(costs)
+
+    def assertSameDecision(self, planet: Planet, coordinates):
+        """ Asserts that both strategies drive towards a frontier node at the same cost """
+        expected = reference.intelligent_explore(planet, coordinates)
+        direction = planet.intelligent_explore(coordinates)
+        if direction == expected or not isinstance(expected, Direction) or planet.frontier.directions(coordinates):
+            self.assertEqual(direction, expected)
+        else:
+            self.assertIsInstance(direction, Direction)
+            self.assertEqual(TestIntelligentExplore.explore_cost(planet, coordinates, direction),
+                             TestIntelligentExplore.explore_cost(planet, coordinates, expected))
+
+    def test_matches_original_strategy(self):
+        """
+        This test should check that the single search exploration chooses the same direction as the original
+        strategy with one shortest_path query per candidate node
+        """
+        rng = random.Random(2023)
+        for _ in range(300):
+            planet = self.random_planet(rng)
+            for coord in planet.frontier.open_directions:
+                self.assertSameDecision(planet, coord)
+
+    def test_distances_from(self):
+        """
+        This test should check that distances_from agrees with shortest_path for every reachable node
+        """
+        rng = random.Random(7)
+        for _ in range(50):
+            planet = self.random_planet(rng)
+            paths = planet.get_paths()
+            start = rng.choice(list(paths))
+            reachable = planet.distances_from(start)
+            self.assertEqual(reachable[start], (0, None))
+            for node in paths:
+                road = planet.shortest_path(start, node)
+                if node not in reachable:
+                    self.assertIsNone(road)
+                elif node != start:
+                    self.assertEqual(reachable[node][0], sum(paths[coord][direction][2] for coord, direction in road))
+                    self.assertEqual(reachable[node][1], road[0][1])
+
+
+class TestPathTreeCache(unittest.TestCase):
+    def test_cached_trees_stay_exact(self):
+        """
+        This test should check that repaired or invalidated trees always give the same distances as a fresh search
+        while random paths are added, made cheaper, more expensive or blocked
+        """
+        rng = random.Random(3)
+        for _ in range(30):
+            planet = TestIntelligentExplore.random_planet(rng)
+            uncached = Planet()
+            uncached.tree_cache = PathTreeCache(0)
+            uncached.paths = planet.paths
+            nodes = list(planet.get_paths())
+            for _ in range(20):
+                start = rng.choice(nodes)
+                costs = {node: cost for node, (cost, direction) in planet.distances_from(start).items()}
+                self.assertEqual(costs, {node: cost for node, (cost, direction) in uncached.distances_from(start).items()})
+                node = rng.choice(nodes)
+                goal = (node[0] + rng.choice((-1, 1)), node[1])
+                direction = Direction.EAST if goal[0] > node[0] else Direction.WEST
+                weight = -1 if rng.random() < 0.1 else rng.randint(1, 5)
+                planet.add_path((node, direction), (goal, Direction((direction + 180) % 360)), weight)
+                nodes = list(planet.get_paths())
+
+    def test_counters(self):
+        """
+        This test should check that cheaper paths repair the cached tree and blocked paths drop it
+        """
+        planet = TestRoboLabPlanet.build_planet()
+        planet.shortest_path((0, 0), (3, 3))
+        planet.shortest_path((0, 0), (3, 1))
+        self.assertEqual((planet.tree_cache.misses, planet.tree_cache.hits), (1, 1))
+
+        planet.add_path(((3, 1), Direction.NORTH), ((3, 3), Direction.SOUTH), 1)
+        self.assertEqual(planet.tree_cache.repairs, 1)
+        self.assertEqual(planet.shortest_path((0, 0), (3, 3))[-1], ((3, 1), Direction.NORTH))
+
+        planet.add_path(((3, 1), Direction.NORTH), ((3, 3), Direction.SOUTH), -1)
+        self.assertEqual(planet.tree_cache.invalidations, 1)
+        self.assertEqual(planet.shortest_path((0, 0), (3, 3))[-1], ((2, 3), Direction.EAST))
+        self.assertEqual(planet.tree_cache.stats()["misses"], 2)
+
+
+class TestRouteMemo(unittest.TestCase):
+    def test_repeated_queries(self):
+        """
+        This test should check that a repeated query is answered from the memo with an equal, separate list
+        """
+        planet = TestRoboLabPlanet.build_planet()
+        road = planet.shortest_path((0, 0), (3, 3))
+        road.append(None)
+        self.assertEqual(planet.shortest_path((0, 0), (3, 3)), road[:-1])
+        self.assertEqual(planet.expanded_nodes, 0)
+
+        # Unreachable targets are memorized as well
+        planet.add_path(((5, 5), Direction.NORTH), ((5, 6), Direction.SOUTH), 1)
+        self.assertIsNone(planet.shortest_path((0, 0), (5, 5)))
+        self.assertIsNone(planet.shortest_path((0, 0), (5, 5)))
+        self.assertEqual(planet.expanded_nodes, 0)
+        stats = planet.route_memo.stats()
+        self.assertEqual((stats["hits"], stats["misses"]), (2, 2))
+        self.assertEqual(stats["hit_rate"], 0.5)
+
+    def test_generation(self):
+        """
+        This test should check that add_path, remove_if_blocked and handle_unveiled_paths make memorized routes
+        stale, so a changed planet is searched again
+        """
+        planet = TestRoboLabPlanet.build_planet()
+        road = planet.shortest_path((0, 0), (3, 3))
+        first_step = road[0]
+        planet.add_path(first_step, planet.get_paths()[first_step[0]][first_step[1]][:2], -1)
+        self.assertNotEqual(planet.shortest_path((0, 0), (3, 3))[0], first_step)
+
+        for change in (lambda: planet.remove_if_blocked((0, 0), [Direction.NORTH]),
+                       lambda: planet.handle_unveiled_paths([])):
+            generation = planet.generation
+            change()
+            self.assertGreater(planet.generation, generation)
+            planet.shortest_path((0, 0), (3, 3))
+        self.assertEqual(planet.route_memo.stale, 3)
+
+    def test_eviction(self):
+        """
+        This test should check that only the most recently used results are kept
+        """
+        planet = TestRoboLabPlanet.build_planet()
+        planet.route_memo = RouteMemo(2)
+        for target in ((1, 1), (2, 2), (1, 1), (3, 3)):
+            planet.shortest_path((0, 0), target)
+        self.assertEqual([key[1] for key in planet.route_memo.entries], [(1, 1), (3, 3)])
+
+
+class TestAStar(unittest.TestCase):
+    def test_same_cost_as_dijkstra(self):
+        """
+        This test should check that the A* mode with the Manhattan heuristic returns paths of the same cost and the
+        same None/[] results as the plain search
+        """
+        rng = random.Random(11)
+        for _ in range(100):
+            planet = TestIntelligentExplore.random_planet(rng)
+            nodes = list(planet.get_paths())
+            for _ in range(5):
+                start, target = rng.choice(nodes), rng.choice(nodes + [(9, 9)])
+                expected = planet.shortest_path(start, target)
+                road = planet.shortest_path(start, target, planet.manhattan_heuristic)
+                self.assertIsNone(differential.check_route(planet, start, target, road, expected))
+
+    def test_expands_fewer_nodes(self):
+        """
+        This test should check that the heuristic keeps the search close to the straight line to the target
+        """
+        planet = Planet()
+        for x in range(20):
+            for y in range(20):
+                planet.add_path(((x, y), Direction.EAST), ((x + 1, y), Direction.WEST), 2)
+                planet.add_path(((x, y), Direction.NORTH), ((x, y + 1), Direction.SOUTH), 2)
+        planet.shortest_path((10, 10), (15, 10), lambda node, target: 0)
+        dijkstra_expanded = planet.expanded_nodes
+        road = planet.shortest_path((10, 10), (15, 10), planet.manhattan_heuristic)
+        self.assertEqual(len(road), 5)
+        self.assertLess(planet.expanded_nodes * 5, dijkstra_expanded)
+
+    def test_next_direction_with_heuristic(self):
+        """
+        This test should check that next_direction uses the target heuristic when it is set
+        """
+        planet = TestRoboLabPlanet.build_planet()
+        planet.target_heuristic = planet.manhattan_heuristic
+        self.assertEqual(planet.next_direction((2, 0), (0, 0)), Direction.EAST)
+        self.assertGreater(planet.expanded_nodes, 0)
+
+
+class TestBidirectional(unittest.TestCase):
+    def test_same_cost_as_dijkstra(self):
+        """
+        This test should check that the bidirectional search returns a connected route of the same cost and the
+        same None/[] results as the plain search, also on planets with overwritten and blocked paths
+        """
+        rng = random.Random(12)
+        for _ in range(100):
+            planet = TestIntelligentExplore.random_planet(rng)
+            nodes = list(planet.get_paths())
+            for _ in range(5):
+                start, target = rng.choice(nodes), rng.choice(nodes + [(9, 9)])
+                expected = planet.shortest_path(start, target)
+                road = planet.shortest_path(start, target, bidirectional=True)
+                self.assertIsNone(differential.check_route(planet, start, target, road, expected))
+
+    def test_settles_fewer_nodes(self):
+        """
+        This test should check that the two searches meet in the middle and settle about half the nodes of the
+        plain search
+        """
+        planet = Planet()
+        for x in range(30):
+            for y in range(30):
+                planet.add_path(((x, y), Direction.EAST), ((x + 1, y), Direction.WEST), 2)
+                planet.add_path(((x, y), Direction.NORTH), ((x, y + 1), Direction.SOUTH), 2)
+        planet._dijkstra((15, 15), (15, 27))
+        dijkstra_settled = planet.expanded_nodes
+        road = planet.shortest_path((15, 15), (15, 27), bidirectional=True)
+        self.assertEqual(len(road), 12)
+        self.assertLess(planet.expanded_nodes * 1.5, dijkstra_settled)
+
+    def test_heuristic_not_allowed(self):
+        """
+        This test should check that a heuristic cannot be combined with the bidirectional search
+        """
+        planet = TestRoboLabPlanet.build_planet()
+        with self.assertRaises(ValueError):
+            planet.shortest_path((0, 0), (2, 2), planet.manhattan_heuristic, bidirectional=True)
+
+    def test_next_direction(self):
+        """
+        This test should check that next_direction searches from both ends when target_bidirectional is set
+        """
+        planet = TestRoboLabPlanet.build_planet()
+        planet.target_bidirectional = True
+        self.assertEqual(planet.next_direction((2, 0), (0, 0)), Direction.EAST)
+        self.assertGreater(planet.expanded_nodes, 0)
+
+
+class TestFrontier(unittest.TestCase):
+    def test_unveiled_paths_close_all_known_directions(self):
+        """
+        This test should check that every open direction leading into a known path is closed, also when several
+        directions of the same node are unveiled at once
+        """
+        planet = Planet()
+        planet.frontier.visit((0, 0), [Direction.NORTH, Direction.EAST, Direction.SOUTH])
+        planet.handle_unveiled_paths([(((0, 0), Direction.NORTH), ((0, 1), Direction.SOUTH), 1, "free"),
+                                      (((0, 0), Direction.EAST), ((1, 0), Direction.WEST), 2, "free")])
+        self.assertEqual(planet.frontier.directions((0, 0)), [Direction.SOUTH])
+        self.assertEqual(list(planet.frontier.unvisited), [(0, 1), (1, 0)])
+
+    def test_many_unveiled_paths(self):
+        """
+        This test should check that a message with hundreds of unveiled paths keeps the frontier consistent
+        """
+        planet = Planet()
+        planet.frontier.visit((0, 0), list(Direction))
+        unveiled = [(((x, 0), Direction.EAST), ((x + 1, 0), Direction.WEST), 1, "free") for x in range(300)]
+        unveiled.append((((0, 0), Direction.NORTH), ((0, 1), Direction.SOUTH), -1, "blocked"))
+        planet.handle_unveiled_paths(unveiled)
+        self.assertEqual(planet.frontier.directions((0, 0)), [Direction.SOUTH, Direction.WEST])
+        self.assertEqual(len(planet.frontier.unvisited), 301)
+        self.assertNotIn((0, 0), planet.frontier.unvisited)
+
+        # Arriving at an unvisited node drops it from the unvisited nodes, known blocked paths stay closed
+        planet.remove_if_blocked((0, 1), [Direction.NORTH, Direction.SOUTH])
+        self.assertEqual(planet.frontier.directions((0, 1)), [Direction.NORTH])
+        self.assertNotIn((0, 1), planet.frontier.unvisited)
+
+    def test_remove_driven_paths(self):
+        """
+        This test should check that driving a path closes it at both ends, including loops back to the same node
+        """
+        planet = Planet()
+        planet.frontier.visit((0, 0), [Direction.NORTH, Direction.WEST, Direction.EAST])
+        planet.frontier.visit((0, 1), [Direction.SOUTH, Direction.WEST])
+        planet.remove_driven_paths(((0, 0), Direction.NORTH), ((0, 1), Direction.SOUTH))
+        planet.remove_driven_paths(((0, 0), Direction.WEST), ((0, 0), Direction.EAST))
+        self.assertFalse(planet.frontier.has_open((0, 0)))
+        self.assertEqual(planet.frontier.first_open((0, 1)), Direction.WEST)
+        self.assertEqual(list(planet.frontier.open_nodes()), [(0, 1)])
+
+
+class TestFrontierIndex(unittest.TestCase):
+    def test_incremental_updates(self):
+        """
+        This test should check that the index gives the same answer as the original strategy while the robot moves,
+        paths are unveiled, made cheaper or blocked and directions are explored
+        """
+        rng = random.Random(13)
+        for _ in range(40):
+            planet = TestIntelligentExplore.random_planet(rng)
+            position = rng.choice(list(planet.get_paths()))
+            for _ in range(30):
+                nodes = list(planet.get_paths())
+                action = rng.random()
+                if action < 0.3:
+                    node = rng.choice(nodes)
+                    goal = (node[0], node[1] + 1)
+                    planet.handle_unveiled_paths([((node, Direction.NORTH), (goal, Direction.SOUTH),
+                                                   -1 if rng.random() < 0.1 else rng.randint(1, 5), "free")])
+                elif action < 0.5:
+                    node = rng.choice(nodes)
+                    planet.frontier.visit(node, [direction for direction in Direction if rng.random() < 0.3])
+                elif action < 0.7:
+                    node = rng.choice(nodes)
+                    for direction in planet.frontier.directions(node):
+                        planet.frontier.close(node, direction)
+                elif action < 0.85:
+                    position = rng.choice(nodes)
+                planet.frontier.close(position, Direction.NORTH)
+                if not planet.frontier.is_visited(position):
+                    planet.frontier.visit(position, [])
+                TestIntelligentExplore.assertSameDecision(self, planet, position)
+
+    def test_nearest_k(self):
+        """
+        This test should check that the k nearest frontier nodes come ordered by cost with their first direction
+        """
+        planet = TestRoboLabPlanet.build_planet()
+        planet.frontier.visit((0, 0), [])
+        for node in ((3, 3), (2, 0), (0, 2), (3, 1)):
+            planet.frontier.discover(node)
+        self.assertEqual(planet.frontier_index.nearest_k((0, 0), 3),
+                         [((0, 2), 2, Direction.NORTH), ((2, 0), 6, Direction.EAST), ((3, 1), 10, Direction.NORTH)])
+
+        planet.frontier.visit((0, 2), [])
+        planet.add_path(((0, 0), Direction.SOUTH), ((3, 3), Direction.NORTH), 1)
+        self.assertEqual(planet.frontier_index.nearest((0, 0)), ((3, 3), 1, Direction.SOUTH))
+        self.assertEqual(planet.frontier_index.rebuilds, 1)
+
+    def test_nearest_k_unique(self):
+        """
+        This test should check that opening another direction of a node with open directions does not return the
+        node twice
+        """
+        planet = Planet()
+        planet.add_path(((0, 0), Direction.EAST), ((1, 0), Direction.WEST), 2)
+        planet.add_path(((1, 0), Direction.EAST), ((2, 0), Direction.WEST), 2)
+        planet.frontier.visit((0, 0), [])
+        planet.frontier.visit((1, 0), [Direction.NORTH])
+        planet.frontier.discover((2, 0))
+        expected = [((1, 0), 2, Direction.EAST), ((2, 0), 4, Direction.EAST)]
+        self.assertEqual(planet.frontier_index.nearest_k((0, 0), 3), expected)
+
+        planet.frontier.open((1, 0), Direction.SOUTH)
+        self.assertEqual(planet.frontier_index.nearest_k((0, 0), 3), expected)
+        self.assertEqual(planet.frontier_index.nearest_k((0, 0), 3), expected)
+
+
+class TestBatchIngestion(unittest.TestCase):
+    def test_same_as_single_paths(self):
+        """
+        This test should check that add_paths leaves the same paths and distances as adding the paths one by one,
+        including repeated, overwritten and blocked paths
+        """
+        rng = random.Random(19)
+        for _ in range(50):
+            single, batched = Planet(), Planet()
+            for planet in (single, batched):
+                planet.add_path(((0, 0), Direction.NORTH), ((0, 1), Direction.SOUTH), 5)
+                planet.distances_from((0, 0))
+            paths = []
+            for _ in range(rng.randint(1, 40)):
+                start = ((rng.randint(0, 3), rng.randint(0, 3)), rng.choice(list(Direction)))
+                target = ((rng.randint(0, 3), rng.randint(0, 3)), rng.choice(list(Direction)))
+                paths.append((start, target, -1 if rng.random() < 0.1 else rng.randint(1, 9)))
+            for path in paths:
+                single.add_path(*path)
+            batched.add_paths(paths)
+            self.assertEqual(batched.get_paths(), single.get_paths())
+            self.assertEqual({node: cost for node, (cost, direction) in batched.distances_from((0, 0)).items()},
+                             {node: cost for node, (cost, direction) in single.distances_from((0, 0)).items()})
+
+    def test_caches_updated_once(self):
+        """
+        This test should check that a batch of unveiled paths repairs the cached trees once and updates the frontier
+        """
+        planet = TestRoboLabPlanet.build_planet()
+        planet.frontier.visit((3, 3), [Direction.EAST, Direction.NORTH])
+        planet.distances_from((0, 0))
+        unveiled = [(((3, 3), Direction.EAST), ((4, 3), Direction.WEST), 2, "free"),
+                    (((4, 3), Direction.SOUTH), ((4, 1), Direction.NORTH), 1, "free"),
+                    (((3, 3), Direction.EAST), ((4, 3), Direction.WEST), 1, "free")]
+        planet.ingest_unveiled(unveiled)
+        self.assertEqual(planet.tree_cache.repairs, 1)
+        self.assertEqual(planet.get_paths()[(3, 3)][Direction.EAST], ((4, 3), Direction.WEST, 1))
+        self.assertEqual(planet.shortest_path((0, 0), (4, 1))[-1], ((4, 3), Direction.SOUTH))
+        self.assertEqual(planet.frontier.directions((3, 3)), [Direction.NORTH])
+        self.assertEqual(list(planet.frontier.unvisited), [(4, 3), (4, 1)])
+
+
+class TestActiveRoute(unittest.TestCase):
+    def test_follows_route(self):
+        """
+        This test should check that next_direction searches once and then follows the route while the driven paths
+        are confirmed with their known weights
+        """
+        planet = TestRoboLabPlanet.build_planet()
+        road = planet.shortest_path((0, 0), (3, 3))
+        planet.route_memo.clear()
+        for coord, direction in road:
+            self.assertEqual(planet.next_direction((3, 3), coord), direction)
+            goal = planet.get_paths()[coord][direction]
+            planet.add_path((coord, direction), goal[:2], goal[2])
+        self.assertEqual(planet.active_route.stats(),
+                         {"replans": 1, "avoided_replans": len(road) - 1, "invalidations": 0})
+
+    def test_replans_when_needed(self):
+        """
+        This test should check that every direction of a followed route still starts a shortest route to the target
+        while paths are unveiled, made cheaper or blocked, and that far away changes do not drop the route
+        """
+        rng = random.Random(21)
+        avoided = 0
+        for _ in range(60):
+            planet = TestIntelligentExplore.random_planet(rng)
+            nodes = list(planet.get_paths())
+            position, target = rng.choice(nodes), rng.choice(nodes)
+            for _ in range(20):
+                if rng.random() < 0.5:
+                    start, goal = rng.choice(nodes), rng.choice(nodes)
+                    planet.handle_unveiled_paths([((start, rng.choice(list(Direction))),
+                                                   (goal, rng.choice(list(Direction))),
+                                                   -1 if rng.random() < 0.2 else rng.randint(1, 9), "free")])
+                direction = planet.next_direction(target, position)
+                distances = planet._dijkstra(position)[0]
+                if position == target or target not in distances:
+                    break
+                goal, goal_direction, weight = planet.get_paths()[position][direction]
+                self.assertEqual(weight + planet._dijkstra(goal)[0][target], distances[target])
+                planet.add_path((position, direction), (goal, goal_direction), weight)
+                position = goal
+            avoided += planet.active_route.avoided_replans
+        self.assertGreater(avoided, 0)
+
+    def test_changes_on_route(self):
+        """
+        This test should check that blocking a path of the route or adding a shortcut drops the route, while a
+        far away path does not
+        """
+        planet = Planet()
+        for x in range(8):
+            planet.add_path(((x, 0), Direction.EAST), ((x + 1, 0), Direction.WEST), 2)
+            planet.add_path(((x, 0), Direction.NORTH), ((x, 1), Direction.SOUTH), 2)
+            planet.add_path(((x, 1), Direction.EAST), ((x + 1, 1), Direction.WEST), 2)
+        self.assertEqual(planet.next_direction((8, 0), (0, 0)), Direction.EAST)
+
+        planet.add_path(((0, 1), Direction.NORTH), ((0, 2), Direction.SOUTH), 2)
+        self.assertEqual(planet.active_route.invalidations, 0)
+        planet.add_path(((2, 0), Direction.SOUTH), ((6, 0), Direction.SOUTH), 3)
+        self.assertEqual(planet.active_route.invalidations, 1)
+        self.assertEqual(planet.next_direction((8, 0), (0, 0)), Direction.EAST)
+        self.assertEqual(planet.active_route.route[2], ((2, 0), Direction.SOUTH))
+
+        planet.add_path(((2, 0), Direction.SOUTH), ((6, 0), Direction.SOUTH), -1)
+        self.assertEqual(planet.active_route.invalidations, 2)
+        self.assertEqual(planet.active_route.replans, 2)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+
+import unittest
+from RobolabCode.compact_planet import CompactPlanet
+from RobolabCode.planet import Direction
+from RobolabCode.planet_generator import generate_paths, generate_planet
+
+
+class TestPlanetGenerator(unittest.TestCase):
+    def test_reproducible(self):
+        """
+        This test should check that the same seed gives the same planet and another seed another one
+        """
+        options = dict(density=0.7, blocked_ratio=0.1, loop_ratio=0.2, curve_ratio=0.2)
+        self.assertEqual(generate_paths(8, seed=3, **options), generate_paths(8, seed=3, **options))
+        self.assertNotEqual(generate_paths(8, seed=3, **options), generate_paths(8, seed=4, **options))
+
+    def test_slots_used_once(self):
+        """
+        This test should check that no direction of a node is used by two paths, so add_path never overwrites
+        """
+        paths = generate_paths(12, 9, density=0.8, blocked_ratio=0.1, loop_ratio=0.5, curve_ratio=0.5, seed=1)
+        slots = [slot for start, target, weight in paths for slot in {start, target}]
+        self.assertEqual(len(slots), len(set(slots)))
+        self.assertTrue(all(start[0][0] < 12 and start[0][1] < 9 for start, target, weight in paths))
+
+    def test_path_kinds(self):
+        """
+        This test should check that blocked paths, loops and curved paths are generated and have valid weights
+        """
+        paths = generate_paths(10, blocked_ratio=0.2, loop_ratio=0.5, curve_ratio=0.5, min_weight=2, max_weight=4)
+        weights = [weight for start, target, weight in paths]
+        self.assertIn(-1, weights)
+        self.assertTrue(all(weight == -1 or 2 <= weight <= 4 for weight in weights))
+        self.assertTrue(any(start[0] == target[0] for start, target, weight in paths))
+        self.assertTrue(any(start[1] == target[1] for start, target, weight in paths))
+
+    def test_full_grid(self):
+        """
+        This test should check that a full grid connects all neighbours and fits every storage backend
+        """
+        for planet_class in (None, CompactPlanet):
+            options = {} if planet_class is None else {"planet_class": planet_class}
+            planet = generate_planet(5, 4, **options)
+            self.assertEqual(len(planet.get_paths()), 20)
+            self.assertEqual(planet.get_paths()[(1, 1)].keys(), set(Direction))
+            self.assertEqual(len(planet.shortest_path((0, 0), (4, 3))), 7)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+
+import os
+import tempfile
+import unittest
+from RobolabCode import replay
+from RobolabCode.mission import run_mission
+from RobolabCode.planet import Direction, Planet
+from RobolabCode.planet_generator import generate_planet
+from RobolabCode.simulator import SimulatedServer
+
+
+class TestReplay(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'mission.rlog')
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def record(self, truth: Planet, target=None, unveil_rate: float = 0.0, seed: int = 0) -> list:
+        """ Runs a simulated mission through a MissionRecorder and returns the recorded directions """
+        server = SimulatedServer(truth, (min(truth.get_paths()), Direction.NORTH), target, unveil_rate=unveil_rate,
+                                 seed=seed)
+        recorder = replay.MissionRecorder(server, server, self.path)
+        directions = []
+
+        def decision(coordinates, direction, seconds):
+            directions.append(direction)
+            recorder.decision(coordinates, direction, seconds)
+
+        run_mission(Planet(), recorder, recorder, decision)
+        recorder.close()
+        return directions
+
+    def test_replay(self):
+        """
+        This test should check that replaying recorded missions makes the same decisions and ends the same way,
+        with every message type, blocked paths and loops in the log (every mission is appended, the last is replayed)
+        """
+        for seed in range(3):
+            truth = generate_planet(6, density=0.8, blocked_ratio=0.1, loop_ratio=0.1, seed=seed)
+            for target, unveil_rate in ((None, 0.0), (None, 0.5), ((5, 5), 0.0)):
+                directions = self.record(truth, target, unveil_rate, seed)
+                result = replay.replay_mission(self.path)
+                self.assertEqual(result["divergences"], [])
+                self.assertTrue(result["complete"])
+                self.assertEqual(result["decisions"], len(directions))
+                self.assertEqual(result["recorded_decisions"], len(directions))
+                self.assertEqual(len(result["times"]), len(result["recorded_times"]))
+
+    def test_log(self):
+        """
+        This test should check that a log holds every mission appended to it and rejects other files
+        """
+        truth = generate_planet(4, density=0.8, blocked_ratio=0.1, seed=3)
+        self.record(truth)
+        self.record(truth, target=(3, 3))
+        missions = replay.read_log(self.path)
+        self.assertEqual(len(missions), 2)
+        for records in missions:
+            self.assertEqual(records[0][0], replay.READY)
+            self.assertEqual(records[-1][0], replay.END)
+        self.assertFalse(missions[0][-1][1])
+        self.assertTrue(missions[1][-1][1])
+        self.assertEqual(replay.replay_mission(self.path, 0)["divergences"], [])
+
+        with open(self.path, 'wb') as file:
+            file.write(b'not a log')
+        with self.assertRaises(ValueError):
+            replay.read_log(self.path)
+
+    def test_crashed_mission(self):
+        """
+        This test should check that the log of a mission which raised midway is replayed up to the crash, with and
+        without the end record of MissionRecorder.close
+        """
+        truth = generate_planet(6, density=0.8, blocked_ratio=0.1, seed=5)
+        for close in (True, False):
+            server = SimulatedServer(truth, (min(truth.get_paths()), Direction.NORTH))
+            recorder = replay.MissionRecorder(server, server, self.path)
+            directions = []
+
+            def decision(coordinates, direction, seconds):
+                directions.append(direction)
+                recorder.decision(coordinates, direction, seconds)
+                if len(directions) == 6:
+                    raise RuntimeError("crash")
+
+            with self.assertRaises(RuntimeError):
+                try:
+                    run_mission(Planet(), recorder, recorder, decision)
+                finally:
+                    if close:
+                        recorder.close()
+            if not close:
+                recorder.file.close()
+
+            result = replay.replay_mission(self.path)
+            self.assertFalse(result["complete"])
+            self.assertEqual(result["log_end"], len(replay.read_log(self.path)[-1]) - close)
+            self.assertEqual(result["divergences"], [])
+            self.assertEqual(result["decisions"], len(directions))
+            self.assertEqual(result["recorded_decisions"], len(directions))
+
+        with open(self.path, 'wb') as file:
+            file.write(b'RL')
+        with self.assertRaises(ValueError):
+            replay.read_log(self.path)
+
+    def test_divergence(self):
+        """
+        This test should check that a decision which differs from the log is reported and that the replay
+        follows the recorded drives after it
+        """
+        truth = generate_planet(5, density=0.8, seed=4)
+        recorder_decisions = []
+
+        def wrong_second_decision(coordinates, direction, seconds):
+            if len(recorder_decisions) == 1 and direction is not None:
+                direction = Direction((direction + 90) % 360)
+                wrong_second_decision.recorded = direction
+            recorder_decisions.append(direction)
+            recorder.decision(coordinates, direction, seconds)
+
+        server = SimulatedServer(truth, (min(truth.get_paths()), Direction.NORTH))
+        recorder = replay.MissionRecorder(server, server, self.path)
+        run_mission(Planet(), recorder, recorder, wrong_second_decision)
+        recorder.close()
+
+        result = replay.replay_mission(self.path)
+        self.assertEqual(len(result["divergences"]), 1)
+        index, coordinates, recorded, replayed = result["divergences"][0]
+        self.assertEqual(index, 1)
+        self.assertEqual(recorded, wrong_second_decision.recorded)
+        self.assertNotEqual(replayed, recorded)
+        self.assertEqual(result["decisions"], len(recorder_decisions))
+
+
+if __name__ == "__main__":
+    unittest.main()
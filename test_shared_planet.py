@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+
+import threading
+import unittest
+from RobolabCode import test_planet
+from RobolabCode.planet import Direction, Planet
+from RobolabCode.shared_planet import SharedPlanet
+
+
+class TestSharedPlanet(unittest.TestCase):
+    def setUp(self):
+        self.shared = SharedPlanet(test_planet.TestRoboLabPlanet.build_planet())
+
+    def test_snapshots(self):
+        """
+        This test should check that a view keeps its snapshot while the writer publishes changes, and that the next
+        view sees them
+        """
+        view = self.shared.reader()
+        self.assertIs(self.shared.reader(), view)
+        road = view.shortest_path((0, 0), (3, 3))
+
+        self.shared.add_path(((3, 3), Direction.EAST), ((4, 3), Direction.WEST), 1)
+        self.assertNotIn((4, 3), view.get_paths())
+        self.assertEqual(view.shortest_path((0, 0), (3, 3)), road)
+
+        new_view = self.shared.reader()
+        self.assertIsNot(new_view, view)
+        self.assertEqual(new_view.get_paths()[(4, 3)][Direction.WEST], ((3, 3), Direction.EAST, 1))
+        self.assertEqual(len(new_view.shortest_path((0, 0), (4, 3))), len(road) + 1)
+
+    def test_read_only(self):
+        """
+        This test should check that views cannot add paths and that a failed write publishes nothing
+        """
+        view = self.shared.reader()
+        frontier = dict(view.frontier.ranks), view.frontier._sequence, view.generation
+        unveiled = [(((3, 3), Direction.EAST), ((4, 3), Direction.WEST), 1, "free")]
+        for change in (lambda: view.add_path(((3, 3), Direction.EAST), ((4, 3), Direction.WEST), 1),
+                       lambda: view.handle_unveiled_paths(unveiled),
+                       lambda: view.ingest_unveiled(unveiled),
+                       lambda: view.remove_if_blocked((4, 3), [Direction.WEST]),
+                       lambda: view.remove_driven_paths(((0, 0), Direction.NORTH), ((0, 1), Direction.SOUTH)),
+                       lambda: view.close_known_paths((0, 0)),
+                       lambda: view.frontier.visit((4, 3), [Direction.WEST]),
+                       lambda: view.frontier.discover((4, 3))):
+            with self.assertRaises(TypeError):
+                change()
+        self.assertEqual((dict(view.frontier.ranks), view.frontier._sequence, view.generation), frontier)
+        self.assertNotIn((4, 3), view.get_paths())
+
+        version = self.shared.snapshot.version
+        with self.assertRaises(RuntimeError):
+            with self.shared.write() as planet:
+                planet.add_path(((3, 3), Direction.EAST), ((4, 3), Direction.WEST), 1)
+                raise RuntimeError("failed write")
+        self.assertEqual(self.shared.snapshot.version, version)
+        self.assertNotIn((4, 3), self.shared.writer.get_paths())
+        self.assertNotIn((4, 3), self.shared.reader().get_paths())
+
+    def test_copy_on_write(self):
+        """
+        This test should check that a change only copies the nodes it touches, that the snapshots stay shallow and
+        that the writer keeps the same paths and frontier as a plain planet
+        """
+        planet = Planet()
+        shared = SharedPlanet()
+        for x in range(300):
+            paths = [(((x, 0), Direction.EAST), ((x + 1, 0), Direction.WEST), 1 + x % 3)]
+            unveiled = [(((x, 1), Direction.EAST), ((x + 1, 1), Direction.WEST), 2, "free")]
+            before = shared.snapshot
+            for target in (planet, shared):
+                target.add_paths(paths)
+                target.handle_unveiled_paths(unveiled)
+            with shared.write() as writer:
+                writer.remove_if_blocked((x, 0), [Direction.NORTH, Direction.EAST])
+            planet.remove_if_blocked((x, 0), [Direction.NORTH, Direction.EAST])
+            if x:
+                self.assertIs(shared.snapshot.paths[(0, 0)], before.paths[(0, 0)])
+            self.assertLessEqual(len(shared.snapshot.paths.layers), 2 * (x + 2).bit_length())
+
+        view = shared.reader()
+        self.assertEqual(dict(view.get_paths()), planet.get_paths())
+        self.assertEqual(list(view.frontier.unvisited), list(planet.frontier.unvisited))
+        self.assertEqual(dict(view.frontier.open_directions), planet.frontier.open_directions)
+        self.assertEqual(dict(view.frontier.ranks), planet.frontier.ranks)
+        self.assertEqual(view.shortest_path((0, 0), (300, 1)), planet.shortest_path((0, 0), (300, 1)))
+
+    def test_concurrent_readers(self):
+        """
+        This test should check that readers in other threads only see complete batches while one writer adds paths
+        """
+        shared = SharedPlanet()
+        errors = []
+        done = threading.Event()
+
+        def write():
+            for x in range(200):
+                # Every batch closes a square, readers must see either all of its paths or none
+                shared.add_paths([(((x, 0), Direction.EAST), ((x + 1, 0), Direction.WEST), 1),
+                                  (((x, 0), Direction.NORTH), ((x, 1), Direction.SOUTH), 1),
+                                  (((x, 1), Direction.EAST), ((x + 1, 1), Direction.WEST), 1),
+                                  (((x + 1, 0), Direction.NORTH), ((x + 1, 1), Direction.SOUTH), 1)])
+            done.set()
+
+        def read():
+            while not done.is_set():
+                view = shared.reader()
+                paths = view.get_paths()
+                if len(paths) % 2:
+                    errors.append(f"{len(paths)} nodes in version {view.version}")
+                if paths and view.shortest_path((0, 0), (len(paths) // 2 - 1, 1)) is None:
+                    errors.append(f"unreachable end in version {view.version}")
+
+        readers = [threading.Thread(target=read) for _ in range(3)]
+        writer = threading.Thread(target=write)
+        for thread in readers + [writer]:
+            thread.start()
+        for thread in readers + [writer]:
+            thread.join()
+        self.assertEqual(errors, [])
+        self.assertEqual(len(shared.reader().get_paths()), 402)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+
+import unittest
+from RobolabCode import test_planet
+from RobolabCode.mission import SpeculativePlanner
+from RobolabCode.planet import Direction
+from RobolabCode.planet_generator import generate_planet
+from RobolabCode.simulator import simulate
+
+
+class TestSimulator(unittest.TestCase):
+    def setUp(self):
+        """
+        Ground truth: the planet of TestRoboLabPlanet with a blocked path and a loop at 0,0
+        """
+        self.truth = test_planet.TestRoboLabPlanet.build_planet()
+        self.truth.add_path(((3, 1), Direction.NORTH), ((3, 3), Direction.SOUTH), -1)
+        self.truth.add_path(((0, 0), Direction.WEST), ((0, 0), Direction.SOUTH), 2)
+
+    def test_exploration(self):
+        """
+        This test should check that an exploration discovers every path of the planet and then completes.
+        Like the real server the simulation reports blocked paths as leading back to their start.
+        """
+        for unveil_rate in (0.0, 0.5):
+            result = simulate(self.truth, ((0, 0), Direction.NORTH), unveil_rate=unveil_rate, seed=1)
+            self.assertTrue(result["exploration_completed"])
+            paths = result["explorer"].get_paths()
+            self.assertEqual(paths.keys(), self.truth.get_paths().keys())
+            for node, directions in self.truth.get_paths().items():
+                self.assertEqual(paths[node].keys(), directions.keys())
+                for direction, path in directions.items():
+                    self.assertEqual(paths[node][direction][2], path[2])
+                    if path[2] != -1:
+                        self.assertEqual(paths[node][direction], path)
+            self.assertEqual(result["decisions"], result["drives"] + 1)
+            self.assertGreater(result["drive_cost"], 0)
+
+    def test_target(self):
+        """
+        This test should check that the robot stops as soon as it reaches the target
+        """
+        result = simulate(self.truth, ((0, 0), Direction.NORTH), target=(1, 1))
+        self.assertTrue(result["target_reached"])
+        self.assertFalse(result["exploration_completed"])
+
+    def test_drive_limit(self):
+        """
+        This test should check that a mission which does not finish is stopped
+        """
+        with self.assertRaises(RuntimeError):
+            simulate(self.truth, ((0, 0), Direction.NORTH), max_drives=3)
+
+    def test_speculation(self):
+        """
+        This test should check that planning while driving makes exactly the same decisions as planning at every
+        node, and that the speculated decisions are used
+        """
+        hits = 0
+        for seed in range(3):
+            truth = generate_planet(6, density=0.8, blocked_ratio=0.1, loop_ratio=0.1, seed=seed)
+            start = (min(truth.get_paths()), Direction.NORTH)
+            for target, unveil_rate in ((None, 0.0), (None, 0.5), ((5, 5), 0.0)):
+                plain = simulate(truth, start, target, unveil_rate=unveil_rate, seed=seed)
+                speculated = simulate(truth, start, target, speculate=True, unveil_rate=unveil_rate, seed=seed)
+                for key in ("drive_cost", "drives", "blocked_drives", "target_reached", "exploration_completed"):
+                    self.assertEqual(plain[key], speculated[key])
+                self.assertEqual(dict(plain["explorer"].get_paths()), dict(speculated["explorer"].get_paths()))
+                self.assertIsNone(plain["speculation"])
+                hits += speculated["speculation"]["hits"]
+        self.assertGreater(hits, 0)
+
+    def test_speculation_isolated(self):
+        """
+        This test should check that the speculation never writes to the explorer and that its route is only taken
+        over when the predicted drive is confirmed
+        """
+        explorer = self.truth
+        for node in explorer.get_paths():
+            explorer.frontier.visit(node, [])
+        path = explorer.get_paths()[(0, 0)][Direction.NORTH]
+        for end_vertex, hit in ((((9, 9), Direction.SOUTH), False), ((path[0], path[1]), True)):
+            speculation = SpeculativePlanner(explorer)
+            speculation.start((0, 0), Direction.NORTH, (3, 3))
+            speculation.join()
+            self.assertEqual((explorer.tree_cache.trees, explorer.route_memo.entries), ({}, {}))
+            self.assertEqual(explorer.active_route.route, [])
+            speculated, direction = speculation.result(((0, 0), Direction.NORTH), end_vertex, path[2], (3, 3), [])
+            self.assertEqual(speculated, hit)
+            self.assertEqual(explorer.active_route.target, (3, 3) if hit else None)
+        self.assertEqual(direction, explorer.next_direction((3, 3), path[0]))
+        self.assertEqual(explorer.active_route.stats()["replans"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
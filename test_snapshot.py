@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+
+import os
+import random
+import tempfile
+import unittest
+from RobolabCode import snapshot, test_planet
+from RobolabCode.compact_planet import CompactPlanet
+from RobolabCode.planet import Direction
+
+
+class TestSnapshot(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'planet.snapshot')
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_round_trip(self):
+        """
+        This test should check that paths, frontier and routes survive saving and loading, for both backends
+        """
+        rng = random.Random(23)
+        for _ in range(20):
+            planet = test_planet.TestIntelligentExplore.random_planet(rng)
+            planet.frontier.visit((20, 20), [Direction.NORTH])
+            for original in (planet, self.copy_to_compact(planet)):
+                snapshot.save_snapshot(original, self.path)
+                loaded = snapshot.load_snapshot(self.path)
+                self.assertIsInstance(loaded, CompactPlanet)
+                self.assertEqual(loaded.get_paths(), planet.get_paths())
+                self.assertEqual(loaded.frontier.open_directions, planet.frontier.open_directions)
+                self.assertEqual(list(loaded.frontier.unvisited), list(planet.frontier.unvisited))
+                self.assertEqual(loaded._manhattan_scale, planet._manhattan_scale)
+                for coord in planet.frontier.open_directions:
+                    self.assertEqual(loaded.intelligent_explore(coord), planet.intelligent_explore(coord))
+
+    @staticmethod
+    def copy_to_compact(planet) -> CompactPlanet:
+        compact = CompactPlanet()
+        for node, directions in planet.get_paths().items():
+            for direction, (goal, goal_direction, weight) in directions.items():
+                compact.add_path((node, direction), (goal, goal_direction), weight)
+        compact.frontier = planet.frontier
+        return compact
+
+    def test_loaded_planet_can_grow(self):
+        """
+        This test should check that a loaded planet accepts new paths without changing the file
+        """
+        snapshot.save_snapshot(test_planet.TestRoboLabPlanet.build_planet(), self.path)
+        with open(self.path, 'rb') as file:
+            content = file.read()
+        planet = snapshot.load_snapshot(self.path)
+        planet.add_path(((3, 3), Direction.NORTH), ((3, 4), Direction.SOUTH), 2)
+        planet.add_path(((0, 0), Direction.EAST), ((1, 0), Direction.WEST), 1)
+        self.assertEqual(planet.shortest_path((0, 0), (3, 4))[-1], ((3, 3), Direction.NORTH))
+        self.assertEqual(planet.get_paths()[(1, 0)][Direction.WEST], ((0, 0), Direction.EAST, 1))
+        with open(self.path, 'rb') as file:
+            self.assertEqual(file.read(), content)
+
+    def test_invalid_files(self):
+        """
+        This test should check that other files and other versions are rejected
+        """
+        with open(self.path, 'wb') as file:
+            file.write(b'not a planet snapshot at all')
+        with self.assertRaises(ValueError):
+            snapshot.load_snapshot(self.path)
+
+        snapshot.save_snapshot(test_planet.TestRoboLabPlanet.build_planet(), self.path)
+        with open(self.path, 'r+b') as file:
+            file.seek(4)
+            file.write(bytes([snapshot.VERSION + 1, 0]))
+        with self.assertRaises(ValueError):
+            snapshot.load_snapshot(self.path)
+
+
+if __name__ == "__main__":
+    unittest.main()
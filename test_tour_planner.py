@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+
+import unittest
+from RobolabCode import test_planet
+from RobolabCode.planet import Direction, Planet
+from RobolabCode.planet_generator import generate_planet
+from RobolabCode.simulator import simulate
+from RobolabCode.tour_planner import TourPlanner
+
+
+class TestTourPlanner(unittest.TestCase):
+    @staticmethod
+    def explorer() -> Planet:
+        explorer = Planet()
+        explorer.tour_planner = TourPlanner(explorer)
+        return explorer
+
+    def test_two_opt(self):
+        """
+        This test should check that 2-opt removes crossings of an open tour and keeps its start
+        """
+        planner = TourPlanner(Planet())
+        distance = lambda start, target: abs(start[0] - target[0])
+        tour = planner._two_opt([(3, 0), (1, 0), (2, 0)], (0, 0), distance)
+        self.assertEqual(tour, [(1, 0), (2, 0), (3, 0)])
+        self.assertGreater(planner.improvements, 0)
+
+    def test_cheapest_position(self):
+        """
+        This test should check that a new node is inserted where the open tour gets the least longer
+        """
+        distance = lambda start, target: abs(start[0] - target[0])
+        tour = [(1, 0), (3, 0)]
+        self.assertEqual(TourPlanner._cheapest_position(tour, (2, 0), (0, 0), distance), 1)
+        self.assertEqual(TourPlanner._cheapest_position(tour, (5, 0), (0, 0), distance), 2)
+
+    def test_unveiled_nodes(self):
+        """
+        This test should check that the robot drives towards the first node of the tour over unvisited nodes and
+        keeps following the route there
+        """
+        planet = test_planet.TestRoboLabPlanet.build_planet()
+        planet.tour_planner = TourPlanner(planet)
+        for node in planet.get_paths():
+            if node in ((2, 3), (3, 3)):
+                planet.frontier.discover(node)
+            else:
+                planet.frontier.visit(node, [])
+
+        direction = planet.intelligent_explore((0, 0))
+        self.assertIsNotNone(direction)
+        goal = planet.tour_planner.tour[0]
+        self.assertIn(goal, ((2, 3), (3, 3)))
+        next_node = planet.get_paths()[(0, 0)][direction][0]
+        self.assertEqual(planet.tour_planner.expected, next_node)
+        self.assertEqual(planet.intelligent_explore(next_node), planet.shortest_path(next_node, goal)[0][1])
+        self.assertEqual(planet.tour_planner.replans, 1)
+
+    def test_replan_on_unveiled_nodes(self):
+        """
+        This test should check that the tour is planned again when unveiled paths bring new frontier nodes while the
+        robot follows the route to the first node, and that large planets are explored greedily
+        """
+        planet = test_planet.TestRoboLabPlanet.build_planet()
+        planet.tour_planner = TourPlanner(planet)
+        for node in planet.get_paths():
+            if node in ((2, 3), (3, 3)):
+                planet.frontier.discover(node)
+            else:
+                planet.frontier.visit(node, [])
+        direction = planet.intelligent_explore((0, 0))
+        next_node = planet.get_paths()[(0, 0)][direction][0]
+        self.assertEqual(planet.tour_planner.expected, next_node)
+
+        planet.handle_unveiled_paths([(((2, 3), Direction.NORTH), ((2, 4), Direction.SOUTH), 1, "free")])
+        planet.intelligent_explore(next_node)
+        self.assertEqual(planet.tour_planner.replans, 2)
+        self.assertIn((2, 4), planet.tour_planner.tour)
+
+        planet.tour_planner = TourPlanner(planet, max_planet_nodes=len(planet.get_paths()) - 1)
+        self.assertEqual(planet.intelligent_explore((0, 0)), planet.frontier_index.nearest((0, 0))[2])
+        self.assertEqual(planet.tour_planner.tour, [])
+
+    def test_exploration(self):
+        """
+        This test should check that explorations with the tour planner complete, and make the same decisions as the
+        greedy exploration if no paths are unveiled. With unveiled paths every reachable node has to be found.
+        """
+        for seed in range(3):
+            truth = generate_planet(6, density=0.8, blocked_ratio=0.1, seed=seed)
+            start = (min(truth.get_paths()), Direction.NORTH)
+            greedy = simulate(truth, start, seed=seed)
+            tour = simulate(truth, start, explorer=self.explorer(), seed=seed)
+            self.assertEqual(tour["drive_cost"], greedy["drive_cost"])
+
+            tour = simulate(truth, start, explorer=self.explorer(), unveil_rate=1.0, unveil_count=4, seed=seed)
+            self.assertTrue(tour["exploration_completed"])
+            self.assertLessEqual(truth.distances_from(start[0]).keys(), tour["explorer"].get_paths().keys())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+
+# Attention: Do not import the ev3dev.ev3 module in this file
+"""
+Exploration tours over the frontier
+
+The greedy exploration drives to the nearest frontier node every time the robot's node has no open direction left.
+TourPlanner orders the nearest frontier nodes into a tour instead, starting at the robot, and drives towards the
+first node of the tour. The robot keeps driving towards that node while it follows the route there. When it
+arrives, the node is explored like before and the tour is planned again from the last one: nodes which are no
+frontier nodes any more are dropped, new ones (e.g. from unveiled paths) are inserted where they cost the least and
+the result is improved with 2-opt moves.
+
+Tours only pay off for unvisited nodes known from unveiled paths: they stay where they are until the robot scans
+them. Visited nodes with open directions lead into unknown paths which change the frontier on every drive, so
+without unvisited nodes among the nearest frontier nodes the planner drives to the nearest one like the greedy
+exploration. The same holds on large planets: the gain of a tour shrinks with the planet (about 9 % less drive
+cost at 64 nodes, none at 400 nodes, 8 grid planets with 10 % blocked paths), so beyond max_planet_nodes known
+nodes the planner drives to the nearest frontier node as well. Compare both with: python -m RobolabCode.benchmark tour
+"""
+from typing import Dict, List, Optional, Tuple
+
+from RobolabCode.planet import Direction, Planet
+
+
+class TourPlanner:
+    """
+    Exploration planner of a planet, used by Planet.intelligent_explore if set as planet.tour_planner
+
+    Example:
+        planet.tour_planner = TourPlanner(planet)
+        planet.intelligent_explore((0, 0)) returns: Direction.EAST
+    """
+
+    def __init__(self, planet: Planet, max_nodes: int = 12, max_planet_nodes: int = 300):
+        """
+        :param planet: Planet, its tree_cache is enlarged to keep the trees of all nodes of the tour
+        :param max_nodes: Integer, number of nearest frontier nodes in the tour
+        :param max_planet_nodes: Integer, planets with more known nodes are explored greedily
+        """
+        self.planet = planet
+        self.max_nodes = max_nodes
+        self.max_planet_nodes = max_planet_nodes
+        # The trees of the robot's node and of every tour node are read on every replan, the robot's old node is kept
+        planet.tree_cache.max_sources = max(planet.tree_cache.max_sources, max_nodes + 2)
+        self.tour = []  # type: List[Tuple[int, int]]
+        self.expected = None  # next node on the route to the first node of the tour
+        self.discovered = 0  # planet.frontier.discovered when the tour was planned
+        self.replans = 0
+        self.inserted = 0
+        self.improvements = 0
+
+    def next_direction(self, coordinates: Tuple[int, int]) -> Optional[Direction]:
+        """
+        Returns the first direction towards the first node of the tour, the tour is updated when the robot left the
+        route to this node or the node is no frontier node any more
+
+        :param coordinates: 2-Tuple, current position of the robot
+        :return: Direction or None if no frontier node is reachable
+        """
+        # Drive on towards the first node of the tour while the robot follows the route to it and no frontier nodes
+        # were unveiled, replanning on every node could change the first node back and forth
+        planet = self.planet
+        if coordinates == self.expected and planet.frontier.is_candidate(self.tour[0]) and \
+                planet.frontier.discovered == self.discovered:
+            return self._drive_to(coordinates, self.tour[0])
+        self.discovered = planet.frontier.discovered
+
+        nearest = planet.frontier_index.nearest_k(coordinates, self.max_nodes)
+        if not nearest:
+            self.tour, self.expected = [], None
+            return None
+        # Only visited nodes with open directions or a large planet -> greedy
+        if len(planet.get_paths()) > self.max_planet_nodes or \
+                not any(node in planet.frontier.unvisited for node, cost, direction in nearest):
+            self.tour, self.expected = [], None
+            return nearest[0][2]
+        if len(nearest) == 1:
+            self.tour = [nearest[0][0]]
+            return self._drive_to(coordinates, self.tour[0])
+
+        self.replans += 1
+        costs = {node: cost for node, cost, direction in nearest}
+
+        def distance(start, target):
+            if start == coordinates:
+                return costs[target]
+            return self._distance(start, target)
+
+        # Keep the order of the last tour, insert new frontier nodes (cheapest first) at their cheapest position
+        tour = [node for node in self.tour if node in costs]
+        kept = set(tour)
+        for node, cost, direction in nearest:
+            if node not in kept:
+                tour.insert(self._cheapest_position(tour, node, coordinates, distance), node)
+                kept.add(node)
+                self.inserted += 1
+
+        self.tour = self._two_opt(tour, coordinates, distance)
+        return self._drive_to(coordinates, self.tour[0])
+
+    def _drive_to(self, coordinates: Tuple[int, int], goal: Tuple[int, int]) -> Optional[Direction]:
+        """ Returns the first direction of the shortest route to goal and remembers the node it leads to """
+        route = self.planet.shortest_path(coordinates, goal)
+        if not route:
+            self.expected = None
+            return None
+        self.expected = route[1][0] if len(route) > 1 else None
+        return route[0][1]
+
+    @staticmethod
+    def _cheapest_position(tour: List[Tuple[int, int]], node: Tuple[int, int], start: Tuple[int, int],
+                           distance) -> int:
+        """ Returns the index at which inserting node into the open tour from start adds the least cost """
+        best_position, best_cost = len(tour), None
+        previous = start
+        for position, following in enumerate(tour + [None]):
+            if following is None:
+                added = distance(previous, node)
+            else:
+                added = distance(previous, node) + distance(node, following) - distance(previous, following)
+            if best_cost is None or added < best_cost:
+                best_position, best_cost = position, added
+            previous = following
+        return best_position
+
+    def _two_opt(self, tour: List[Tuple[int, int]], start: Tuple[int, int], distance) -> List[Tuple[int, int]]:
+        """
+        Reverses parts of the open tour from start as long as this makes it cheaper.
+        Reversing tour[i..j] replaces the edges (tour[i - 1], tour[i]) and (tour[j], tour[j + 1]) by
+        (tour[i - 1], tour[j]) and (tour[i], tour[j + 1]), the start stays first and the tour has no way back.
+        """
+        path = [start] + tour
+        last = len(path) - 1
+        improved = True
+        while improved:
+            improved = False
+            for i in range(1, last):
+                for j in range(i + 1, last + 1):
+                    before = distance(path[i - 1], path[i])
+                    after = distance(path[i - 1], path[j])
+                    if j < last:
+                        before += distance(path[j], path[j + 1])
+                        after += distance(path[i], path[j + 1])
+                    if after < before:
+                        path[i:j + 1] = reversed(path[i:j + 1])
+                        self.improvements += 1
+                        improved = True
+        return path[1:]
+
+    def _distance(self, start: Tuple[int, int], target: Tuple[int, int]) -> int:
+        """ Returns the cost of the shortest route from the tree of start in tree_cache, Planet.infinity if none """
+        return self.planet._tree(start)[0].get(target, Planet.infinity)
+
+    def tour_cost(self, coordinates: Tuple[int, int]) -> Optional[int]:
+        """ Returns the cost of driving the current tour from coordinates, None if a node is unreachable """
+        cost, previous = 0, coordinates
+        for node in self.tour:
+            step = self._distance(previous, node)
+            if step == Planet.infinity:
+                return None
+            cost += step
+            previous = node
+        return cost
+
+    def stats(self) -> Dict[str, int]:
+        """ Returns the replan/insertion/2-opt counters """
+        return {"replans": self.replans, "inserted": self.inserted, "improvements": self.improvements,
+                "tour": len(self.tour)}